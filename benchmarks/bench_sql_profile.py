@@ -0,0 +1,57 @@
+"""
+Compare SQLite connection profiles on EnergyPlus .sql result file.
+
+Usage:
+    python benchmarks/bench_sql_profile.py path/to/eplusout.sql [--repeat 5]
+
+"""
+
+import argparse
+import timeit
+
+from db_eplusout_reader.constants import RP, TS, D, H, M
+from db_eplusout_reader.sql_reader import (
+    DEFAULT_PROFILE,
+    PLAIN_PROFILE,
+    connect,
+    dates_statement,
+    get_outputs,
+)
+
+
+def fetch_all_outputs(path, profile):
+    conn = connect(path, profile)
+    ids = [
+        row[0]
+        for row in conn.execute(
+            "SELECT ReportDataDictionaryIndex FROM ReportDataDictionary"
+        )
+    ]
+    for id_ in ids:
+        get_outputs(conn, id_)
+    conn.close()
+
+
+def fetch_all_dates(path, profile):
+    conn = connect(path, profile)
+    for frequency in (TS, H, D, M, RP):
+        conn.execute(dates_statement(frequency)).fetchall()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, profile in (("plain", PLAIN_PROFILE), ("default", DEFAULT_PROFILE)):
+        for func in (fetch_all_outputs, fetch_all_dates):
+            times = timeit.repeat(
+                lambda: func(args.path, profile), number=1, repeat=args.repeat
+            )
+            print("{:<8} {:<18} best {:.4f} s".format(name, func.__name__, min(times)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 __version__ = "0.1.0"
 
+from db_eplusout_reader.comparison import compare_files, compare_results
 from db_eplusout_reader.db_esofile import DBEsoFile, DBEsoFileCollection
-from db_eplusout_reader.get_results import get_results
-from db_eplusout_reader.processing.esofile_reader import Variable
+from db_eplusout_reader.get_results import get_derived_results, get_results
+from db_eplusout_reader.lazy_collection import LazyDBEsoFileCollection
+from db_eplusout_reader.processing.esofile_reader import Variable, validate_eso
+from db_eplusout_reader.processing.header_table import HeaderTable
+from db_eplusout_reader.reducers import reduce_results
+from db_eplusout_reader.sql_writer import eso_to_sql
+from db_eplusout_reader.warehouse import ResultsWarehouse
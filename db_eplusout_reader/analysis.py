@@ -0,0 +1,102 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from operator import eq
+
+
+def drop_nan(values):
+    """Skip missing (nan) values without per-value Python code."""
+    return compress(values, map(eq, values, values))
+
+
+def sort_values(values, reverse=False):
+    """Sort column, missing values are skipped and typed arrays keep their type."""
+    sorted_values = sorted(drop_nan(values), reverse=reverse)
+    if isinstance(values, (array, memoryview)):
+        typecode = values.typecode if isinstance(values, array) else values.format
+        return array(typecode, sorted_values)
+    return sorted_values
+
+
+def get_percentile(sorted_values, q):
+    """
+    Calculate percentile of sorted values.
+
+    Percentile is linearly interpolated between the closest
+    ranks, None is returned when there are no values.
+
+    """
+    if not 0 <= q <= 100:
+        raise ValueError("Percentile must be between 0 and 100.")
+    if not len(sorted_values):
+        return None
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return (
+        sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+    )
+
+
+def get_bin_edges(sorted_values, bins):
+    """Create 'bins' equal bins between minimum and maximum value."""
+    if bins < 1:
+        raise ValueError("Number of bins must be positive.")
+    if not len(sorted_values):
+        return [0.0] * (bins + 1)
+    low, high = sorted_values[0], sorted_values[-1]
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+    return [low + i * width for i in range(bins)] + [high]
+
+
+def get_histogram(sorted_values, bins):
+    """
+    Count values in bins.
+
+    Counts are found by binary search of each edge in sorted values
+    so values are not visited one by one. Bins include their lower
+    edge, the last bin also includes its upper edge, values outside
+    of edges are not counted.
+
+    Parameters
+    ----------
+    sorted_values : list of float or array.array
+        Ascending values.
+    bins : int or list of float
+        Number of equal bins between minimum and maximum
+        or ascending bin edges.
+
+    Returns
+    -------
+    tuple of (list of int, list of float)
+        Counts and edges.
+
+    """
+    edges = get_bin_edges(sorted_values, bins) if isinstance(bins, int) else list(bins)
+    positions = [bisect_left(sorted_values, edge) for edge in edges[:-1]]
+    positions.append(bisect_right(sorted_values, edges[-1]))
+    counts = [stop - start for start, stop in zip(positions, positions[1:])]
+    return counts, edges
+
+
+def get_top_n(values, n, time_series=None):
+    """
+    Find 'n' largest values using partial selection.
+
+    Returns
+    -------
+    list of (datetime or int, float)
+        Timestamps (or step indexes when 'time_series' is not available)
+        and values ordered from the largest value, earlier steps
+        come first for equal values.
+
+    """
+    indexes = compress(range(len(values)), map(eq, values, values))
+    top_indexes = heapq.nlargest(n, indexes, key=values.__getitem__)
+    labels = time_series if time_series is not None else range(len(values))
+    return [(labels[i], values[i]) for i in top_indexes]
@@ -0,0 +1,170 @@
+from array import array
+from itertools import chain
+
+from db_eplusout_reader.constants import FLOAT32, FLOAT64
+from db_eplusout_reader.exceptions import InvalidShape
+
+TYPECODES = {FLOAT64: "d", FLOAT32: "f"}
+
+
+def get_typecode(dtype):
+    """Return 'array' module typecode for given dtype name."""
+    try:
+        return TYPECODES[dtype]
+    except KeyError:
+        raise ValueError(
+            "Unsupported dtype '{}', use one of {}.".format(dtype, list(TYPECODES))
+        )
+
+
+def get_dtype(values):
+    """Return dtype of a typed array, None for other sequences."""
+    typecode = getattr(values, "typecode", None)
+    for dtype, dtype_typecode in TYPECODES.items():
+        if typecode == dtype_typecode:
+            return dtype
+    return None
+
+
+def to_array(values, dtype):
+    """
+    Store values in a typed array.
+
+    Parameters
+    ----------
+    values : iterable of float
+        Numeric values, any iterable is consumed without
+        creating an intermediate list.
+    dtype : str or None
+        One of {FLOAT64, FLOAT32}, values are returned
+        as a list when dtype is None.
+
+    Returns
+    -------
+    list of float or array.array
+        Numeric array, values are returned as they are
+        when they are already stored in requested type.
+
+    """
+    if dtype is None:
+        return values if isinstance(values, list) else list(values)
+    typecode = get_typecode(dtype)
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if isinstance(values, array):
+        return array(typecode, values.tolist())
+    return array(typecode, values)
+
+
+def get_columns_typecode(columns):
+    """Return typecode shared by array columns, other sequences are stored as doubles."""
+    typecodes = {
+        getattr(column, "typecode", getattr(column, "format", "d"))
+        for column in columns
+    }
+    if len(typecodes) == 1 and typecodes <= set(TYPECODES.values()):
+        return typecodes.pop()
+    return TYPECODES[FLOAT64]
+
+
+def extend_block(block, values):
+    """Append values to a typed array, buffers of the same type are copied directly."""
+    if isinstance(values, memoryview) and values.format == block.typecode:
+        block.frombytes(values.cast("B"))
+    elif isinstance(values, array) and values.typecode != block.typecode:
+        block.fromlist(values.tolist())
+    else:
+        block.extend(values)
+
+
+def join_columns(columns):
+    """
+    Concatenate columns, single column is returned as it is.
+
+    Typed array and memoryview columns are joined into a typed array,
+    other sequences into a list.
+
+    """
+    if len(columns) == 1:
+        return columns[0]
+    if all(isinstance(column, (array, memoryview)) for column in columns):
+        block = array(get_columns_typecode(columns))
+        for column in columns:
+            extend_block(block, column)
+        return block
+    return list(chain.from_iterable(columns))
+
+
+def pack_columns(columns):
+    """
+    Join columns of equal length into a single typed array.
+
+    Raises
+    ------
+    InvalidShape
+        If columns have different length.
+    TypeError
+        If columns include non numeric values.
+
+    """
+    columns = list(columns)
+    block = array(get_columns_typecode(columns))
+    n_steps = len(columns[0]) if columns else 0
+    for column in columns:
+        if len(column) != n_steps:
+            raise InvalidShape("Cannot pack columns, arrays have different length.")
+        extend_block(block, column)
+    return block
+
+
+def split_columns(block, n_columns):
+    """
+    Split packed block into columns of equal length.
+
+    Columns of an 'array.array' block are copied into new arrays,
+    memoryview block is sliced into views without copying.
+
+    """
+    n_steps = len(block) // n_columns if n_columns else 0
+    return [block[i * n_steps : (i + 1) * n_steps] for i in range(n_columns)]
+
+
+def get_column_types(columns):
+    """
+    Find columns which change their type when packed.
+
+    Returns
+    -------
+    list of (int, str)
+        Positions of list columns (with None typecode) and array
+        columns stored in a different type than the packed block.
+
+    """
+    typecode = get_columns_typecode(columns)
+    column_types = []
+    for i, column in enumerate(columns):
+        if isinstance(column, list):
+            column_types.append((i, None))
+        elif isinstance(column, array) and column.typecode != typecode:
+            column_types.append((i, column.typecode))
+    return column_types
+
+
+def restore_column_types(columns, column_types):
+    """
+    Convert split columns at given positions back into their original type.
+
+    Only 'array.array' columns are converted, memoryview columns
+    are views of a shared block which must not be copied.
+
+    """
+    for i, typecode in column_types:
+        if isinstance(columns[i], array):
+            values = columns[i].tolist()
+            columns[i] = values if typecode is None else array(typecode, values)
+    return columns
+
+
+def unpack_object(cls, args, blocks):
+    """Recreate object from arguments and blocks created by its '_pack' method."""
+    return cls._unpack(args, blocks)
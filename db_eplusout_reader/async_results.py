@@ -0,0 +1,227 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db_eplusout_reader.compression import get_file_extension
+from db_eplusout_reader.db_esofile import DBEsoFileCollection
+from db_eplusout_reader.get_results import get_results
+from db_eplusout_reader.sql_reader import connect, fetch_results, fetch_timestamps
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_PARSES = 2
+
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+_EXECUTOR_LIMITS = {"workers": DEFAULT_MAX_WORKERS, "parses": DEFAULT_MAX_PARSES}
+
+
+def configure_executors(max_workers=None, max_parses=None):
+    """
+    Set process wide limits of background work.
+
+    Parameters
+    ----------
+    max_workers : default None, int
+        Maximum number of threads used to run SQLite queries.
+    max_parses : default None, int
+        Maximum number of .eso files processed at once.
+
+    """
+    with _EXECUTORS_LOCK:
+        for name, limit in (("workers", max_workers), ("parses", max_parses)):
+            if limit is not None:
+                _EXECUTOR_LIMITS[name] = limit
+                executor = _EXECUTORS.pop(name, None)
+                if executor is not None:
+                    executor.shutdown(wait=False)
+
+
+def get_executor(name):
+    """Get shared 'workers' or 'parses' executor, create it if needed."""
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=_EXECUTOR_LIMITS[name],
+                thread_name_prefix="db_eplusout_reader_{}".format(name),
+            )
+            _EXECUTORS[name] = executor
+        return executor
+
+
+class _ConnectionHolder:
+    """Share connection of a running job so it can be interrupted."""
+
+    def __init__(self):
+        self.conn = None
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def set(self, conn):
+        with self._lock:
+            self.conn = conn
+            if self.cancelled:
+                conn.interrupt()
+
+    def clear(self):
+        with self._lock:
+            self.conn = None
+
+    def interrupt(self):
+        with self._lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()
+
+
+async def _run_in_executor(executor, func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+class AsyncSqlResultsReader:
+    """
+    Read EnergyPlus .sql results without blocking the event loop.
+
+    Queries run on a shared bounded thread pool, each query uses its
+    own read-only connection. When awaiting coroutine gets cancelled,
+    the running query is interrupted.
+
+    Parameters
+    ----------
+    path : str
+        A path to EnergyPlus .sql file output.
+    profile : default None, ConnectionProfile
+        SQLite connection settings.
+
+    Example
+    -------
+    reader = AsyncSqlResultsReader(r"C:\\some\\path\\eplusout.sql")
+    results = await reader.get_results(Variable(None, None, "J"), frequency=M)
+
+    """
+
+    def __init__(self, path, profile=None):
+        if not os.path.exists(path):
+            raise IOError("Cannot read results, file '{}' does not exist.".format(path))
+        self.path = path
+        self.profile = profile
+
+    def _run_query(self, holder, func, *args):
+        conn = connect(self.path, self.profile, check_same_thread=False)
+        holder.set(conn)
+        try:
+            return func(conn, *args)
+        finally:
+            # connection must not be interrupted once it's closed
+            holder.clear()
+            conn.close()
+
+    async def _query(self, func, *args):
+        holder = _ConnectionHolder()
+        try:
+            return await _run_in_executor(
+                get_executor("workers"), self._run_query, holder, func, *args
+            )
+        except asyncio.CancelledError:
+            holder.interrupt()
+            raise
+
+    async def get_results(
+        self,
+        variables,
+        frequency,
+        alike=False,
+        start_date=None,
+        end_date=None,
+        dtype=None,
+        units=None,
+        header_table=None,
+    ):
+        """Asynchronous counterpart of 'get_results_from_sql'."""
+        return await self._query(
+            fetch_results,
+            variables,
+            frequency,
+            alike,
+            start_date,
+            end_date,
+            None,
+            dtype,
+            units,
+            header_table,
+        )
+
+    async def get_timestamps(self, frequency, start_date=None, end_date=None):
+        """Asynchronous counterpart of 'get_timestamps_from_sql'."""
+        return await self._query(fetch_timestamps, frequency, start_date, end_date)
+
+
+async def aload_eso_file(file_path, year=None, environments=None, dtype=None):
+    """
+    Process .eso file without blocking the event loop.
+
+    Number of concurrently processed files is limited by 'max_parses'
+    (see 'configure_executors'). Processing which already started
+    cannot be interrupted, cancelled result is discarded.
+
+    Returns
+    -------
+    DBEsoFileCollection
+        Processed eso file environments.
+
+    """
+    return await _run_in_executor(
+        get_executor("parses"),
+        DBEsoFileCollection.from_path,
+        file_path,
+        year,
+        environments,
+        dtype,
+    )
+
+
+async def aget_results(
+    file_or_path,
+    variables,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    dtype=None,
+    units=None,
+    header_table=None,
+):
+    """
+    Asynchronous counterpart of 'get_results'.
+
+    SQL files are queried on the shared worker pool and can
+    be interrupted, other inputs are processed on the parse pool.
+
+    """
+    if isinstance(file_or_path, str) and get_file_extension(file_or_path) == ".sql":
+        reader = AsyncSqlResultsReader(file_or_path)
+        return await reader.get_results(
+            variables,
+            frequency,
+            alike,
+            start_date,
+            end_date,
+            dtype,
+            units,
+            header_table,
+        )
+    return await _run_in_executor(
+        get_executor("parses"),
+        get_results,
+        file_or_path,
+        variables,
+        frequency,
+        alike,
+        start_date,
+        end_date,
+        dtype,
+        units,
+        header_table,
+    )
@@ -0,0 +1,393 @@
+import sys
+from collections import OrderedDict, namedtuple
+from itertools import zip_longest
+from operator import eq, le, sub, truediv
+
+from db_eplusout_reader.compression import get_file_extension
+from db_eplusout_reader.get_results import get_results
+from db_eplusout_reader.lazy_collection import LazyDBEsoFileCollection
+from db_eplusout_reader.processing.header_table import Variable
+from db_eplusout_reader.results_dict import ResultsDictionary
+from db_eplusout_reader.sql_reader import DEFAULT_CHUNK_SIZE, iter_results_from_sql
+
+DEFAULT_REL_TOL = 1e-6
+INF = float("inf")
+# relative difference of two zero values is zero
+TINY = sys.float_info.min
+
+VariableDiff = namedtuple(
+    "VariableDiff", "max_abs_diff max_rel_diff timestamp reference value passed"
+)
+VariableDiff.__doc__ = """
+Comparison of a single variable.
+
+'timestamp' (or step index when time series is not available), 'reference'
+and 'value' locate the maximum absolute difference, both are None
+when there are no compared steps.
+"""
+
+
+def is_missing(values):
+    """Check if there are any missing (nan) values."""
+    return not all(map(eq, values, values))
+
+
+def fix_missing(diffs, magnitudes, reference, values):
+    """Steps missing in both columns match, steps missing in one column fail."""
+    for i, diff in enumerate(diffs):
+        if diff != diff:
+            both = reference[i] != reference[i] and values[i] != values[i]
+            diffs[i] = 0.0 if both else INF
+            magnitudes[i] = 0.0
+
+
+def is_equal(reference, values):
+    """Compare columns without creating intermediate lists."""
+    if type(reference) is type(values):
+        return reference == values
+    return len(reference) == len(values) and all(map(eq, reference, values))
+
+
+def compare_columns(reference, values, abs_tol, rel_tol):
+    """
+    Compare two columns of equal length.
+
+    Values pass when 'abs(a - b) <= abs_tol + rel_tol * abs(a)' where 'a'
+    is the reference value (as 'numpy.isclose'). Equal columns are
+    detected by a single comparison, other columns are compared
+    using C level 'map' calls, steps are not visited in Python.
+
+    Returns
+    -------
+    tuple of (float, int, float, bool)
+        Maximum absolute difference and its index,
+        maximum relative difference and pass flag.
+
+    """
+    if not len(reference):
+        return 0.0, None, 0.0, True
+    if is_equal(reference, values):
+        return 0.0, 0, 0.0, True
+    diffs = list(map(abs, map(sub, reference, values)))
+    magnitudes = list(map(abs, reference))
+    if is_missing(diffs):
+        fix_missing(diffs, magnitudes, reference, values)
+    max_abs_diff = max(diffs)
+    max_rel_diff = max(map(truediv, diffs, map(TINY.__add__, magnitudes)))
+    passed = max_abs_diff <= abs_tol or max_rel_diff <= rel_tol
+    if not passed and abs_tol:
+        # combined tolerance needs to be checked step by step
+        tolerances = map(
+            float(abs_tol).__add__, map(float(rel_tol).__mul__, magnitudes)
+        )
+        passed = all(map(le, diffs, tolerances))
+    return max_abs_diff, diffs.index(max_abs_diff), max_rel_diff, passed
+
+
+def get_n_steps(results):
+    if results.time_series is not None:
+        return len(results.time_series)
+    return len(next(iter(results.values()))) if len(results) else 0
+
+
+def align_steps(reference, other):
+    """
+    Find positions of steps included in both results.
+
+    Steps are matched by timestamp, by position when
+    any of results does not have time series.
+
+    Returns
+    -------
+    tuple of (list of int or None, list of int or None, list, int)
+        Reference positions, other positions (None if all steps match),
+        labels of matched steps and number of unmatched steps.
+
+    """
+    n_reference, n_other = get_n_steps(reference), get_n_steps(other)
+    if reference.time_series is None or other.time_series is None:
+        n_steps = min(n_reference, n_other)
+        labels = range(n_steps)
+        if n_reference == n_other:
+            return None, None, labels, 0
+        return range(n_steps), range(n_steps), labels, abs(n_reference - n_other)
+    if reference.time_series == other.time_series:
+        return None, None, reference.time_series, 0
+    other_positions = {timestamp: i for i, timestamp in enumerate(other.time_series)}
+    reference_positions = [
+        i
+        for i, timestamp in enumerate(reference.time_series)
+        if timestamp in other_positions
+    ]
+    labels = [reference.time_series[i] for i in reference_positions]
+    n_unmatched = n_reference + n_other - 2 * len(labels)
+    return (
+        reference_positions,
+        [other_positions[timestamp] for timestamp in labels],
+        labels,
+        n_unmatched,
+    )
+
+
+def take(values, positions):
+    """Get values at given positions, all values when positions are None."""
+    if positions is None:
+        return values
+    return list(map(values.__getitem__, positions))
+
+
+class ComparisonReport:
+    """
+    Differences of compared results.
+
+    Parameters
+    ----------
+    diffs : OrderedDict of {Variable, VariableDiff}
+        Differences of variables included in both results.
+    missing_variables : list of Variable
+        Variables included only in reference results.
+    new_variables : list of Variable
+        Variables included only in compared results.
+    n_steps : int
+        Number of compared steps.
+    n_unmatched_steps : int
+        Number of steps included only in one of results.
+
+    """
+
+    def __init__(
+        self, diffs, missing_variables, new_variables, n_steps, n_unmatched_steps
+    ):
+        self.diffs = diffs
+        self.missing_variables = missing_variables
+        self.new_variables = new_variables
+        self.n_steps = n_steps
+        self.n_unmatched_steps = n_unmatched_steps
+
+    def __repr__(self):
+        return (
+            "ComparisonReport(passed={}, variables={}, failed={}, missing={}, "
+            "new={}, steps={}, unmatched steps={})".format(
+                self.passed,
+                len(self.diffs),
+                len(self.failed_variables),
+                len(self.missing_variables),
+                len(self.new_variables),
+                self.n_steps,
+                self.n_unmatched_steps,
+            )
+        )
+
+    @property
+    def failed_variables(self):
+        return [variable for variable, diff in self.diffs.items() if not diff.passed]
+
+    @property
+    def passed(self):
+        """All steps of all variables match within tolerance."""
+        issues = (
+            self.failed_variables,
+            self.missing_variables,
+            self.new_variables,
+            self.n_unmatched_steps,
+        )
+        return not any(issues)
+
+    def merge(self, other):
+        """Combine with report of following steps."""
+        diffs = OrderedDict(self.diffs)
+        for variable, diff in other.diffs.items():
+            current = diffs.get(variable)
+            if current is None:
+                diffs[variable] = diff
+            else:
+                is_larger = diff.max_abs_diff > current.max_abs_diff
+                larger = diff if current.timestamp is None or is_larger else current
+                diffs[variable] = larger._replace(
+                    max_rel_diff=max(current.max_rel_diff, diff.max_rel_diff),
+                    passed=current.passed and diff.passed,
+                )
+        missing = [
+            v for v in other.missing_variables if v not in self.missing_variables
+        ]
+        new = [v for v in other.new_variables if v not in self.new_variables]
+        return ComparisonReport(
+            diffs,
+            self.missing_variables + missing,
+            self.new_variables + new,
+            self.n_steps + other.n_steps,
+            self.n_unmatched_steps + other.n_unmatched_steps,
+        )
+
+
+def compare_results(reference, other, abs_tol=0.0, rel_tol=DEFAULT_REL_TOL):
+    """
+    Compare results variable by variable.
+
+    Variables are matched by 'Variable' and steps by timestamp (by position
+    when time series is not available). Missing (nan) values match only
+    missing values.
+
+    Parameters
+    ----------
+    reference : ResultsDictionary or CompactResultsDictionary
+        Reference results.
+    other : ResultsDictionary or CompactResultsDictionary
+        Compared results.
+    abs_tol : default 0.0, float
+        Absolute tolerance.
+    rel_tol : default 1e-6, float
+        Relative tolerance.
+
+    Returns
+    -------
+    ComparisonReport
+        Differences of each variable.
+
+    """
+    reference_positions, other_positions, labels, n_unmatched = align_steps(
+        reference, other
+    )
+    diffs = OrderedDict()
+    for variable, reference_values in reference.items():
+        if variable not in other:
+            continue
+        reference_values = take(reference_values, reference_positions)
+        values = take(other[variable], other_positions)
+        max_abs_diff, index, max_rel_diff, passed = compare_columns(
+            reference_values, values, abs_tol, rel_tol
+        )
+        if index is None:
+            location = (None, None, None)
+        else:
+            location = (labels[index], reference_values[index], values[index])
+        diffs[variable] = VariableDiff(max_abs_diff, max_rel_diff, *location, passed)
+    return ComparisonReport(
+        diffs,
+        [variable for variable in reference if variable not in other],
+        [variable for variable in other if variable not in reference],
+        len(labels),
+        n_unmatched,
+    )
+
+
+def iter_chunks(file_or_path, variables, frequency, alike, chunk_size):
+    """Iterate over results of given file without loading whole file."""
+    if isinstance(file_or_path, str):
+        extension = get_file_extension(file_or_path)
+        if extension == ".sql":
+            return iter_results_from_sql(
+                file_or_path, variables, frequency, alike, chunk_size=chunk_size
+            )
+        if extension == ".eso":
+            # environments are released once the next one is loaded
+            collection = LazyDBEsoFileCollection.from_path(
+                file_or_path, memory_budget=0
+            )
+            return (
+                db_eso_file.get_results(variables, frequency, alike)
+                for db_eso_file in collection
+            )
+    return iter([get_results(file_or_path, variables, frequency, alike)])
+
+
+def rechunk(chunks, chunk_size):
+    """
+    Split results into dictionaries of 'chunk_size' steps.
+
+    Results of different sources are split differently (.sql blocks,
+    .eso environments), equal chunks allow comparing them pairwise.
+    All chunks need to include the same variables. Chunks without any
+    variables are skipped, same as .sql steps without requested values.
+
+    """
+    buffer = None
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        n_steps = get_n_steps(chunk)
+        start = 0
+        while start < n_steps:
+            if buffer is None:
+                buffer = ResultsDictionary(chunk.frequency)
+                buffer.time_series = []
+                for variable in chunk:
+                    buffer[variable] = []
+            stop = min(start + chunk_size - len(buffer.time_series), n_steps)
+            for variable, values in chunk.items():
+                buffer[variable].extend(values[start:stop])
+            time_series = chunk.time_series or range(n_steps)
+            buffer.time_series.extend(time_series[start:stop])
+            start = stop
+            if len(buffer.time_series) == chunk_size:
+                yield buffer
+                buffer = None
+    if buffer is not None:
+        yield buffer
+
+
+def compare_files(
+    reference,
+    other,
+    frequency,
+    variables=Variable(None, None, None),
+    alike=False,
+    abs_tol=0.0,
+    rel_tol=DEFAULT_REL_TOL,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    Compare results of two files without loading them whole.
+
+    Results are read in blocks (.sql files) or environment by environment
+    (.eso files), split into chunks of 'chunk_size' steps and compared
+    chunk by chunk. Steps are matched by timestamp within paired chunks
+    so files need to report the same steps, shifted steps are counted
+    as unmatched.
+
+    Parameters
+    ----------
+    reference : str, DBEsoFile or DBEsoFileCollection
+        Reference .sql or .eso file path or processed file.
+    other : str, DBEsoFile or DBEsoFileCollection
+        Compared file.
+    frequency : str
+        An output interval, this can be one of {TS, H, D, M, A, RP} constants.
+    variables : default Variable(None, None, None), Variable or list of Variable
+        Compared variables, all variables are compared by default.
+    alike : default False, bool
+        Specify if full string or only part of variable attribute needs to match.
+    abs_tol : default 0.0, float
+        Absolute tolerance.
+    rel_tol : default 1e-6, float
+        Relative tolerance.
+    chunk_size : default 1024, int
+        Number of steps compared at once.
+
+    Returns
+    -------
+    ComparisonReport
+        Differences of each variable.
+
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size needs to be a positive integer.")
+    report = ComparisonReport(OrderedDict(), [], [], 0, 0)
+    pairs = zip_longest(
+        rechunk(
+            iter_chunks(reference, variables, frequency, alike, chunk_size), chunk_size
+        ),
+        rechunk(
+            iter_chunks(other, variables, frequency, alike, chunk_size), chunk_size
+        ),
+    )
+    for reference_chunk, other_chunk in pairs:
+        if reference_chunk is None or other_chunk is None:
+            chunk = reference_chunk if reference_chunk is not None else other_chunk
+            report.n_unmatched_steps += get_n_steps(chunk)
+        else:
+            chunk_report = compare_results(
+                reference_chunk, other_chunk, abs_tol, rel_tol
+            )
+            report = report.merge(chunk_report)
+    return report
@@ -0,0 +1,180 @@
+import atexit
+import bz2
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+READ_BUFFER_SIZE = 1024 * 1024
+
+COMPRESSION_MODULES = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+# number of decompressed copies kept on disk, least recently used copies are removed
+MAX_DECOMPRESSED_FILES = 4
+N_DECOMPRESSION_LOCKS = 16
+
+_DECOMPRESSED_FILES = OrderedDict()
+_DECOMPRESSED_FILES_LOCK = threading.Lock()
+# archives are decompressed under a lock selected by their path so
+# different archives can be decompressed at the same time
+_DECOMPRESSION_LOCKS = [threading.Lock() for _ in range(N_DECOMPRESSION_LOCKS)]
+
+
+def split_compression_extension(path):
+    """Split path into path without compression extension and the extension."""
+    root, ext = os.path.splitext(path)
+    if ext.lower() in COMPRESSION_MODULES:
+        return root, ext.lower()
+    return path, ""
+
+
+def get_file_extension(path):
+    """Return file extension, compression extension is ignored (.sql.gz -> .sql)."""
+    root, _ = split_compression_extension(path)
+    return os.path.splitext(root)[1]
+
+
+def is_compressed(path):
+    """Check if given file has a supported compression extension."""
+    return bool(split_compression_extension(path)[1])
+
+
+def get_compression_module(path):
+    _, ext = split_compression_extension(path)
+    module = COMPRESSION_MODULES[ext]
+    if module is None:
+        raise ImportError(
+            "Cannot read '{}', compression '{}' is not supported "
+            "by current Python installation.".format(path, ext)
+        )
+    return module
+
+
+def open_binary(path):
+    """
+    Open plain or compressed file for binary reading.
+
+    Compressed files are decoded on the fly, data are requested
+    in large blocks so decompression is not done in small steps.
+
+    """
+    if not is_compressed(path):
+        return open(path, "rb")
+    module = get_compression_module(path)
+    raw = module.open(path, "rb")
+    return io.BufferedReader(raw, buffer_size=READ_BUFFER_SIZE)
+
+
+def open_text(path):
+    """Open plain or compressed file for text reading."""
+    if not is_compressed(path):
+        return open(path, "r")
+    return io.TextIOWrapper(open_binary(path))
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def clear_decompressed_files():
+    """
+    Remove all temporary files created by 'get_decompressed_path'.
+
+    Files are removed automatically on interpreter exit, call this
+    function to release disk space earlier. Paths returned before
+    must not be used afterwards.
+
+    """
+    with _DECOMPRESSED_FILES_LOCK:
+        for path in _DECOMPRESSED_FILES.values():
+            _remove_file(path)
+        _DECOMPRESSED_FILES.clear()
+
+
+atexit.register(clear_decompressed_files)
+
+
+def _remove_outdated_files(current_key):
+    """Remove temporary files created for older versions of the same archive."""
+    for key in [k for k in _DECOMPRESSED_FILES if k[0] == current_key[0]]:
+        if key != current_key:
+            _remove_file(_DECOMPRESSED_FILES.pop(key))
+
+
+def _remove_least_recently_used_files():
+    """Remove temporary files exceeding 'MAX_DECOMPRESSED_FILES', the last is kept."""
+    while len(_DECOMPRESSED_FILES) > max(MAX_DECOMPRESSED_FILES, 1):
+        _, path = _DECOMPRESSED_FILES.popitem(last=False)
+        _remove_file(path)
+
+
+def _get_cached_path(key):
+    with _DECOMPRESSED_FILES_LOCK:
+        decompressed_path = _DECOMPRESSED_FILES.get(key)
+        if decompressed_path is not None and os.path.exists(decompressed_path):
+            _DECOMPRESSED_FILES.move_to_end(key)
+            return decompressed_path
+    return None
+
+
+def decompress_file(path):
+    """Decompress given file into a new temporary file and return its path."""
+    root, _ = split_compression_extension(path)
+    fd, decompressed_path = tempfile.mkstemp(suffix=os.path.splitext(root)[1])
+    try:
+        with os.fdopen(fd, "wb") as dst, open_binary(path) as src:
+            shutil.copyfileobj(src, dst, READ_BUFFER_SIZE)
+    except BaseException:
+        _remove_file(decompressed_path)
+        raise
+    return decompressed_path
+
+
+def get_decompressed_path(path):
+    """
+    Get path of an uncompressed copy of given file.
+
+    Compressed file is decompressed into a temporary file which
+    is reused on subsequent calls as long as the archive size
+    and modification time don't change. Only 'MAX_DECOMPRESSED_FILES'
+    least recently requested copies are kept, older copies are removed.
+    Remaining temporary files are removed on interpreter exit or
+    by 'clear_decompressed_files'.
+
+    Parameters
+    ----------
+    path : str
+        A path to a plain or compressed file.
+
+    Returns
+    -------
+    str
+        Given path for plain files, temporary file path otherwise.
+
+    """
+    if not is_compressed(path):
+        return path
+    stat = os.stat(path)
+    abs_path = os.path.abspath(path)
+    key = (abs_path, stat.st_size, stat.st_mtime)
+    lock = _DECOMPRESSION_LOCKS[hash(abs_path) % N_DECOMPRESSION_LOCKS]
+    with lock:
+        decompressed_path = _get_cached_path(key)
+        if decompressed_path is None:
+            decompressed_path = decompress_file(path)
+            with _DECOMPRESSED_FILES_LOCK:
+                _DECOMPRESSED_FILES[key] = decompressed_path
+                _remove_outdated_files(key)
+                _remove_least_recently_used_files()
+    return decompressed_path
@@ -10,3 +10,6 @@ VARIABLE = "variable"
 KEY = "key"
 TYPE = "type"
 UNITS = "units"
+
+FLOAT64 = "float64"
+FLOAT32 = "float32"
@@ -1,10 +1,52 @@
+from collections import OrderedDict
+from copy import deepcopy
+from itertools import chain, repeat
+
+from db_eplusout_reader.arrays import (
+    get_column_types,
+    get_dtype,
+    join_columns,
+    pack_columns,
+    restore_column_types,
+    split_columns,
+    to_array,
+    unpack_object,
+)
 from db_eplusout_reader.constants import RP, TS, A, D, H, M
-from db_eplusout_reader.exceptions import CollectionRequired
-from db_eplusout_reader.processing.esofile_reader import process_eso_file
+from db_eplusout_reader.exceptions import CollectionRequired, InvalidShape
+from db_eplusout_reader.expressions import NAN, get_sources
+from db_eplusout_reader.processing.esofile_reader import (
+    Variable,
+    is_matching_variable,
+    process_eso_file,
+)
 from db_eplusout_reader.processing.esofile_time import (
     convert_raw_date_data,
+    get_date_bounds,
     get_n_days_from_cumulative,
 )
+from db_eplusout_reader.results_dict import ResultsDictionary
+from db_eplusout_reader.units import convert_values, convert_variable, get_conversions
+
+
+def get_environment_columns(all_results, variable):
+    """
+    Get columns of given variable from results of each environment.
+
+    Environments which do not include the variable get a column of
+    missing (nan) values stored in the same type as other columns.
+
+    """
+    columns = [results.get(variable) for results in all_results]
+    dtype = get_dtype(next(column for column in columns if column is not None))
+    return [
+        (
+            to_array(repeat(NAN, len(results.time_series)), dtype)
+            if column is None
+            else column
+        )
+        for column, results in zip(columns, all_results)
+    ]
 
 
 class DBEsoFile:
@@ -88,6 +130,73 @@ class DBEsoFile:
         self.n_days = n_days
         self.days_of_week = days_of_week
 
+    def _pack(self):
+        """Get constructor arguments with outputs packed into typed arrays."""
+        ids, blocks = [], []
+        for frequency, outputs in self.outputs.items():
+            columns = list(outputs.values())
+            ids.append((frequency, list(outputs), get_column_types(columns)))
+            blocks.append(pack_columns(columns))
+        args = (
+            self.environment_name,
+            self.header,
+            ids,
+            self.dates,
+            self.n_days,
+            self.days_of_week,
+        )
+        return args, blocks
+
+    @classmethod
+    def _unpack(cls, args, blocks):
+        environment_name, header, ids, dates, n_days, days_of_week = args
+        outputs = {}
+        for (frequency, frequency_ids, column_types), block in zip(ids, blocks):
+            columns = split_columns(block, len(frequency_ids))
+            columns = restore_column_types(columns, column_types)
+            outputs[frequency] = dict(zip(frequency_ids, columns))
+        return cls(environment_name, header, outputs, dates, n_days, days_of_week)
+
+    def __reduce__(self):
+        # outputs are sent as one buffer per frequency instead of lists of floats,
+        # outputs are converted back into their original type when unpickled
+        try:
+            return unpack_object, (type(self),) + self._pack()
+        except (InvalidShape, TypeError):
+            # outputs cannot be stored in typed arrays
+            return (
+                type(self),
+                (
+                    self.environment_name,
+                    self.header,
+                    self.outputs,
+                    self.dates,
+                    self.n_days,
+                    self.days_of_week,
+                ),
+            )
+
+    def __copy__(self):
+        return type(self)(
+            self.environment_name,
+            self.header,
+            self.outputs,
+            self.dates,
+            self.n_days,
+            self.days_of_week,
+        )
+
+    def __deepcopy__(self, memo):
+        # packed form is used only for pickling, copies keep original outputs
+        return type(self)(
+            self.environment_name,
+            deepcopy(self.header, memo),
+            deepcopy(self.outputs, memo),
+            deepcopy(self.dates, memo),
+            deepcopy(self.n_days, memo),
+            deepcopy(self.days_of_week, memo),
+        )
+
     @classmethod
     def _from_raw_outputs(cls, raw_outputs, year):
         dates = convert_raw_date_data(raw_outputs.dates, raw_outputs.days_of_week, year)
@@ -102,15 +211,60 @@ class DBEsoFile:
         )
 
     @classmethod
-    def from_path(cls, file_path, year=None):
-        all_raw_outputs = process_eso_file(file_path)
+    def from_path(
+        cls,
+        file_path,
+        year=None,
+        environments=None,
+        dtype=None,
+        header_table=None,
+        memory_limit=None,
+        save_index=False,
+    ):
+        """
+        Process eso file with a single environment.
+
+        Parameters
+        ----------
+        file_path : str
+            A path to EnergyPlus .eso file.
+        year : default None, int
+            Year used to convert dates.
+        environments : default None, str or list of str
+            Process only given environment.
+        dtype : default None, {FLOAT64, FLOAT32}
+            Store outputs in typed arrays instead of lists of floats.
+            FLOAT32 halves memory needed but keeps only about 7 significant
+            digits (i.e. 6061634975.34 J is stored as 6061635072.0 J),
+            large cumulative values (energy, meters) lose absolute precision.
+        header_table : default None, HeaderTable
+            Share variables and equal headers with other processed files.
+        memory_limit : default None, int
+            Keep only about given number of bytes of outputs in memory while
+            processing, outputs are stored in temporary files and accessed as
+            read-only memory-mapped arrays (FLOAT64 unless 'dtype' is given).
+        save_index : default False, bool
+            Store environment offsets next to the file as '<file_path>.idx'
+            so following requests of selected environments do not need
+            to scan the file.
+
+        """
+        all_raw_outputs = process_eso_file(
+            file_path,
+            environments=environments,
+            dtype=dtype,
+            header_table=header_table,
+            memory_limit=memory_limit,
+            save_index=save_index,
+        )
         if len(all_raw_outputs) == 1:
             return cls._from_raw_outputs(all_raw_outputs[0], year)
         raise CollectionRequired(
             "Cannot process file {}. "
             "as there are multiple environments included.\n"
             "Use 'DBEsoFileCollection.from_path' "
-            "to generate multiple files."
+            "to generate multiple files or pick single environment "
+            "using 'environments' argument."
             "".format(file_path)
         )
 
@@ -119,6 +273,125 @@ class DBEsoFile:
         order = {TS: 0, H: 1, D: 2, M: 3, A: 4, RP: 5}
         return sorted(list(self.header.keys()), key=lambda x: order[x])
 
+    def find_ids(self, variables, frequency, alike=False):
+        """
+        Find id : Variable pairs for given 'Variable' request.
+
+        Matches for each requested variable are sorted
+        the same way as .sql results.
+
+        """
+        variables = [variables] if isinstance(variables, Variable) else variables
+        header = self.header.get(frequency, {})
+        ids = OrderedDict()
+        for requested_variable in variables:
+            matches = [
+                (variable, id_)
+                for variable, id_ in header.items()
+                if is_matching_variable(requested_variable, variable, alike)
+            ]
+            for variable, id_ in sorted(matches):
+                ids[id_] = variable
+        return ids
+
+    def get_date_bounds(self, frequency, start_date=None, end_date=None):
+        """Find slice bounds of given frequency steps using binary search."""
+        return get_date_bounds(self.dates.get(frequency, []), start_date, end_date)
+
+    def slice(self, start_date=None, end_date=None):
+        """
+        Get steps between start and end dates (both inclusive).
+
+        Bounds are found using binary search on sorted dates,
+        only values within the bounds are copied.
+
+        Returns
+        -------
+        DBEsoFile
+            A new file sharing header with the original one.
+
+        """
+        outputs, dates, n_days, days_of_week = {}, {}, {}, {}
+        for frequency, frequency_dates in self.dates.items():
+            start, stop = get_date_bounds(frequency_dates, start_date, end_date)
+            dates[frequency] = frequency_dates[start:stop]
+            outputs[frequency] = {
+                id_: values[start:stop]
+                for id_, values in self.outputs[frequency].items()
+            }
+            if self.n_days and frequency in self.n_days:
+                n_days[frequency] = self.n_days[frequency][start:stop]
+            if frequency in self.days_of_week:
+                days_of_week[frequency] = self.days_of_week[frequency][start:stop]
+        return DBEsoFile(
+            environment_name=self.environment_name,
+            header=self.header,
+            outputs=outputs,
+            dates=dates,
+            n_days=n_days if self.n_days else self.n_days,
+            days_of_week=days_of_week,
+        )
+
+    def get_results(
+        self,
+        variables,
+        frequency,
+        alike=False,
+        start_date=None,
+        end_date=None,
+        dtype=None,
+        units=None,
+    ):
+        """
+        Extract output values, arguments match 'get_results' function.
+
+        Values keep type of stored outputs unless 'dtype' is specified,
+        converted values are computed in a single pass over stored outputs.
+
+        Returns
+        -------
+        ResultsDictionary : Dict of {Variable, list of float}
+
+        """
+        ids = self.find_ids(variables, frequency, alike)
+        conversions = get_conversions(units)
+        dates = self.dates.get(frequency, [])
+        start, stop = get_date_bounds(dates, start_date, end_date)
+        rd = ResultsDictionary(frequency)
+        for id_, variable in ids.items():
+            outputs = self.outputs[frequency][id_]
+            conversion = conversions.get(variable.units)
+            if conversion is not None:
+                values = outputs[start:stop]
+                variable = convert_variable(variable, conversion)
+                rd[variable] = convert_values(
+                    values, conversion, dtype or get_dtype(outputs)
+                )
+            elif dtype is not None:
+                rd[variable] = to_array(outputs[start:stop], dtype)
+            else:
+                rd[variable] = outputs[start:stop]
+        rd.time_series = dates[start:stop]
+        return rd
+
+    def get_derived_results(
+        self, expressions, frequency, alike=False, start_date=None, end_date=None
+    ):
+        """
+        Evaluate derived variables, see 'get_derived_results' function.
+
+        Only variables referenced by expressions are extracted.
+
+        Returns
+        -------
+        DerivedResults : Mapping of {str, list of float}
+
+        """
+        results = self.get_results(
+            get_sources(expressions.values()), frequency, alike, start_date, end_date
+        )
+        return results.derive(expressions, alike)
+
 
 class DBEsoFileCollection:
     """
@@ -126,7 +399,9 @@ class DBEsoFileCollection:
 
     The collection can be populated by passing a path into
     'DBEsoFileCollection.from_path(some/path.eso)' class
-    factory method.
+    factory method. Use 'environments' argument to process
+    only some of the environments, for example to skip
+    sizing periods.
 
     Parameters
     ----------
@@ -139,8 +414,25 @@ class DBEsoFileCollection:
         self._db_eso_files = [] if not db_eso_files else db_eso_files
 
     @classmethod
-    def from_path(cls, file_path, year=None):
-        all_raw_outputs = process_eso_file(file_path)
+    def from_path(
+        cls,
+        file_path,
+        year=None,
+        environments=None,
+        dtype=None,
+        header_table=None,
+        memory_limit=None,
+        save_index=False,
+    ):
+        """Process eso file environments, arguments match 'DBEsoFile.from_path'."""
+        all_raw_outputs = process_eso_file(
+            file_path,
+            environments=environments,
+            dtype=dtype,
+            header_table=header_table,
+            memory_limit=memory_limit,
+            save_index=save_index,
+        )
         db_eso_files = []
         for raw_outputs in all_raw_outputs:
             db_eso_file = DBEsoFile._from_raw_outputs(raw_outputs, year)
@@ -151,6 +443,73 @@ class DBEsoFileCollection:
     def environment_names(self):
         return [ef.environment_name for ef in self._db_eso_files]
 
+    def _pack(self):
+        args, blocks = [], []
+        for db_eso_file in self._db_eso_files:
+            file_args, file_blocks = db_eso_file._pack()
+            args.append((file_args, len(file_blocks)))
+            blocks.extend(file_blocks)
+        return args, blocks
+
+    @classmethod
+    def _unpack(cls, args, blocks):
+        db_eso_files = []
+        start = 0
+        for file_args, n_blocks in args:
+            file_blocks = blocks[start : start + n_blocks]
+            db_eso_files.append(DBEsoFile._unpack(file_args, file_blocks))
+            start += n_blocks
+        return cls(db_eso_files)
+
+    def __reduce__(self):
+        try:
+            return unpack_object, (type(self),) + self._pack()
+        except (InvalidShape, TypeError):
+            # environments are pickled one by one
+            return type(self), (self._db_eso_files,)
+
+    def __copy__(self):
+        return type(self)(list(self._db_eso_files))
+
+    def __deepcopy__(self, memo):
+        return type(self)(deepcopy(self._db_eso_files, memo))
+
+    def get_results(
+        self,
+        variables,
+        frequency,
+        alike=False,
+        start_date=None,
+        end_date=None,
+        dtype=None,
+        units=None,
+    ):
+        """
+        Extract output values from all environments.
+
+        Environment results are sliced separately and joined
+        in environment order, same as in .sql results. Steps of
+        environments which do not include a variable are filled
+        with missing (nan) values.
+
+        """
+        all_results = [
+            db_eso_file.get_results(
+                variables, frequency, alike, start_date, end_date, dtype, units
+            )
+            for db_eso_file in self
+        ]
+        found_variables = OrderedDict(
+            (variable, None) for results in all_results for variable in results
+        )
+        rd = ResultsDictionary(frequency)
+        for variable in found_variables:
+            rd[variable] = join_columns(get_environment_columns(all_results, variable))
+        rd.time_series = list(
+            chain.from_iterable(results.time_series for results in all_results)
+        )
+        return rd
+
     def __iter__(self):
         for item in self._db_eso_files:
             yield item
@@ -0,0 +1,187 @@
+import io
+import os
+
+from db_eplusout_reader.db_esofile import DBEsoFile, DBEsoFileCollection
+from db_eplusout_reader.processing.esofile_reader import read_body, read_file_header
+
+FOLLOW_CHUNK_SIZE = 16 * 1024 * 1024
+
+END_OF_DICTIONARY = b"End of Data Dictionary"
+END_OF_DATA = b"End of Data"
+
+
+def get_line_id(raw_line):
+    """Return numeric id of a raw byte line, None for non numeric lines."""
+    raw_id = raw_line.split(b",", 1)[0]
+    return int(raw_id) if raw_id.isdigit() else None
+
+
+def find_complete_blocks_end(lines, highest_frequency_id):
+    """
+    Find number of lines forming complete timestep blocks.
+
+    The last block is considered complete only when the following
+    environment or frequency line (or the 'End of Data' line) has
+    already been written.
+
+    Returns
+    -------
+    tuple of (int, bool)
+        Number of complete lines and flag if end of data has been reached.
+
+    """
+    for i in range(len(lines) - 1, -1, -1):
+        line = lines[i]
+        if line.startswith(END_OF_DATA) and not line.startswith(END_OF_DICTIONARY):
+            return len(lines), True
+        line_id = get_line_id(line)
+        if line_id is not None and line_id <= highest_frequency_id:
+            return i, False
+    return 0, False
+
+
+def to_text_stream(lines):
+    """Decode raw byte lines into a text stream with universal new lines."""
+    return io.StringIO(b"".join(lines).decode("utf-8"), newline=None)
+
+
+class EsoFileFollower:
+    """
+    Incrementally read .eso file which is still being written.
+
+    Each 'poll' call reads only data appended since the previous call,
+    processes complete timestep blocks and keeps the trailing block
+    until it's complete. Processed data is stored as a list of
+    RawOutputData which is updated in place.
+
+    Parameters
+    ----------
+    file_path : str
+        A path to EnergyPlus .eso file.
+
+    Example
+    -------
+    follower = EsoFileFollower(r"C:\\some\\path\\eplusout.eso")
+    while not follower.complete:
+        follower.poll()
+        time.sleep(10)
+    collection = follower.to_collection()
+
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.highest_frequency_id = None
+        self.header = None
+        self.all_raw_outputs = []
+        self.complete = False
+        self._position = 0
+
+    def reset(self):
+        """Drop all processed data and start from the beginning of the file."""
+        self.highest_frequency_id = None
+        self.header = None
+        self.all_raw_outputs = []
+        self.complete = False
+        self._position = 0
+
+    @property
+    def environment_names(self):
+        return [raw_outputs.environment_name for raw_outputs in self.all_raw_outputs]
+
+    def _process_header(self, lines):
+        for i, line in enumerate(lines):
+            if line.startswith(END_OF_DICTIONARY):
+                n_lines = i + 1
+                stream = to_text_stream(lines[:n_lines])
+                self.highest_frequency_id, self.header = read_file_header(stream)
+                return n_lines
+        return 0
+
+    def _process_body(self, lines):
+        n_lines, self.complete = find_complete_blocks_end(
+            lines, self.highest_frequency_id
+        )
+        if n_lines:
+            try:
+                read_body(
+                    to_text_stream(lines[:n_lines]),
+                    self.highest_frequency_id,
+                    self.header,
+                    all_raw_outputs=self.all_raw_outputs,
+                )
+            except StopIteration:
+                # all complete blocks have been processed
+                pass
+        return n_lines
+
+    def _process_lines(self, lines):
+        n_lines = 0
+        if self.header is None:
+            n_lines = self._process_header(lines)
+            if self.header is None:
+                return 0
+        return n_lines + self._process_body(lines[n_lines:])
+
+    def poll(self):
+        """
+        Process data appended since the last call.
+
+        The file is processed from the start again when
+        it gets shorter than already processed part
+        (i.e. simulation has been restarted).
+
+        Returns
+        -------
+        int
+            Number of newly processed lines.
+
+        """
+        if os.path.getsize(self.file_path) < self._position:
+            self.reset()
+        if self.complete:
+            return 0
+        n_processed = 0
+        with open(self.file_path, "rb") as file:
+            file.seek(self._position)
+            buffer = b""
+            while not self.complete:
+                chunk = file.read(FOLLOW_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+                # ignore the last line if it's not been fully written
+                lines = buffer[: buffer.rfind(b"\n") + 1].splitlines(True)
+                n_lines = self._process_lines(lines)
+                n_bytes = sum(len(line) for line in lines[:n_lines])
+                buffer = buffer[n_bytes:]
+                self._position += n_bytes
+                n_processed += n_lines
+        return n_processed
+
+    def to_collection(self, year=None):
+        """
+        Convert currently processed data into DBEsoFileCollection.
+
+        Dates are converted on each call, numeric outputs are copied
+        at their current length so the collection is not affected
+        by subsequent polls.
+
+        """
+        db_eso_files = []
+        for raw_outputs in self.all_raw_outputs:
+            if any(raw_outputs.dates.values()):
+                db_eso_file = DBEsoFile._from_raw_outputs(raw_outputs, year)
+                db_eso_file.outputs = {
+                    frequency: {
+                        id_: values[: len(db_eso_file.dates[frequency])]
+                        for id_, values in outputs.items()
+                    }
+                    for frequency, outputs in raw_outputs.outputs.items()
+                }
+                db_eso_file.days_of_week = {
+                    frequency: list(days)
+                    for frequency, days in raw_outputs.days_of_week.items()
+                }
+                db_eso_files.append(db_eso_file)
+        return DBEsoFileCollection(db_eso_files)
@@ -0,0 +1,164 @@
+from collections import OrderedDict, namedtuple
+
+from db_eplusout_reader.constants import RP, TS, A, D, H, M
+from db_eplusout_reader.processing.esofile_reader import Variable, process_eso_file
+from db_eplusout_reader.processing.esofile_time import convert_raw_date_data
+
+SUMMARY_COLUMNS = [
+    "frequency",
+    "key",
+    "type",
+    "units",
+    "count",
+    "sum",
+    "mean",
+    "min",
+    "min date",
+    "max",
+    "max date",
+]
+
+
+class VariableStatistics(
+    namedtuple(
+        "VariableStatistics",
+        "count total sum_squares minimum minimum_date maximum maximum_date",
+    )
+):
+    """Summary statistics of a single output, extremes include their dates."""
+
+    __slots__ = ()
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+def get_step_date(dates, step):
+    return dates[step] if step is not None else None
+
+
+class EsoSummary:
+    def __init__(self, environment_name, statistics):
+        """
+        Summary statistics of a single eso file environment.
+
+        Parameters
+        ----------
+        environment_name : str
+            A name of the environment.
+        statistics : dict of {str, OrderedDict of {Variable, VariableStatistics}}
+            Statistics of outputs for each frequency.
+
+        """
+        self.environment_name = environment_name
+        self.statistics = statistics
+
+    @classmethod
+    def _from_raw_summary(cls, raw_summary, year):
+        dates = convert_raw_date_data(raw_summary.dates, raw_summary.days_of_week, year)
+        statistics = {}
+        for frequency, variables in raw_summary.header.items():
+            frequency_statistics = OrderedDict()
+            for variable, id_ in sorted(variables.items()):
+                summary = raw_summary.outputs[frequency].get(id_)
+                if summary is None:
+                    continue
+                frequency_dates = dates[frequency]
+                frequency_statistics[variable] = VariableStatistics(
+                    count=summary.count,
+                    total=summary.total,
+                    sum_squares=summary.sum_squares,
+                    minimum=summary.minimum if summary.count else float("nan"),
+                    minimum_date=get_step_date(frequency_dates, summary.minimum_step),
+                    maximum=summary.maximum if summary.count else float("nan"),
+                    maximum_date=get_step_date(frequency_dates, summary.maximum_step),
+                )
+            statistics[frequency] = frequency_statistics
+        return cls(raw_summary.environment_name, statistics)
+
+    @property
+    def frequencies(self):
+        order = {TS: 0, H: 1, D: 2, M: 3, A: 4, RP: 5}
+        return sorted(list(self.statistics.keys()), key=lambda x: order[x])
+
+    def to_table(self):
+        """
+        Get summary in a table like format.
+
+        Returns
+        -------
+        list of list of {float, str or datetime}
+            Table with a header row and a row for each output.
+
+        """
+        table = [list(SUMMARY_COLUMNS)]
+        for frequency in self.frequencies:
+            for variable, statistics in self.statistics[frequency].items():
+                row = [frequency]
+                row.extend(variable)
+                row.extend(
+                    [
+                        statistics.count,
+                        statistics.total,
+                        statistics.mean,
+                        statistics.minimum,
+                        statistics.minimum_date,
+                        statistics.maximum,
+                        statistics.maximum_date,
+                    ]
+                )
+                table.append(row)
+        return table
+
+
+def get_summary(file_path, variables=None, alike=False, year=None, environments=None):
+    """
+    Compute summary statistics of eso file outputs.
+
+    Outputs are not stored, only running count, sum, sum of squares
+    and extremes (with step index) are kept for each requested output,
+    other outputs are skipped. Step indexes are resolved into dates
+    once the environment has been processed.
+
+    Parameters
+    ----------
+    file_path : str
+        A path to EnergyPlus .eso file.
+    variables : default None, Variable or list of Variable
+        Requested outputs, all outputs are included when not specified.
+    alike : default False, bool
+        Match variables by substrings.
+    year : default None, int
+        Year used to convert dates.
+    environments : default None, str or list of str
+        Process only given environments.
+
+    Returns
+    -------
+    list of EsoSummary
+        Summary for each processed environment.
+
+    Example
+    -------
+    summaries = get_summary(
+        r"C:\\some\\path\\eplusout.eso",
+        Variable(None, "Zone Mean Air Temperature", None),
+    )
+    statistics = summaries[-1].statistics[H]
+
+    """
+    if variables is None:
+        variables = [Variable(None, None, None)]
+    elif isinstance(variables, Variable):
+        variables = [variables]
+    all_raw_summaries = process_eso_file(
+        file_path,
+        environments=environments,
+        summary_variables=variables,
+        alike=alike,
+    )
+    return [
+        EsoSummary._from_raw_summary(raw_summary, year)
+        for raw_summary in all_raw_summaries
+    ]
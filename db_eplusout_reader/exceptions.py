@@ -14,6 +14,10 @@ class CollectionRequired(Exception):
     """Exception raised when trying to process multienv file with DBEsoFile class."""
 
 
+class EnvironmentNotFound(Exception):
+    """Exception raised when requested environment is not included in the file."""
+
+
 class LeapYearMismatch(Exception):
     """Exception raised when requested year does not match real calendar."""
 
@@ -28,3 +32,7 @@ class NoResults(Exception):
 
 class InvalidShape(Exception):
     """Exception raised when table does not have uniform number of items in each column."""
+
+
+class RunNotFound(Exception):
+    """Exception raised when requested run is not included in the warehouse."""
@@ -0,0 +1,344 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from itertools import repeat
+from operator import add, mul, sub, truediv
+
+from db_eplusout_reader.exceptions import NoResults
+from db_eplusout_reader.processing.esofile_reader import Variable, is_matching_variable
+
+NAN = float("nan")
+
+
+def divide(left, right):
+    """Division of values where division by zero gives a missing (nan) value."""
+    try:
+        return left / right
+    except ZeroDivisionError:
+        return NAN
+
+
+def apply_operator(operator, left, right):
+    """
+    Apply binary operator on columns or scalars.
+
+    Columns are combined using a single C level 'map' call,
+    scalars are broadcast to the length of the other column.
+
+    """
+    left_is_column = hasattr(left, "__len__")
+    right_is_column = hasattr(right, "__len__")
+    if left_is_column and right_is_column:
+        if len(left) != len(right):
+            raise ValueError(
+                "Cannot combine columns of {} and {} steps.".format(
+                    len(left), len(right)
+                )
+            )
+        return list(map(operator, left, right))
+    if left_is_column:
+        return list(map(operator, left, repeat(right)))
+    if right_is_column:
+        return list(map(operator, repeat(left), right))
+    return operator(left, right)
+
+
+def apply_division(left, right):
+    try:
+        return apply_operator(truediv, left, right)
+    except ZeroDivisionError:
+        # steps are visited in Python only when the divisor includes zero
+        return apply_operator(divide, left, right)
+
+
+def as_expression(value):
+    """Wrap numbers as constants and variables as single columns."""
+    if isinstance(value, Expression):
+        return value
+    if isinstance(value, Variable):
+        return Column(value)
+    if isinstance(value, (int, float)):
+        return Constant(value)
+    raise TypeError(
+        "Unsupported operand '{}', use 'Expression', 'Variable' "
+        "or a number.".format(type(value).__name__)
+    )
+
+
+class Expression:
+    """
+    Base class of derived variable expressions.
+
+    Expressions are combined using arithmetic operators (+, -, *, /)
+    with other expressions, 'Variable' patterns (matching a single
+    variable) and numbers. Nothing is evaluated until the expression
+    is requested from 'DerivedResults'.
+
+    """
+
+    @property
+    def key(self):
+        """Hashable identity used to cache evaluated values."""
+        raise NotImplementedError
+
+    @property
+    def sources(self):
+        """Referenced 'Variable' patterns."""
+        raise NotImplementedError
+
+    def evaluate(self, derived_results):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return BinaryOperation("+", self, as_expression(other))
+
+    def __radd__(self, other):
+        return BinaryOperation("+", as_expression(other), self)
+
+    def __sub__(self, other):
+        return BinaryOperation("-", self, as_expression(other))
+
+    def __rsub__(self, other):
+        return BinaryOperation("-", as_expression(other), self)
+
+    def __mul__(self, other):
+        return BinaryOperation("*", self, as_expression(other))
+
+    def __rmul__(self, other):
+        return BinaryOperation("*", as_expression(other), self)
+
+    def __truediv__(self, other):
+        return BinaryOperation("/", self, as_expression(other))
+
+    def __rtruediv__(self, other):
+        return BinaryOperation("/", as_expression(other), self)
+
+    def __neg__(self):
+        return BinaryOperation("*", Constant(-1), self)
+
+
+class Constant(Expression):
+    """Number broadcast to all steps."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return repr(self.value)
+
+    @property
+    def key(self):
+        return "constant", self.value
+
+    @property
+    def sources(self):
+        return []
+
+    def evaluate(self, derived_results):
+        return self.value
+
+
+class Column(Expression):
+    """
+    Values of a single variable.
+
+    Parameters
+    ----------
+    variable : Variable
+        Pattern which needs to match exactly one variable.
+
+    """
+
+    def __init__(self, variable):
+        self.variable = variable
+
+    def __repr__(self):
+        return "Column({!r})".format(self.variable)
+
+    @property
+    def key(self):
+        return "column", self.variable
+
+    @property
+    def sources(self):
+        return [self.variable]
+
+    def evaluate(self, derived_results):
+        variables = derived_results.find_variables([self.variable])
+        if len(variables) != 1:
+            raise ValueError(
+                "{!r} matches {} variables, use 'Sum' or 'Mean' to combine "
+                "multiple variables.".format(self.variable, len(variables))
+            )
+        return derived_results.results[variables[0]]
+
+
+class Sum(Expression):
+    """
+    Sum of all matching variables at each step.
+
+    Parameters
+    ----------
+    variables : Variable or list of Variable
+        Patterns of summed variables, each variable is included only once.
+
+    """
+
+    def __init__(self, variables):
+        self.variables = (
+            (variables,) if isinstance(variables, Variable) else tuple(variables)
+        )
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, list(self.variables))
+
+    @property
+    def key(self):
+        return type(self).__name__, self.variables
+
+    @property
+    def sources(self):
+        return list(self.variables)
+
+    def get_columns(self, derived_results):
+        variables = derived_results.find_variables(self.variables)
+        if not variables:
+            raise NoResults("{!r} does not match any variable.".format(self))
+        return [derived_results.results[variable] for variable in variables]
+
+    def evaluate(self, derived_results):
+        columns = self.get_columns(derived_results)
+        if len(columns) == 1:
+            return list(columns[0])
+        return list(map(sum, zip(*columns)))
+
+
+class Mean(Sum):
+    """
+    Mean of all matching variables at each step.
+
+    Parameters
+    ----------
+    variables : Variable or list of Variable
+        Patterns of averaged variables, each variable is included only once.
+
+    """
+
+    def evaluate(self, derived_results):
+        n_columns = len(self.get_columns(derived_results))
+        # shares cached sum with 'Sum' of the same variables
+        sums = derived_results.evaluate(Sum(self.variables))
+        return apply_operator(truediv, sums, n_columns)
+
+
+class BinaryOperation(Expression):
+    """Arithmetic operation of two expressions."""
+
+    OPERATORS = {"+": add, "-": sub, "*": mul}
+
+    def __init__(self, symbol, left, right):
+        self.symbol = symbol
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return "({!r} {} {!r})".format(self.left, self.symbol, self.right)
+
+    @property
+    def key(self):
+        return self.symbol, self.left.key, self.right.key
+
+    @property
+    def sources(self):
+        return self.left.sources + self.right.sources
+
+    def evaluate(self, derived_results):
+        left = derived_results.evaluate(self.left)
+        right = derived_results.evaluate(self.right)
+        if self.symbol == "/":
+            return apply_division(left, right)
+        return apply_operator(self.OPERATORS[self.symbol], left, right)
+
+
+def get_sources(expressions):
+    """Get unique 'Variable' patterns referenced by given expressions."""
+    sources = OrderedDict()
+    for expression in expressions:
+        for variable in as_expression(expression).sources:
+            sources[variable] = None
+    return list(sources)
+
+
+class DerivedResults(Mapping):
+    """
+    Lazily evaluated derived variables.
+
+    Each expression is evaluated over whole columns when it's requested
+    for the first time. Evaluated values of all sub-expressions (sums,
+    single columns, operations) are cached so sub-expressions shared
+    by multiple derived variables are evaluated only once.
+
+    Example
+    -------
+    cooling = Sum(Variable(None, "Zone Sensible Cooling Energy", "J"))
+    electricity = Column(Variable("", "Electricity:Facility", "J"))
+    derived = DerivedResults(
+        results, {"cooling": cooling, "cop": cooling / electricity}
+    )
+    cop = derived["cop"]
+
+    Parameters
+    ----------
+    results : ResultsDictionary or CompactResultsDictionary
+        Source results, need to include all referenced variables.
+    expressions : dict of {str, Expression}
+        Named derived variables, 'Variable' patterns are treated
+        as single columns.
+    alike : default False, bool
+        Specify if full string or only part of pattern fields needs to match.
+
+    """
+
+    def __init__(self, results, expressions, alike=False):
+        self.results = results
+        self.expressions = OrderedDict(
+            (name, as_expression(expression))
+            for name, expression in expressions.items()
+        )
+        self.alike = alike
+        self._cache = {}
+
+    @property
+    def frequency(self):
+        return self.results.frequency
+
+    @property
+    def time_series(self):
+        return self.results.time_series
+
+    def __getitem__(self, name):
+        return self.evaluate(self.expressions[name])
+
+    def __iter__(self):
+        return iter(self.expressions)
+
+    def __len__(self):
+        return len(self.expressions)
+
+    def find_variables(self, patterns):
+        """Find source variables matching any of given patterns."""
+        return [
+            variable
+            for variable in self.results
+            if any(
+                is_matching_variable(pattern, variable, self.alike)
+                for pattern in patterns
+            )
+        ]
+
+    def evaluate(self, expression):
+        """Evaluate expression, values of evaluated expressions are reused."""
+        expression = as_expression(expression)
+        key = expression.key
+        if key not in self._cache:
+            self._cache[key] = expression.evaluate(self)
+        return self._cache[key]
@@ -1,11 +1,19 @@
-import os
-
+from db_eplusout_reader.compression import get_file_extension
 from db_eplusout_reader.db_esofile import DBEsoFile, DBEsoFileCollection
+from db_eplusout_reader.expressions import get_sources
 from db_eplusout_reader.sql_reader import get_results_from_sql
 
 
 def get_results(
-    file_or_path, variables, frequency, alike=False, start_date=None, end_date=None
+    file_or_path,
+    variables,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    dtype=None,
+    units=None,
+    header_table=None,
 ):
     r"""
     Extract results from given file.
@@ -33,6 +41,10 @@ def get_results(
     full or just a substring (search is always case insensitive).
 
     Start and end date optional arguments can slice resulting array based on timestamp data.
+    Bounds are found using binary search so only requested steps are copied.
+
+    Paths to .eso files are processed using default year, load 'DBEsoFile' or
+    'DBEsoFileCollection' with specific 'year' to slice dates of a given year.
 
 
     Examples
@@ -80,7 +92,8 @@ def get_results(
     ----------
     file_or_path : DBEsoFile, DBEsoFileCollection or PathLike
         A processed EnergyPlus .eso file, path to unprocessed .eso file
-        or path to unprocessed .sql file.
+        or path to unprocessed .sql file. Paths can point to compressed
+        files (.gz, .bz2, .xz).
     variables : Variable or List of Variable
         Requested output variables.
     frequency : str
@@ -92,6 +105,17 @@ def get_results(
         Lower datetime interval boundary, inclusive.
     end_date : default None, datetime.datetime
         Upper datetime interval boundary, inclusive.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Return values as typed arrays instead of lists of floats.
+        FLOAT32 halves memory but keeps only about 7 significant digits,
+        large cumulative values (energy, meters) lose absolute precision.
+    units : default None, dict of {str, str or tuple of (str, float, float)}
+        Convert units while values are being read, source units are mapped
+        to target units (i.e. {"J": "kWh", "C": "F"}) or to a custom
+        (units, scale, offset) conversion. 'Variable.units' are updated.
+    header_table : default None, HeaderTable
+        Share variables and equal headers between processed files, pass
+        the same table when reading a batch of files with the same outputs.
 
     Returns
     -------
@@ -100,7 +124,7 @@ def get_results(
 
     """
     if isinstance(file_or_path, str):
-        _, ext = os.path.splitext(file_or_path)
+        ext = get_file_extension(file_or_path)
         if ext == ".sql":
             results = get_results_from_sql(
                 file_or_path,
@@ -109,16 +133,98 @@ def get_results(
                 alike=alike,
                 start_date=start_date,
                 end_date=end_date,
+                dtype=dtype,
+                units=units,
+                header_table=header_table,
             )
         elif ext == ".eso":
-            raise NotImplementedError("Sorry, this has not been implemented yet.")
+            collection = DBEsoFileCollection.from_path(
+                file_or_path, dtype=dtype, header_table=header_table
+            )
+            results = collection.get_results(
+                variables,
+                frequency,
+                alike=alike,
+                start_date=start_date,
+                end_date=end_date,
+                units=units,
+            )
         else:
             raise TypeError("Unsupported file type '{}' provided!".format(ext))
     else:
         if isinstance(file_or_path, (DBEsoFile, DBEsoFileCollection)):
-            raise NotImplementedError("Sorry, this has not been implemented yet.")
+            results = file_or_path.get_results(
+                variables,
+                frequency,
+                alike=alike,
+                start_date=start_date,
+                end_date=end_date,
+                dtype=dtype,
+                units=units,
+            )
         else:
             raise TypeError(
                 "Unsupported class '{}' provided!".format(type(file_or_path).__name__)
             )
     return results
+
+
+def get_derived_results(
+    file_or_path,
+    expressions,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+):
+    r"""
+    Evaluate derived variables defined by expressions of 'Variable' patterns.
+
+    Only variables referenced by expressions are extracted (using
+    a single 'get_results' call), expressions are evaluated over
+    whole columns when they are accessed and shared sub-expressions
+    are evaluated only once.
+
+    Examples
+    --------
+    from db_eplusout_reader import Variable, get_derived_results
+    from db_eplusout_reader.constants import M
+    from db_eplusout_reader.expressions import Column, Sum
+
+    cooling = Sum(Variable(None, "Zone Sensible Cooling Energy", "J"))
+    electricity = Column(Variable("", "Electricity:Facility", "J"))
+
+    derived = get_derived_results(
+        r"C:\some\path\eplusout.sql",
+        {"cooling": cooling, "cop": cooling / electricity},
+        frequency=M,
+    )
+    cop = derived["cop"]
+
+    Parameters
+    ----------
+    file_or_path : DBEsoFile, DBEsoFileCollection or PathLike
+        A processed EnergyPlus .eso file or path to .eso or .sql file.
+    expressions : dict of {str, Expression}
+        Named derived variables, 'Variable' patterns need to match
+        a single variable, use 'Sum' or 'Mean' to combine multiple
+        variables. Division by zero gives a missing (nan) value.
+    frequency, alike, start_date, end_date
+        See 'get_results'.
+
+    Returns
+    -------
+    DerivedResults : Mapping of {str, list of float}
+        Derived values evaluated on first access, source
+        results are available as 'results' attribute.
+
+    """
+    results = get_results(
+        file_or_path,
+        get_sources(expressions.values()),
+        frequency,
+        alike=alike,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return results.derive(expressions, alike)
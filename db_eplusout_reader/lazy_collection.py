@@ -0,0 +1,284 @@
+import sys
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+
+from db_eplusout_reader.arrays import get_typecode
+from db_eplusout_reader.compression import is_compressed
+from db_eplusout_reader.db_esofile import DBEsoFile, DBEsoFileCollection
+from db_eplusout_reader.exceptions import IncompleteFile
+from db_eplusout_reader.processing.esofile_reader import (
+    get_environments,
+    read_eso_file,
+    read_eso_file_header,
+    validate_eso,
+)
+
+FLOAT_SIZE = sys.getsizeof(0.0)
+
+
+def estimate_size(db_eso_file):
+    """Estimate memory used by output values of given file in bytes."""
+    size = 0
+    for outputs in db_eso_file.outputs.values():
+        for values in outputs.values():
+            if isinstance(values, list):
+                size += sys.getsizeof(values) + len(values) * FLOAT_SIZE
+            else:
+                size += memoryview(values).nbytes
+    return size
+
+
+class LazyDBEsoFileCollection(DBEsoFileCollection):
+    """
+    Collection which processes environments on first access.
+
+    Only environment names and their offsets are read when the collection
+    is created. The file header is parsed on the first access and kept
+    with the offsets, each environment is then read directly from
+    its offset. Each environment is parsed (and its dates converted) once
+    it's indexed or iterated, loaded environments are kept for following
+    requests. Least recently used environments are released when their
+    estimated size exceeds 'memory_budget', the environment currently
+    being accessed is always kept.
+
+    The collection is read-only, pickled collection includes only
+    arguments needed to reopen the file.
+
+    Parameters
+    ----------
+    file_path : str
+        A path to EnergyPlus .eso file.
+    environments : list of (str, int)
+        Environment names and their offsets.
+    year : default None, int
+        Year used to convert dates.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Store outputs in typed arrays instead of lists of floats.
+    header_table : default None, HeaderTable
+        Share variables and equal headers with other processed files.
+    memory_budget : default None, int
+        Maximum estimated size of loaded outputs in bytes,
+        loaded environments are never released when not specified.
+    memory_limit : default None, int
+        Process environments out of core, see 'DBEsoFile.from_path'.
+
+    """
+
+    def __init__(
+        self,
+        file_path,
+        environments,
+        year=None,
+        dtype=None,
+        header_table=None,
+        memory_budget=None,
+        memory_limit=None,
+    ):
+        self.file_path = file_path
+        self.environments = environments
+        self.year = year
+        self.dtype = dtype
+        self.header_table = header_table
+        self.memory_budget = memory_budget
+        self.memory_limit = memory_limit
+        self._file_header = None
+        self._loaded = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_path(
+        cls,
+        file_path,
+        year=None,
+        environments=None,
+        dtype=None,
+        header_table=None,
+        memory_budget=None,
+        save_index=False,
+        memory_limit=None,
+    ):
+        """
+        Open eso file without processing its environments.
+
+        Arguments match 'DBEsoFile.from_path', use 'memory_budget'
+        to limit size of loaded environments and 'save_index' to
+        store environment offsets in a sidecar file.
+
+        """
+        if dtype is not None:
+            get_typecode(dtype)
+        if not is_compressed(file_path) and not validate_eso(file_path):
+            raise IncompleteFile("File '{}' is not complete!".format(file_path))
+        return cls(
+            file_path,
+            get_environments(file_path, environments, save_index),
+            year=year,
+            dtype=dtype,
+            header_table=header_table,
+            memory_budget=memory_budget,
+            memory_limit=memory_limit,
+        )
+
+    def __reduce__(self):
+        return (
+            type(self),
+            (
+                self.file_path,
+                self.environments,
+                self.year,
+                self.dtype,
+                None,
+                self.memory_budget,
+                self.memory_limit,
+            ),
+        )
+
+    def _copy(self, environments, header_table, file_header, loaded):
+        new = type(self)(
+            self.file_path,
+            environments,
+            year=self.year,
+            dtype=self.dtype,
+            header_table=header_table,
+            memory_budget=self.memory_budget,
+            memory_limit=self.memory_limit,
+        )
+        new._file_header = file_header
+        new._loaded.update(loaded)
+        new._sizes.update((index, self._sizes[index]) for index in loaded)
+        return new
+
+    def __copy__(self):
+        with self._lock:
+            return self._copy(
+                list(self.environments),
+                self.header_table,
+                self._file_header,
+                self._loaded,
+            )
+
+    def __deepcopy__(self, memo):
+        with self._lock:
+            return self._copy(
+                deepcopy(self.environments, memo),
+                deepcopy(self.header_table, memo),
+                deepcopy(self._file_header, memo),
+                deepcopy(self._loaded, memo),
+            )
+
+    @property
+    def environment_names(self):
+        return [name for name, _ in self.environments]
+
+    @property
+    def loaded_environment_names(self):
+        """Names of environments currently held in memory."""
+        with self._lock:
+            return [self.environments[i][0] for i in self._loaded]
+
+    @property
+    def loaded_size(self):
+        """Estimated size of loaded outputs in bytes."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _get_file_header(self):
+        if self._file_header is None:
+            self._file_header = read_eso_file_header(self.file_path, self.header_table)
+        return self._file_header
+
+    def _read_environment(self, index):
+        _, offset = self.environments[index]
+        all_raw_outputs = read_eso_file(
+            self.file_path,
+            [offset],
+            dtype=self.dtype,
+            header_table=self.header_table,
+            memory_limit=self.memory_limit,
+            file_header=self._get_file_header(),
+        )
+        return DBEsoFile._from_raw_outputs(all_raw_outputs[0], self.year)
+
+    def _evict(self, keep):
+        if self.memory_budget is None:
+            return
+        for index in list(self._loaded):
+            if sum(self._sizes.values()) <= self.memory_budget:
+                break
+            if index != keep:
+                self.unload(index)
+
+    def load(self, index):
+        """
+        Get processed environment, process it if it's not loaded yet.
+
+        Parameters
+        ----------
+        index : int
+            Position of the environment in the collection.
+
+        Returns
+        -------
+        DBEsoFile
+            Processed environment.
+
+        """
+        index = range(len(self.environments))[index]
+        with self._lock:
+            db_eso_file = self._loaded.get(index)
+            if db_eso_file is None:
+                db_eso_file = self._read_environment(index)
+                self._loaded[index] = db_eso_file
+                self._sizes[index] = estimate_size(db_eso_file)
+            else:
+                self._loaded.move_to_end(index)
+            self._evict(index)
+            return db_eso_file
+
+    def unload(self, index=None):
+        """Release given or all loaded environments."""
+        with self._lock:
+            indexes = list(self._loaded) if index is None else [index]
+            for i in indexes:
+                self._loaded.pop(i, None)
+                self._sizes.pop(i, None)
+
+    def __len__(self):
+        return len(self.environments)
+
+    def count(self):
+        return len(self.environments)
+
+    def __iter__(self):
+        for index in range(len(self.environments)):
+            yield self.load(index)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            indexes = range(len(self.environments))[item]
+            return [self.load(index) for index in indexes]
+        return self.load(item)
+
+    def __contains__(self, item):
+        with self._lock:
+            return any(item is db_eso_file for db_eso_file in self._loaded.values())
+
+    def index(self, item):
+        with self._lock:
+            for index, db_eso_file in self._loaded.items():
+                if item is db_eso_file:
+                    return index
+        raise ValueError("Given file is not loaded in the collection.")
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Lazy collection cannot be modified.")
+
+    append = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def _pack(self):
+        raise TypeError(
+            "Lazy collection cannot be packed, use 'DBEsoFileCollection' "
+            "with loaded environments instead."
+        )
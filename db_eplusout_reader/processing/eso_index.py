@@ -0,0 +1,209 @@
+import json
+import os
+
+from db_eplusout_reader.compression import open_binary
+
+INDEX_VERSION = 1
+INDEX_EXTENSION = ".idx"
+SCAN_CHUNK_SIZE = 1024 * 1024
+
+END_OF_DICTIONARY = b"End of Data Dictionary"
+ENVIRONMENT_MARKER = b"\n1,"
+
+
+class EsoIndex:
+    def __init__(self, size, mtime, header_end, environments):
+        """
+        Byte offsets of environments included in an eso file.
+
+        Parameters
+        ----------
+        size : int
+            Size of the indexed file in bytes.
+        mtime : float
+            Last modification time of the indexed file.
+        header_end : int
+            Offset of the first line following 'End of Data Dictionary'.
+        environments : list of (str, int)
+            Environment names and offsets of their environment lines.
+
+        """
+        self.size = size
+        self.mtime = mtime
+        self.header_end = header_end
+        self.environments = environments
+
+    @property
+    def environment_names(self):
+        return [name for name, _ in self.environments]
+
+    def is_valid_for(self, file_path):
+        """Check if the index still describes given file."""
+        stat = os.stat(file_path)
+        return self.size == stat.st_size and self.mtime == stat.st_mtime
+
+    def get_offsets(self, environment_names):
+        """
+        Find offsets of requested environments.
+
+        Names are matched case-insensitively, offsets are
+        returned in the same order as environments appear
+        in the file.
+
+        Returns
+        -------
+        list of int or None
+            Matched offsets, None if any of the environments is missing.
+
+        """
+        requested = {name.strip().upper() for name in environment_names}
+        offsets = []
+        for name, offset in self.environments:
+            if name.upper() in requested:
+                offsets.append(offset)
+                requested.discard(name.upper())
+        return None if requested else offsets
+
+    def to_dict(self):
+        return {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime": self.mtime,
+            "header_end": self.header_end,
+            "environments": [list(environment) for environment in self.environments],
+        }
+
+    @classmethod
+    def from_dict(cls, dct):
+        return cls(
+            size=dct["size"],
+            mtime=dct["mtime"],
+            header_end=dct["header_end"],
+            environments=[(name, offset) for name, offset in dct["environments"]],
+        )
+
+
+def get_index_path(file_path):
+    """Return path of the sidecar index file."""
+    return file_path + INDEX_EXTENSION
+
+
+def find_header_end(file):
+    """Return offset of the first body line in a binary eso file."""
+    for line in iter(file.readline, b""):
+        if line.startswith(END_OF_DICTIONARY):
+            return file.tell()
+    return None
+
+
+def parse_environment_name(line):
+    """Extract environment name from raw environment line bytes."""
+    return line.split(b",", 2)[1].strip().decode("utf-8", "replace")
+
+
+def scan_environments(file):
+    """
+    Find environment lines in a binary eso file.
+
+    The body is searched in large chunks for the environment line
+    marker, numeric lines are not split nor converted.
+
+    Returns
+    -------
+    tuple of (int, list of (str, int))
+        Header end offset and environment names with their offsets.
+
+    """
+    environments = []
+    header_end = find_header_end(file)
+    if header_end is None:
+        return None, environments
+
+    # start on a new line character preceding the first body line
+    file.seek(header_end - 1)
+    buffer_offset = header_end - 1
+    buffer = b""
+    while True:
+        chunk = file.read(SCAN_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        start = 0
+        keep = None
+        while True:
+            i = buffer.find(ENVIRONMENT_MARKER, start)
+            if i == -1:
+                break
+            end = buffer.find(b"\n", i + 1)
+            if end == -1:
+                # environment line is split between chunks
+                keep = i
+                break
+            name = parse_environment_name(buffer[i + 1 : end])
+            environments.append((name, buffer_offset + i + 1))
+            start = end
+        if keep is None:
+            # marker can be split between chunks
+            keep = max(start, len(buffer) - len(ENVIRONMENT_MARKER) + 1)
+        buffer = buffer[keep:]
+        buffer_offset += keep
+    return header_end, environments
+
+
+def build_index(file_path):
+    """Scan given eso file and create environment index."""
+    stat = os.stat(file_path)
+    with open_binary(file_path) as file:
+        header_end, environments = scan_environments(file)
+    return EsoIndex(stat.st_size, stat.st_mtime, header_end, environments)
+
+
+def read_index(index_path):
+    """Load index from sidecar file, return None if it cannot be read."""
+    try:
+        with open(index_path, "r") as file:
+            dct = json.load(file)
+    except (IOError, OSError, ValueError):
+        return None
+    if dct.get("version") != INDEX_VERSION:
+        return None
+    return EsoIndex.from_dict(dct)
+
+
+def write_index(index, index_path):
+    """Store index in sidecar file, failure to write is ignored."""
+    try:
+        with open(index_path, "w") as file:
+            json.dump(index.to_dict(), file)
+    except (IOError, OSError):
+        pass
+
+
+def get_index(file_path, save_index=False):
+    """
+    Get environment index for given eso file.
+
+    Sidecar index is reused when it matches current file size
+    and modification time, otherwise the file is scanned again.
+
+    Parameters
+    ----------
+    file_path : str
+        A path to EnergyPlus .eso file.
+    save_index : default False, bool
+        Store the index next to the file as '<file_path>.idx'.
+
+    Returns
+    -------
+    EsoIndex
+        Environment offsets.
+
+    """
+    index_path = get_index_path(file_path)
+    index = read_index(index_path)
+    if index is not None and index.is_valid_for(file_path):
+        return index
+    index = build_index(file_path)
+    if save_index:
+        write_index(index, index_path)
+    return index
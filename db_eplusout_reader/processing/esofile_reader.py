@@ -1,16 +1,37 @@
+import os
 import re
-from collections import defaultdict, namedtuple
 from datetime import datetime
-from functools import partial
 
+from db_eplusout_reader.arrays import get_typecode
+from db_eplusout_reader.compression import (
+    READ_BUFFER_SIZE,
+    is_compressed,
+    open_binary,
+    open_text,
+)
 from db_eplusout_reader.constants import RP, TS, A, D, H, M
 from db_eplusout_reader.exceptions import (
     BlankLineError,
+    EnvironmentNotFound,
     IncompleteFile,
     InvalidLineSyntax,
 )
+from db_eplusout_reader.processing.eso_index import get_index
 from db_eplusout_reader.processing.esofile_time import EsoTimestamp
-from db_eplusout_reader.processing.raw_eso_data import RawOutputData
+from db_eplusout_reader.processing.header_cache import (
+    get_header_cache,
+    get_header_fingerprint,
+)
+from db_eplusout_reader.processing.header_table import (  # noqa: F401
+    Header,
+    HeaderTable,
+    Variable,
+)
+from db_eplusout_reader.processing.raw_eso_data import (
+    RawOutputData,
+    RawSpilledData,
+    RawSummaryData,
+)
 
 ENVIRONMENT_LINE = 1
 TIMESTEP_OR_HOURLY_LINE = 2
@@ -19,7 +40,37 @@ MONTHLY_LINE = 4
 RUNPERIOD_LINE = 5
 ANNUAL_LINE = 6
 
-Variable = namedtuple("Variable", "key type units")
+END_OF_DATA_LINE = b"End of Data"
+RECORDS_WRITTEN_LINE = b"Number of Records Written="
+TAIL_SIZE = 4096
+
+
+def is_matching_variable(requested_variable, variable, alike):
+    """
+    Check if variable matches 'Variable' request.
+
+    None fields match anything, 'alike' fields are matched as
+    case-insensitive substrings (same as SQL 'LIKE').
+
+    """
+    for requested_field, field in zip(requested_variable, variable):
+        if requested_field is None:
+            continue
+        if alike and requested_field.lower() not in field.lower():
+            return False
+        if not alike and requested_field != field:
+            return False
+    return True
+
+
+def find_header_ids(header, variables, alike=False):
+    """Find ids of all header variables matching any of requested variables."""
+    return {
+        id_
+        for frequency_header in header.values()
+        for variable, id_ in frequency_header.items()
+        if any(is_matching_variable(v, variable, alike) for v in variables)
+    }
 
 
 def get_eso_file_version(raw_version):
@@ -76,18 +127,48 @@ def process_header_line(line):
     return line_id, key, type_, units, frequency.lower()
 
 
-def read_header(eso_file):
+def read_raw_header(eso_file):
+    """Read raw header lines until 'End of Data Dictionary' line is reached."""
+    raw_lines = []
+    while True:
+        raw_line = next(eso_file)
+        if "End of Data Dictionary" in raw_line:
+            return raw_lines
+        raw_lines.append(raw_line)
+
+
+def parse_header(raw_lines, header_table=None):
+    """Process raw header lines into a header dictionary."""
+    header_table = HeaderTable() if header_table is None else header_table
+    header = Header()
+    for raw_line in raw_lines:
+        try:
+            line_id, key, type_, units, frequency = process_header_line(raw_line)
+        except AttributeError:
+            if raw_line == "\n":
+                raise BlankLineError("Empty line!")
+            raise InvalidLineSyntax("Unexpected line syntax: '{}'!".format(raw_line))
+        variable = header_table.get_variable(key, type_, units)
+        header.setdefault(frequency, {})[variable] = line_id
+    return header_table.get_header(header)
+
+
+def read_header(eso_file, header_table=None):
     """
     Read header dictionary of the eso file.
 
     The file is being read line by line until the 'End of TableType Dictionary'
-    is reached. Raw line is processed and the line is added as an item to
-    the header_dict dictionary.
+    is reached. When the process wide header cache is enabled (using
+    'configure_header_cache'), raw lines are hashed and the header is taken
+    from the cache if the same lines have already been processed, otherwise
+    each raw line is processed and added as an item to the header dictionary.
 
     Parameters
     ----------
     eso_file : EsoFile
         Opened EnergyPlus result file.
+    header_table : default None, HeaderTable
+        Table used to share variables and headers between files.
 
     Returns
     -------
@@ -95,18 +176,17 @@ def read_header(eso_file):
         A dictionary of eso file header line with populated values.
 
     """
-    header = defaultdict(partial(defaultdict))
-    while True:
-        raw_line = next(eso_file)
-        try:
-            line_id, key, type_, units, frequency = process_header_line(raw_line)
-        except AttributeError:
-            if "End of Data Dictionary" in raw_line:
-                break
-            if raw_line == "\n":
-                raise BlankLineError("Empty line!")
-            raise InvalidLineSyntax("Unexpected line syntax: '{}'!".format(raw_line))
-        header[frequency][Variable(key, type_, units)] = line_id
+    raw_lines = read_raw_header(eso_file)
+    header_cache = get_header_cache()
+    if not header_cache.enabled:
+        return parse_header(raw_lines, header_table)
+    fingerprint = get_header_fingerprint(raw_lines)
+    header = header_cache.get(fingerprint)
+    if header is None:
+        header = parse_header(raw_lines, header_table)
+        header_cache.set(fingerprint, header)
+    elif header_table is not None:
+        header = header_table.get_header(header)
     return header
 
 
@@ -209,11 +289,27 @@ def split_raw_line(raw_line):
     return line_id, line
 
 
-def process_frequency_line(line_id, line, all_raw_outputs, header, raw_outputs):
+def process_frequency_line(
+    line_id,
+    line,
+    all_raw_outputs,
+    header,
+    raw_outputs,
+    summary_ids=None,
+    dtype=None,
+    memory_limit=None,
+):
     if line_id == ENVIRONMENT_LINE:
+        if raw_outputs is not None:
+            raw_outputs.finish()
         # initialize variables for current environment
         environment_name = line[0].strip()
-        raw_outputs = RawOutputData(environment_name, header)
+        if summary_ids is not None:
+            raw_outputs = RawSummaryData(environment_name, header, summary_ids)
+        elif memory_limit is not None:
+            raw_outputs = RawSpilledData(environment_name, header, dtype, memory_limit)
+        else:
+            raw_outputs = RawOutputData(environment_name, header, dtype)
         all_raw_outputs.append(raw_outputs)
         frequency = None
     else:
@@ -234,12 +330,31 @@ def process_frequency_line(line_id, line, all_raw_outputs, header, raw_outputs):
     return raw_outputs, frequency
 
 
-def read_body(eso_file, highest_frequency_id, header):
+def is_end_of_data(raw_line):
+    """Check if non numeric body line ends data, raise error for unexpected lines."""
+    if "End of Data" in raw_line:
+        return True
+    if raw_line == "\n":
+        raise BlankLineError("Empty line!")
+    raise InvalidLineSyntax("Unexpected line syntax: '{}'!".format(raw_line))
+
+
+def read_body(
+    eso_file,
+    highest_frequency_id,
+    header,
+    max_environments=None,
+    all_raw_outputs=None,
+    summary_ids=None,
+    dtype=None,
+    memory_limit=None,
+):
     """
     Read body of the eso file.
 
     The line from eso file is processed line by line until the
-    'End of Data' is reached.
+    'End of Data' is reached or until the environment following
+    the last allowed one starts.
 
     Index 1-5 for eso file generated prior to E+ 8.9 or 1-6 from E+ 8.9
     further, indicates that line is an frequency.
@@ -252,16 +367,31 @@ def read_body(eso_file, highest_frequency_id, header):
         A maximum index defining an frequency (higher is considered a result)
     header : dict of {str: dict of {Variable : list of int}}
         Processed header dictionary.
+    max_environments : default None, int
+        Stop reading once given number of environments has been processed.
+    all_raw_outputs : default None, list of RawOutputData
+        Previously processed data, outputs are appended to the last
+        environment. Lines need to start with an environment or a frequency line.
+    summary_ids : default None, set of int
+        Keep only running statistics (count, sum, sum of squares, min and max
+        with their step index) of given outputs, values are not stored and
+        other outputs are skipped without being parsed.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Store outputs of new environments in typed arrays.
+    memory_limit : default None, int
+        Buffer only about given number of bytes of outputs of new
+        environments, other outputs are moved into temporary files.
 
     Returns
     -------
-    list of RawOutputData
+    list of RawOutputData or RawSummaryData
         Processed ESO file data.
 
     """
-    all_raw_outputs = []
-    raw_outputs = None
+    all_raw_outputs = [] if all_raw_outputs is None else all_raw_outputs
+    raw_outputs = all_raw_outputs[-1] if all_raw_outputs else None
     frequency = None
+    step = None
     while True:
         raw_line = next(eso_file)
         try:
@@ -269,26 +399,65 @@ def read_body(eso_file, highest_frequency_id, header):
 
             # distribute outputs into relevant bins
             if line_id <= highest_frequency_id:
+                is_last = len(all_raw_outputs) == max_environments
+                if line_id == ENVIRONMENT_LINE and is_last:
+                    break
                 raw_outputs, frequency = process_frequency_line(
-                    line_id, line, all_raw_outputs, header, raw_outputs
+                    line_id,
+                    line,
+                    all_raw_outputs,
+                    header,
+                    raw_outputs,
+                    summary_ids,
+                    dtype,
+                    memory_limit,
                 )
-            else:
+                if frequency is not None:
+                    step = len(raw_outputs.dates[frequency]) - 1
+            elif summary_ids is None:
                 # current line represents a result, replace nan values from the last step
                 res = float(line[0])
                 raw_outputs.outputs[frequency][line_id][-1] = res
+            elif line_id in summary_ids:
+                raw_outputs.outputs[frequency][line_id].update(float(line[0]), step)
 
         except ValueError:
-            if "End of Data" in raw_line:
+            if is_end_of_data(raw_line):
                 break
-            if raw_line == "\n":
-                raise BlankLineError("Empty line!")
-            raise InvalidLineSyntax("Unexpected line syntax: '{}'!".format(raw_line))
 
     return all_raw_outputs
 
 
-def read_file(file):
-    """Read raw EnergyPlus output file."""
+def read_environments(
+    file,
+    highest_frequency_id,
+    header,
+    offsets,
+    summary_ids=None,
+    dtype=None,
+    memory_limit=None,
+):
+    """Read only environments starting at given offsets."""
+    all_raw_outputs = []
+    for offset in offsets:
+        file.seek(offset)
+        raw_outputs = read_body(
+            file,
+            highest_frequency_id,
+            header,
+            max_environments=1,
+            summary_ids=summary_ids,
+            dtype=dtype,
+            memory_limit=memory_limit,
+        )
+        for environment_outputs in raw_outputs:
+            environment_outputs.finish()
+        all_raw_outputs.extend(raw_outputs)
+    return all_raw_outputs
+
+
+def read_file_header(file, header_table=None):
+    """Read statement, standard frequencies and header of raw EnergyPlus output file."""
     # process first few standard lines, ignore timestamp
     version, _ = process_statement_line(next(file))
     last_standard_item_id = 6 if version >= 890 else 5
@@ -299,16 +468,223 @@ def read_file(file):
 
     # Read header to obtain a header dictionary of EnergyPlus
     # outputs and initialize dictionary for output values
-    header = read_header(file)
+    header = read_header(file, header_table)
+    return last_standard_item_id, header
+
+
+def read_file(
+    file,
+    offsets=None,
+    summary_variables=None,
+    alike=False,
+    dtype=None,
+    header_table=None,
+    memory_limit=None,
+    file_header=None,
+):
+    """
+    Read raw EnergyPlus output file.
+
+    Previously read 'file_header' can be passed to skip parsing the header,
+    body of the file is then read only from given offsets.
+
+    """
+    if file_header is None:
+        last_standard_item_id, header = read_file_header(file, header_table)
+    else:
+        last_standard_item_id, header = file_header
+    summary_ids = None
+    if summary_variables is not None:
+        summary_ids = find_header_ids(header, summary_variables, alike)
 
     # Read body to obtain outputs and environment dictionaries
-    return read_body(file, last_standard_item_id, header)
+    if offsets is None:
+        all_raw_outputs = read_body(
+            file,
+            last_standard_item_id,
+            header,
+            summary_ids=summary_ids,
+            dtype=dtype,
+            memory_limit=memory_limit,
+        )
+        if all_raw_outputs:
+            # preceding environments are finished once the next one starts
+            all_raw_outputs[-1].finish()
+        return all_raw_outputs
+    return read_environments(
+        file, last_standard_item_id, header, offsets, summary_ids, dtype, memory_limit
+    )
+
+
+def get_environments(file_path, environments=None, save_index=False):
+    """Find names and offsets of requested environments using environment index."""
+    index = get_index(file_path, save_index=save_index)
+    if environments is None:
+        return list(index.environments)
+    environments = [environments] if isinstance(environments, str) else environments
+    offsets = index.get_offsets(environments)
+    if offsets is None:
+        raise EnvironmentNotFound(
+            "Cannot find environments {} in file '{}'. "
+            "Available environments are: {}.".format(
+                environments, file_path, index.environment_names
+            )
+        )
+    offsets = set(offsets)
+    return [(name, offset) for name, offset in index.environments if offset in offsets]
+
+
+def get_environment_offsets(file_path, environments, save_index):
+    """Find offsets of requested environments using environment index."""
+    return [
+        offset for _, offset in get_environments(file_path, environments, save_index)
+    ]
+
+
+def read_tail(file_path, size=TAIL_SIZE):
+    """Read last bytes of the file, compressed files need to be read through."""
+    if is_compressed(file_path):
+        tail = b""
+        with open_binary(file_path) as file:
+            for chunk in iter(lambda: file.read(READ_BUFFER_SIZE), b""):
+                tail = (tail + chunk)[-size:]
+        return tail
+    with open(file_path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        file.seek(max(0, file.tell() - size))
+        return file.read()
+
+
+def validate_eso(file_path):
+    """
+    Check if eso file has been completely written.
+
+    Only the end of the file is read, the last lines need to include
+    'End of Data' line, optionally followed by the number of records
+    written. Compressed files need to be decompressed to reach the end.
+
+    Parameters
+    ----------
+    file_path : str
+        A path to EnergyPlus .eso file.
+
+    Returns
+    -------
+    bool
+        True if the file is complete, False otherwise.
+
+    """
+    lines = [line.strip() for line in read_tail(file_path).splitlines()]
+    lines = [line for line in lines if line]
+    if lines and lines[-1].startswith(RECORDS_WRITTEN_LINE):
+        try:
+            int(lines.pop().split(b"=")[1])
+        except ValueError:
+            return False
+    return bool(lines) and lines[-1] == END_OF_DATA_LINE
+
+
+def process_eso_file(
+    file_path,
+    environments=None,
+    save_index=False,
+    summary_variables=None,
+    alike=False,
+    dtype=None,
+    header_table=None,
+    memory_limit=None,
+):
+    """
+    Trigger eso file processing.
+
+    Parameters
+    ----------
+    file_path : str
+        A path to EnergyPlus .eso file, compressed files
+        (.eso.gz, .eso.bz2, .eso.xz) are decoded on the fly.
+    environments : default None, str or list of str
+        Process only given environments, all environments
+        are processed when not specified.
+    save_index : default False, bool
+        Store environment offsets in a sidecar file so
+        following requests do not need to scan the file.
+    summary_variables : default None, list of Variable
+        Compute only running statistics of matching outputs
+        instead of storing all values.
+    alike : default False, bool
+        Match summary variables by substrings.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Store outputs in typed arrays instead of lists.
+    header_table : default None, HeaderTable
+        Share variables and equal headers with other processed files.
+    memory_limit : default None, int
+        Keep only about given number of bytes of outputs in memory while
+        processing, full chunks of outputs are written into temporary files
+        and processed outputs are memory-mapped. Outputs are stored as
+        FLOAT64 unless 'dtype' is specified.
+
+    Returns
+    -------
+    list of RawOutputData or RawSummaryData
+        Processed ESO file data.
+
+    Raises
+    ------
+    IncompleteFile
+        Is raised when the file does not end with 'End of Data' line.
+
+    """
+    if dtype is not None:
+        # raise unsupported dtype error before line errors are handled
+        get_typecode(dtype)
+    # check the end of uncompressed file before processing
+    if not is_compressed(file_path) and not validate_eso(file_path):
+        raise IncompleteFile("File '{}' is not complete!".format(file_path))
+    offsets = None
+    if environments is not None:
+        offsets = get_environment_offsets(file_path, environments, save_index)
+    return read_eso_file(
+        file_path,
+        offsets,
+        summary_variables,
+        alike,
+        dtype,
+        header_table,
+        memory_limit,
+    )
+
+
+def read_eso_file(
+    file_path,
+    offsets=None,
+    summary_variables=None,
+    alike=False,
+    dtype=None,
+    header_table=None,
+    memory_limit=None,
+    file_header=None,
+):
+    """Open and read eso file, optionally only environments at given offsets."""
+    try:
+        with open_text(file_path) as file:
+            return read_file(
+                file,
+                offsets,
+                summary_variables,
+                alike,
+                dtype,
+                header_table,
+                memory_limit,
+                file_header,
+            )
+    except StopIteration:
+        raise IncompleteFile("File '{}' is not complete!".format(file_path))
 
 
-def process_eso_file(file_path):
-    """Trigger eso file processing."""
+def read_eso_file_header(file_path, header_table=None):
+    """Open eso file and read only its standard lines and header."""
     try:
-        with open(file_path, "r") as file:
-            return read_file(file)
+        with open_text(file_path) as file:
+            return read_file_header(file, header_table)
     except StopIteration:
         raise IncompleteFile("File '{}' is not complete!".format(file_path))
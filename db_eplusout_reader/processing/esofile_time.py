@@ -1,5 +1,6 @@
 import calendar
 import logging
+from bisect import bisect_left, bisect_right
 from collections import namedtuple
 from datetime import datetime, timedelta
 
@@ -44,9 +45,11 @@ def get_month_n_days_from_cumulative(monthly_cumulative_days):
     Raw data reports table as 31, 59..., this function calculates and returns
     actual number of days for each month 31, 28...
     """
-    old_num = monthly_cumulative_days.pop(0)
+    if not monthly_cumulative_days:
+        return []
+    old_num = monthly_cumulative_days[0]
     m_actual_days = [old_num]
-    for num in monthly_cumulative_days:
+    for num in monthly_cumulative_days[1:]:
         new_num = num - old_num
         m_actual_days.append(new_num)
         old_num += new_num
@@ -70,7 +73,7 @@ def get_num_of_days(cumulative_days):
             num_of_days[table] = values
     # calculate number of days for annual table for
     # an incomplete year run or multi year analysis
-    if A in cumulative_days.keys() and RP in cumulative_days.keys():
+    if A in cumulative_days.keys() and cumulative_days.get(RP):
         num_of_days[A] = find_num_of_days_annual(num_of_days[A], num_of_days[RP])
     return num_of_days
 
@@ -105,10 +108,13 @@ def update_start_dates(dates):
             orig[0] = ref[0].replace(hour=0, minute=0)
             return orig
 
-    timestep_to_monthly_dates = {k: dates[k] for k in dates if k in [TS, H, D, M]}
+    # dates can be empty when reading incomplete file
+    timestep_to_monthly_dates = {
+        k: dates[k] for k in dates if k in [TS, H, D, M] and dates[k]
+    }
     if timestep_to_monthly_dates:
         for frequency in (M, A, RP):
-            if frequency in dates:
+            if dates.get(frequency):
                 dates[frequency] = set_start_date(
                     dates[frequency], timestep_to_monthly_dates
                 )
@@ -244,3 +250,35 @@ def convert_raw_date_data(
         year = year if year else 2002
     dates = convert_raw_dates(raw_dates, year)
     return update_start_dates(dates)
+
+
+def get_date_bounds(dates, start_date=None, end_date=None):
+    """
+    Find index bounds of dates lying between start and end dates.
+
+    Dates need to be sorted, bounds are found using binary
+    search so no dates are visited.
+
+    Parameters
+    ----------
+    dates : list of datetime
+        Sorted dates.
+    start_date : default None, datetime.datetime
+        Lower datetime interval boundary, inclusive.
+    end_date : default None, datetime.datetime
+        Upper datetime interval boundary, inclusive.
+
+    Returns
+    -------
+    tuple of (int, int)
+        Start and stop index to be used as a slice.
+
+    """
+    start = bisect_left(dates, start_date) if start_date else 0
+    stop = bisect_right(dates, end_date) if end_date else len(dates)
+    return start, max(start, stop)
+
+
+def is_sorted(dates):
+    """Check if dates are monotonically increasing."""
+    return all(a <= b for a, b in zip(dates, dates[1:]))
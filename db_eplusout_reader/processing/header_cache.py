@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from db_eplusout_reader.processing.header_table import Header, Variable
+
+HEADER_CACHE_VERSION = 2
+HEADER_CACHE_EXTENSION = ".header"
+# cached headers are shared by all files with the same dictionary so the cache is opt-in
+DEFAULT_MAX_HEADERS = 0
+
+
+def get_header_fingerprint(raw_lines):
+    """Calculate hash of raw header lines."""
+    digest = hashlib.sha1()
+    for raw_line in raw_lines:
+        digest.update(raw_line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class HeaderCache:
+    """
+    Processed headers stored by fingerprint of their raw lines.
+
+    Parametric runs of the same model share byte-identical dictionaries,
+    files with a known fingerprint reuse already processed header (and
+    its output bin ids) instead of parsing all header lines again.
+
+    Parameters
+    ----------
+    max_headers : default 0, int
+        Number of headers kept in memory, least recently used headers
+        are discarded first, zero disables in-memory cache. Files
+        with a cached header share the same header instance so
+        headers must not be modified.
+    cache_dir : default None, str
+        Store processed headers as JSON files in given directory so
+        they can be reused by other processes. Files are only parsed
+        as data, invalid files are ignored.
+
+    """
+
+    def __init__(self, max_headers=DEFAULT_MAX_HEADERS, cache_dir=None):
+        self.max_headers = max_headers
+        self.cache_dir = cache_dir
+        self._headers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._headers)
+
+    @property
+    def enabled(self):
+        """Check if headers are stored in memory or in cache directory."""
+        return self.max_headers > 0 or self.cache_dir is not None
+
+    def _get_path(self, fingerprint):
+        return os.path.join(self.cache_dir, fingerprint + HEADER_CACHE_EXTENSION)
+
+    def _read(self, fingerprint):
+        """Load header from cache directory, return None if it cannot be read."""
+        try:
+            with open(self._get_path(fingerprint), "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data["version"] != HEADER_CACHE_VERSION:
+                return None
+            header = Header()
+            for frequency, variables in data["header"]:
+                header[frequency] = {
+                    Variable(key, type_, units): id_
+                    for key, type_, units, id_ in variables
+                }
+        except (IOError, OSError, ValueError, TypeError, KeyError):
+            return None
+        return header
+
+    def _write(self, fingerprint, header):
+        """Store header in cache directory, failure to write is ignored."""
+        path = self._get_path(fingerprint)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        data = {
+            "version": HEADER_CACHE_VERSION,
+            "header": [
+                [frequency, [list(variable) + [id_] for variable, id_ in ids.items()]]
+                for frequency, ids in header.items()
+            ],
+        }
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp_path, path)
+        except (IOError, OSError):
+            pass
+
+    def _store(self, fingerprint, header):
+        if self.max_headers <= 0:
+            return
+        with self._lock:
+            self._headers[fingerprint] = header
+            while len(self._headers) > self.max_headers:
+                self._headers.popitem(last=False)
+
+    def get(self, fingerprint):
+        """
+        Find processed header with given fingerprint.
+
+        Returns
+        -------
+        Header or None
+            Stored header, None if fingerprint is not known.
+
+        """
+        with self._lock:
+            header = self._headers.get(fingerprint)
+            if header is not None:
+                self._headers.move_to_end(fingerprint)
+                return header
+        if self.cache_dir is not None:
+            header = self._read(fingerprint)
+            if header is not None:
+                self._store(fingerprint, header)
+        return header
+
+    def set(self, fingerprint, header):
+        """Store processed header, header must not be modified afterwards."""
+        self._store(fingerprint, header)
+        if self.cache_dir is not None:
+            self._write(fingerprint, header)
+
+    def clear(self):
+        """Remove headers stored in memory, cache directory is kept."""
+        with self._lock:
+            self._headers.clear()
+
+
+_HEADER_CACHE = HeaderCache()
+
+
+def get_header_cache():
+    """Get process wide header cache."""
+    return _HEADER_CACHE
+
+
+def configure_header_cache(max_headers=DEFAULT_MAX_HEADERS, cache_dir=None):
+    """
+    Replace process wide header cache.
+
+    Parameters
+    ----------
+    max_headers : default 0, int
+        Number of headers kept in memory, zero disables in-memory cache.
+    cache_dir : default None, str
+        Directory used to share processed headers between processes.
+
+    Returns
+    -------
+    HeaderCache
+        New process wide cache.
+
+    """
+    global _HEADER_CACHE
+    _HEADER_CACHE = HeaderCache(max_headers, cache_dir)
+    return _HEADER_CACHE
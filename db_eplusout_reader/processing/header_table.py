@@ -0,0 +1,118 @@
+from collections import defaultdict, namedtuple
+from sys import intern
+
+Variable = namedtuple("Variable", "key type units")
+
+
+class Header(dict):
+    """
+    Processed header dictionary of {frequency: {Variable: id}}.
+
+    Output ids of each frequency are collected once and reused to set up
+    output bins of all environments (and files) sharing the header.
+
+    Headers are shared, missing frequencies are not added on lookup,
+    use 'header.get(frequency, {})' for frequencies which may not exist.
+
+    """
+
+    @property
+    def bin_ids(self):
+        """Output ids of each frequency, header must not change once used."""
+        try:
+            return self._bin_ids
+        except AttributeError:
+            self._bin_ids = {
+                frequency: tuple(ids.values()) for frequency, ids in self.items()
+            }
+            return self._bin_ids
+
+
+def get_bin_ids(header):
+    """Get output ids of each frequency of given header."""
+    if isinstance(header, Header):
+        return header.bin_ids
+    return {frequency: tuple(ids.values()) for frequency, ids in header.items()}
+
+
+def intern_string(value):
+    """Return a canonical instance of the string representation of the value."""
+    return intern(str(value))
+
+
+def get_header_hash(header):
+    """Calculate order independent hash of header variables and ids."""
+    return hash(
+        tuple(
+            (frequency, frozenset(variables.items()))
+            for frequency, variables in sorted(header.items())
+        )
+    )
+
+
+class HeaderTable:
+    """
+    Shared table of output variables and headers.
+
+    Large models repeat the same keys, types and units thousands of times
+    and parametric runs usually share the whole dictionary. Strings are
+    interned and each distinct 'Variable' is created only once, headers
+    equal to already stored headers are replaced by the stored instance
+    so the same table can be passed when processing a batch of files.
+
+    Stored headers are shared between results, they must not be modified.
+
+    Example
+    -------
+    header_table = HeaderTable()
+    collections = [
+        DBEsoFileCollection.from_path(path, header_table=header_table)
+        for path in paths
+    ]
+
+    """
+
+    def __init__(self):
+        self._variables = {}
+        self._headers = defaultdict(list)
+
+    def get_variable(self, key, type_, units):
+        """Return a shared 'Variable' instance with interned fields."""
+        fields = (key, type_, units)
+        try:
+            return self._variables[fields]
+        except KeyError:
+            variable = Variable(*map(intern_string, fields))
+            # namedtuple is equal to a plain tuple, raw fields are stored
+            # as well when they differ from their string representation
+            variable = self._variables.setdefault(variable, variable)
+            self._variables[fields] = variable
+            return variable
+
+    def get_header(self, header):
+        """
+        Return a stored header equal to given one.
+
+        Parameters
+        ----------
+        header : dict of {str, dict of {Variable, int}}
+            Processed header dictionary.
+
+        Returns
+        -------
+        dict of {str, dict of {Variable, int}}
+            Already stored equal header or the given header
+            which is stored for following requests.
+
+        """
+        headers = self._headers[get_header_hash(header)]
+        for stored_header in headers:
+            if stored_header == header:
+                return stored_header
+        headers.append(header)
+        return header
+
+    def clear(self):
+        """Remove all stored variables and headers."""
+        self._variables.clear()
+        self._headers.clear()
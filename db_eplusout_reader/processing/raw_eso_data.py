@@ -1,12 +1,18 @@
+import mmap
+import tempfile
+from array import array
 from collections import defaultdict
 
-from db_eplusout_reader.constants import RP, A, M
+from db_eplusout_reader.arrays import get_typecode
+from db_eplusout_reader.constants import FLOAT64, RP, A, M
+from db_eplusout_reader.processing.header_table import get_bin_ids
 
 
 class RawOutputData:
-    def __init__(self, environment_name, header):
+    def __init__(self, environment_name, header, dtype=None):
         self.environment_name = environment_name
         self.header = header
+        self.dtype = dtype
         (
             self.outputs,
             self.dates,
@@ -19,16 +25,185 @@ class RawOutputData:
         dates = {}
         cumulative_days = {}
         days_of_week = {}
-        for frequency, variables in self.header.items():
+        for frequency, ids in get_bin_ids(self.header).items():
             dates[frequency] = []
             if frequency in (M, A, RP):
                 cumulative_days[frequency] = []
             else:
                 days_of_week[frequency] = []
-            for id_ in variables.values():
-                outputs[frequency][id_] = []
+            outputs[frequency] = self.initialize_outputs(ids)
         return outputs, dates, cumulative_days, days_of_week
 
+    def initialize_outputs(self, ids):
+        if self.dtype is None:
+            return {id_: [] for id_ in ids}
+        typecode = get_typecode(self.dtype)
+        return {id_: array(typecode) for id_ in ids}
+
     def initialize_next_outputs_step(self, frequency):
         for value in self.outputs[frequency].values():
             value.append(float("nan"))
+
+    def finish(self):
+        """Finalize outputs once the environment has been read."""
+
+
+class VariableSummary:
+    """Running statistics of a single output."""
+
+    __slots__ = (
+        "count",
+        "total",
+        "sum_squares",
+        "minimum",
+        "minimum_step",
+        "maximum",
+        "maximum_step",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.sum_squares = 0.0
+        self.minimum = float("inf")
+        self.minimum_step = None
+        self.maximum = float("-inf")
+        self.maximum_step = None
+
+    def update(self, value, step):
+        self.count += 1
+        self.total += value
+        self.sum_squares += value * value
+        # first occurrence is kept when the same extreme value is repeated
+        if value < self.minimum:
+            self.minimum = value
+            self.minimum_step = step
+        if value > self.maximum:
+            self.maximum = value
+            self.maximum_step = step
+
+
+class RawSummaryData(RawOutputData):
+    """
+    Raw data storing running statistics instead of output values.
+
+    Only outputs with requested ids are tracked, memory used
+    does not depend on number of steps (apart from dates).
+
+    """
+
+    def __init__(self, environment_name, header, ids):
+        self.ids = ids
+        super().__init__(environment_name, header)
+
+    def initialize_outputs(self, ids):
+        return {id_: VariableSummary() for id_ in ids if id_ in self.ids}
+
+    def initialize_next_outputs_step(self, frequency):
+        # steps are identified by their date index, there's nothing to append
+        pass
+
+
+class RawSpilledData(RawOutputData):
+    """
+    Raw data keeping only a fixed number of steps in memory.
+
+    Outputs of each frequency are buffered in chunks, full chunks
+    are written into a temporary file (all columns of the chunk
+    one after another). Once the environment has been read, chunks
+    are copied into a single temporary file so each column is stored
+    contiguously and outputs are replaced by read-only memoryviews
+    of the memory-mapped file.
+
+    Parameters
+    ----------
+    environment_name : str
+        A name of the environment.
+    header : dict of {str, dict of {Variable, int}}
+        Processed header dictionary.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Type of stored outputs, FLOAT64 is used when not specified.
+    memory_limit : int
+        Approximate size of buffered outputs in bytes.
+
+    """
+
+    def __init__(self, environment_name, header, dtype=None, memory_limit=0):
+        dtype = FLOAT64 if dtype is None else dtype
+        self.typecode = get_typecode(dtype)
+        super().__init__(environment_name, header, dtype)
+        itemsize = array(self.typecode).itemsize
+        n_columns = sum(len(ids) for ids in get_bin_ids(header).values())
+        self.chunk_size = max(1, memory_limit // max(1, n_columns * itemsize))
+        self._chunk_steps = dict.fromkeys(self.outputs, 0)
+        self._chunk_lengths = {frequency: [] for frequency in self.outputs}
+        self._spill_files = {}
+        self._finished = False
+
+    def initialize_next_outputs_step(self, frequency):
+        if self._chunk_steps[frequency] == self.chunk_size:
+            self.spill(frequency)
+        self._chunk_steps[frequency] += 1
+        super().initialize_next_outputs_step(frequency)
+
+    def spill(self, frequency):
+        """Write buffered steps of given frequency into its temporary file."""
+        if self._chunk_steps[frequency] == 0:
+            return
+        spill_file = self._spill_files.get(frequency)
+        if spill_file is None:
+            spill_file = tempfile.TemporaryFile(prefix="eso_chunks_")
+            self._spill_files[frequency] = spill_file
+        for column in self.outputs[frequency].values():
+            column.tofile(spill_file)
+            del column[:]
+        self._chunk_lengths[frequency].append(self._chunk_steps[frequency])
+        self._chunk_steps[frequency] = 0
+
+    def _copy_chunks(self, frequency, storage, offsets):
+        """Copy spilled chunks into contiguous columns starting at given offsets."""
+        spill_file = self._spill_files.pop(frequency)
+        itemsize = array(self.typecode).itemsize
+        try:
+            spill_file.seek(0)
+            n_steps = 0
+            for length in self._chunk_lengths[frequency]:
+                n_bytes = length * itemsize
+                block = memoryview(spill_file.read(n_bytes * len(offsets)))
+                for i, offset in enumerate(offsets):
+                    storage.seek(offset + n_steps * itemsize)
+                    storage.write(block[i * n_bytes : (i + 1) * n_bytes])
+                n_steps += length
+        finally:
+            spill_file.close()
+
+    def finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        itemsize = array(self.typecode).itemsize
+        layout = {}
+        size = 0
+        for frequency, ids in get_bin_ids(self.header).items():
+            self.spill(frequency)
+            n_steps = len(self.dates[frequency])
+            layout[frequency] = [size + i * n_steps * itemsize for i in range(len(ids))]
+            size += len(ids) * n_steps * itemsize
+        if size == 0:
+            self._spill_files.clear()
+            return
+        with tempfile.TemporaryFile(prefix="eso_outputs_") as storage:
+            storage.truncate(size)
+            for frequency, offsets in layout.items():
+                if frequency in self._spill_files:
+                    self._copy_chunks(frequency, storage, offsets)
+            storage.flush()
+            # mapped memory stays valid after the file is closed
+            buffer = memoryview(
+                mmap.mmap(storage.fileno(), size, access=mmap.ACCESS_READ)
+            )
+        for frequency, offsets in layout.items():
+            n_bytes = len(self.dates[frequency]) * itemsize
+            outputs = self.outputs[frequency]
+            for id_, offset in zip(get_bin_ids(self.header)[frequency], offsets):
+                outputs[id_] = buffer[offset : offset + n_bytes].cast(self.typecode)
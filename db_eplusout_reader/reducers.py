@@ -0,0 +1,349 @@
+import math
+import os
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from itertools import islice
+
+from db_eplusout_reader.get_results import get_results
+
+DEFAULT_BATCH_SIZE = 4
+
+
+def drop_nan(values):
+    """Skip missing (nan) values."""
+    return [value for value in values if value == value]
+
+
+class Reducer:
+    """
+    Base class of mergeable aggregates.
+
+    Values of each variable of a single file are reduced to a partial
+    aggregate using 'create', partial aggregates of different files
+    are combined using 'merge' and converted to a final value using
+    'result'. Partial aggregates must not depend on the number of
+    reduced files so memory stays constant.
+
+    """
+
+    def create(self, values):
+        raise NotImplementedError
+
+    def merge(self, partial, other):
+        raise NotImplementedError
+
+    def result(self, partial):
+        return partial
+
+
+class Sum(Reducer):
+    """Sum of all values."""
+
+    def create(self, values):
+        return math.fsum(drop_nan(values))
+
+    def merge(self, partial, other):
+        return partial + other
+
+
+class Count(Reducer):
+    """Number of values, missing values are not counted."""
+
+    def create(self, values):
+        return len(drop_nan(values))
+
+    def merge(self, partial, other):
+        return partial + other
+
+
+class Min(Reducer):
+    """Minimum value, None when there are no values."""
+
+    def create(self, values):
+        return min(drop_nan(values), default=None)
+
+    def merge(self, partial, other):
+        return min((v for v in (partial, other) if v is not None), default=None)
+
+
+class Max(Reducer):
+    """Maximum value, None when there are no values."""
+
+    def create(self, values):
+        return max(drop_nan(values), default=None)
+
+    def merge(self, partial, other):
+        return max((v for v in (partial, other) if v is not None), default=None)
+
+
+class Mean(Reducer):
+    """Mean of all values."""
+
+    def create(self, values):
+        values = drop_nan(values)
+        return math.fsum(values), len(values)
+
+    def merge(self, partial, other):
+        return partial[0] + other[0], partial[1] + other[1]
+
+    def result(self, partial):
+        total, count = partial
+        return total / count if count else None
+
+
+class ElementwiseSum(Reducer):
+    """Sum of values at each step, all files need to have the same steps."""
+
+    def create(self, values):
+        return array("d", values), 1
+
+    def merge(self, partial, other):
+        sums, count = partial
+        other_sums, other_count = other
+        if len(sums) != len(other_sums):
+            raise ValueError(
+                "Cannot merge {} and {} steps, files need to have "
+                "the same number of steps.".format(len(sums), len(other_sums))
+            )
+        return array("d", map(float.__add__, sums, other_sums)), count + other_count
+
+    def result(self, partial):
+        return partial[0]
+
+
+class ElementwiseMean(ElementwiseSum):
+    """Mean of values at each step, all files need to have the same steps."""
+
+    def result(self, partial):
+        sums, count = partial
+        return array("d", (value / count for value in sums))
+
+
+class Histogram(Reducer):
+    """
+    Number of values in fixed bins.
+
+    Fixed bins make histograms of different files exactly mergeable.
+    Counts include values below the first and above the last edge
+    so there's one more count than there are edges.
+
+    Parameters
+    ----------
+    edges : list of float
+        Ascending bin edges, bins include their lower edge.
+
+    """
+
+    def __init__(self, edges):
+        self.edges = sorted(edges)
+
+    def create(self, values):
+        counts = [0] * (len(self.edges) + 1)
+        for value in drop_nan(values):
+            counts[bisect_right(self.edges, value)] += 1
+        return counts
+
+    def merge(self, partial, other):
+        return [count + other_count for count, other_count in zip(partial, other)]
+
+
+class Percentile(Histogram):
+    """
+    Percentile estimated from fixed bins histogram.
+
+    Result is interpolated within the bin including requested rank,
+    the error is at most the bin width. Values outside of edges
+    are clipped to the first or the last edge.
+
+    Parameters
+    ----------
+    q : float
+        Percentile between 0 and 100.
+    edges : list of float
+        Ascending bin edges.
+
+    """
+
+    def __init__(self, q, edges):
+        super().__init__(edges)
+        if not 0 <= q <= 100:
+            raise ValueError("Percentile must be between 0 and 100.")
+        self.q = q
+
+    def result(self, partial):
+        total = sum(partial)
+        if total == 0:
+            return None
+        rank = self.q / 100.0 * total
+        cumulative = 0
+        for i, count in enumerate(partial):
+            if count and cumulative + count >= rank:
+                if i == 0:
+                    return self.edges[0]
+                if i == len(self.edges):
+                    return self.edges[-1]
+                lower, upper = self.edges[i - 1], self.edges[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.edges[-1]
+
+
+def merge_partials(reducers, partials, other):
+    """Merge partial aggregates of other files into 'partials'."""
+    for name, reducer in reducers.items():
+        aggregates = partials.setdefault(name, OrderedDict())
+        for variable, partial in other.get(name, {}).items():
+            if variable in aggregates:
+                partial = reducer.merge(aggregates[variable], partial)
+            aggregates[variable] = partial
+    return partials
+
+
+def reduce_file(file_or_path, reducers, kwargs):
+    """Reduce results of a single file to partial aggregates."""
+    results = get_results(file_or_path, **kwargs)
+    return {
+        name: OrderedDict(
+            (variable, reducer.create(values)) for variable, values in results.items()
+        )
+        for name, reducer in reducers.items()
+    }
+
+
+def reduce_batch(files_or_paths, reducers, kwargs):
+    """Reduce files one by one, only a single file is held in memory."""
+    partials = {}
+    for file_or_path in files_or_paths:
+        merge_partials(reducers, partials, reduce_file(file_or_path, reducers, kwargs))
+    return partials
+
+
+def iter_batches(files_or_paths, batch_size):
+    iterator = iter(files_or_paths)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def create_executor(executor, workers):
+    """Create a thread or process pool."""
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(
+        "Invalid executor '{}', use 'thread', 'process' "
+        "or an 'Executor' instance.".format(executor)
+    )
+
+
+def reduce_concurrently(executor, batches, reducers, kwargs, max_pending):
+    """Submit batches keeping at most 'max_pending' of them in flight."""
+    partials = {}
+    pending = set()
+    for batch in batches:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                merge_partials(reducers, partials, future.result())
+        pending.add(executor.submit(reduce_batch, batch, reducers, kwargs))
+    for future in wait(pending)[0]:
+        merge_partials(reducers, partials, future.result())
+    return partials
+
+
+def reduce_results(
+    files_or_paths,
+    variables,
+    frequency,
+    reducers,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    units=None,
+    executor=None,
+    workers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Aggregate results of many files.
+
+    Each task reduces a batch of files to partial aggregates of each
+    variable, partial aggregates are merged as soon as the task is
+    done. Only a limited number of batches is submitted at once so
+    memory does not depend on the number of files.
+
+    Example
+    -------
+    results = reduce_results(
+        paths,
+        Variable("", "Electricity:Facility", "J"),
+        RP,
+        {"mean": Mean(), "p90": Percentile(90, edges=range(0, 10**11, 10**8))},
+        executor="process",
+    )
+    mean = results["mean"][Variable("", "Electricity:Facility", "J")]
+
+    Parameters
+    ----------
+    files_or_paths : iterable of str, DBEsoFile or DBEsoFileCollection
+        Processed files or paths to .eso or .sql files, see 'get_results'.
+    variables : Variable or List of Variable
+        Requested output variables.
+    frequency : str
+        An output interval, this can be one of {TS, H, D, M, A, RP} constants.
+    reducers : dict of {str, Reducer}
+        Named aggregates applied to values of each variable.
+    alike, start_date, end_date, units
+        See 'get_results'.
+    executor : default None, {'thread', 'process'} or Executor
+        Reduce batches on a new thread or process pool or using given
+        executor, files are reduced in the calling thread when not specified.
+    workers : default None, int
+        Number of workers of created pool, it also limits number
+        of submitted batches (twice the number of workers).
+    batch_size : default 4, int
+        Number of files reduced by a single task.
+
+    Returns
+    -------
+    dict of {str, OrderedDict of {Variable, object}}
+        Results of each reducer for all found variables.
+
+    """
+    kwargs = dict(
+        variables=variables,
+        frequency=frequency,
+        alike=alike,
+        start_date=start_date,
+        end_date=end_date,
+        units=units,
+    )
+    batches = iter_batches(files_or_paths, batch_size)
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    if executor is None:
+        partials = {}
+        for batch in batches:
+            merge_partials(reducers, partials, reduce_batch(batch, reducers, kwargs))
+    elif isinstance(executor, Executor):
+        partials = reduce_concurrently(executor, batches, reducers, kwargs, max_pending)
+    else:
+        with create_executor(executor, workers) as pool:
+            partials = reduce_concurrently(pool, batches, reducers, kwargs, max_pending)
+    return {
+        name: OrderedDict(
+            (variable, reducer.result(partial))
+            for variable, partial in partials.get(name, {}).items()
+        )
+        for name, reducer in reducers.items()
+    }
@@ -1,12 +1,208 @@
 import csv
 import sys
+from array import array
 from collections import OrderedDict
-
+from collections.abc import Mapping
+from copy import deepcopy
+
+from db_eplusout_reader.analysis import (
+    get_histogram,
+    get_percentile,
+    get_top_n,
+    sort_values,
+)
+from db_eplusout_reader.arrays import (
+    get_column_types,
+    get_typecode,
+    pack_columns,
+    restore_column_types,
+    split_columns,
+    unpack_object,
+)
+from db_eplusout_reader.constants import FLOAT64
 from db_eplusout_reader.exceptions import InvalidShape, NoResults
+from db_eplusout_reader.expressions import DerivedResults
 from db_eplusout_reader.processing.esofile_reader import Variable
+from db_eplusout_reader.processing.esofile_time import get_date_bounds
+
+
+class ResultsMixin:
+    """Shared functionality of results dictionaries."""
+
+    def _slice_steps(self, start, stop):
+        raise NotImplementedError
+
+    def get_date_bounds(self, start_date=None, end_date=None):
+        """Find slice bounds of sorted 'time_series' using binary search."""
+        if self.time_series is None:
+            raise ValueError("Cannot find date bounds, 'time_series' is not set.")
+        return get_date_bounds(self.time_series, start_date, end_date)
+
+    def slice(self, start_date=None, end_date=None):
+        """
+        Get results between start and end dates (both inclusive).
+
+        Time series needs to be sorted, bounds are found using
+        binary search and only values within the bounds are copied.
+
+        """
+        start, stop = self.get_date_bounds(start_date, end_date)
+        return self._slice_steps(start, stop)
+
+    def load_duration_curve(self):
+        """
+        Get values of each variable sorted from the largest one.
+
+        Missing values are skipped, the result does not have 'time_series'.
+
+        Returns
+        -------
+        ResultsDictionary
+            Sorted values, typed arrays keep their type.
+
+        """
+        rd = ResultsDictionary(self.frequency)
+        for variable, values in self.items():
+            rd[variable] = sort_values(values, reverse=True)
+        return rd
+
+    def percentile(self, q):
+        """
+        Calculate percentile of each variable.
+
+        Parameters
+        ----------
+        q : float or list of float
+            Percentile (or percentiles) between 0 and 100, values
+            are interpolated linearly between the closest ranks.
+
+        Returns
+        -------
+        OrderedDict of {Variable, float or list of float}
+            Percentiles, None if variable does not have any values.
+
+        """
+        percentiles = OrderedDict()
+        for variable, values in self.items():
+            sorted_values = sort_values(values)
+            if isinstance(q, (int, float)):
+                percentiles[variable] = get_percentile(sorted_values, q)
+            else:
+                percentiles[variable] = [get_percentile(sorted_values, p) for p in q]
+        return percentiles
+
+    def histogram(self, bins=10):
+        """
+        Count values of each variable in bins.
+
+        Parameters
+        ----------
+        bins : default 10, int or list of float
+            Number of equal bins between minimum and maximum value
+            of each variable or ascending bin edges shared by all
+            variables. The last bin includes its upper edge.
+
+        Returns
+        -------
+        OrderedDict of {Variable, tuple of (list of int, list of float)}
+            Counts and edges of each variable.
+
+        """
+        histograms = OrderedDict()
+        for variable, values in self.items():
+            histograms[variable] = get_histogram(sort_values(values), bins)
+        return histograms
+
+    def top_n(self, n):
+        """
+        Find 'n' largest values of each variable.
+
+        Values are found using partial selection, the whole
+        column is not sorted.
+
+        Returns
+        -------
+        OrderedDict of {Variable, list of (datetime, float)}
+            Timestamps and values ordered from the largest value,
+            step indexes are used when 'time_series' is not set.
+
+        """
+        peaks = OrderedDict()
+        for variable, values in self.items():
+            peaks[variable] = get_top_n(values, n, self.time_series)
+        return peaks
+
+    def derive(self, expressions, alike=False):
+        """
+        Define derived variables evaluated lazily over whole columns.
+
+        Parameters
+        ----------
+        expressions : dict of {str, Expression}
+            Named expressions, see 'db_eplusout_reader.expressions'.
+        alike : default False, bool
+            Specify if full string or only part of pattern fields needs to match.
+
+        Returns
+        -------
+        DerivedResults
+            Mapping of names and values evaluated on first access.
+
+        """
+        return DerivedResults(self, expressions, alike)
+
+    def to_table(self, explode_header=True):
+        """
+        Get results in a table like format.
+
+        Parameters
+        ----------
+        explode_header : bool
+            Split variable into multiple rows if true,
+            otherwise put one variable into one row.
+
+        Returns
+        -------
+        list of list of {float, str or datetime}
+            Table like nested list of lists.
+
+        """
+        return ResultsHandler.convert_dict_to_table(self, explode_header)
+
+    def to_csv(
+        self, path, explode_header=True, delimiter=",", append=False, title="", **kwargs
+    ):
+        """
+        Save results as a csv file.
+
+        Parameters
+        ----------
+        path : os.PathLike
+            Defines a file path of the csv file.
+        explode_header : bool
+            Split variable into multiple rows if true,
+            otherwise put one variable into one cell.
+        delimiter : str, default ","
+            Csv delimiter character.
+        append : bool, default False
+            Add results below the last row instead of replacing the .csv.
+        title : str
+            Add row with given text.
+        **kwargs
+            Key word arguments passed to csv writer.
+
+        Returns
+        -------
+            None
+
+        """
+        table = ResultsHandler.convert_dict_to_table(self, explode_header)
+        ResultsWriter.write_table_to_csv(
+            table, path, delimiter, append, title, **kwargs
+        )
 
 
-class ResultsDictionary(OrderedDict):
+class ResultsDictionary(ResultsMixin, OrderedDict):
     """
     A dictionary like class with enhanced functionality to easily extract output arrays.
 
@@ -39,83 +235,255 @@ class ResultsDictionary(OrderedDict):
         self.frequency = frequency
         self.time_series = None
 
+    def _check_not_empty(self):
+        if not self:
+            raise NoResults("Cannot get items, Results dictionary is empty. ")
+
     @property
     def _items(self):
-        if self:
-            return list(self.items())
-        raise NoResults("Cannot get items, Results dictionary is empty. ")
+        self._check_not_empty()
+        return list(self.items())
+
+    @property
+    def _first_item(self):
+        self._check_not_empty()
+        return next(iter(self.items()))
 
     @property
     def scalar(self):
         try:
-            return self._items[0][1][0]
+            return self._first_item[1][0]
         except IndexError:
             raise NoResults("Cannot get scalar value, first array is empty!")
 
     @property
     def first_array(self):
-        return self._items[0][1]
+        return self._first_item[1]
 
     @property
     def first_variable(self):
-        return self._items[0][0]
+        return self._first_item[0]
 
     @property
     def variables(self):
-        return [v[0] for v in self._items]
+        self._check_not_empty()
+        return list(self.keys())
 
     @property
     def arrays(self):
-        return [v[1] for v in self._items]
+        self._check_not_empty()
+        return list(self.values())
+
+    def _slice_steps(self, start, stop):
+        rd = ResultsDictionary(self.frequency)
+        for variable, values in self.items():
+            rd[variable] = values[start:stop]
+        if self.time_series is not None:
+            rd.time_series = self.time_series[start:stop]
+        return rd
+
+    def _pack(self):
+        """Get constructor arguments with values packed into a typed array."""
+        columns = list(self.values())
+        args = (
+            self.frequency,
+            list(self.keys()),
+            self.time_series,
+            get_column_types(columns),
+        )
+        return args, [pack_columns(columns)]
 
-    def to_table(self, explode_header=True):
-        """
-        Get results in a table like format.
+    @classmethod
+    def _unpack(cls, args, blocks):
+        frequency, variables, time_series, column_types = args
+        columns = split_columns(blocks[0], len(variables))
+        rd = cls(frequency)
+        for variable, values in zip(
+            variables, restore_column_types(columns, column_types)
+        ):
+            rd[variable] = values
+        rd.time_series = time_series
+        return rd
+
+    def __reduce__(self):
+        # values are sent as a single buffer instead of lists of floats,
+        # columns are converted back into their original type when unpickled
+        try:
+            return unpack_object, (type(self),) + self._pack()
+        except (InvalidShape, TypeError):
+            # values cannot be stored in a typed array
+            return super().__reduce__()
+
+    def __copy__(self):
+        rd = type(self)(self.frequency)
+        rd.update(self)
+        rd.time_series = self.time_series
+        return rd
+
+    def __deepcopy__(self, memo):
+        # packed form is used only for pickling, copies keep original columns
+        rd = type(self)(self.frequency)
+        memo[id(self)] = rd
+        for variable, values in self.items():
+            rd[variable] = deepcopy(values, memo)
+        rd.time_series = deepcopy(self.time_series, memo)
+        return rd
+
+    def to_compact(self, dtype=FLOAT64):
+        """Copy results into a CompactResultsDictionary."""
+        return CompactResultsDictionary.from_arrays(
+            self.frequency, self.variables, self.arrays, self.time_series, dtype
+        )
 
-        Parameters
-        ----------
-        explode_header : bool
-            Split variable into multiple rows if true,
-            otherwise put one variable into one row.
 
-        Returns
-        -------
-        list of list of {float, str or datetime}
-            Table like nested list of lists.
+class CompactResultsDictionary(ResultsMixin, Mapping):
+    """
+    Read-only results dictionary backed by a single typed array.
 
-        """
-        return ResultsHandler.convert_dict_to_table(self, explode_header)
+    Values are stored column by column in one contiguous block
+    of 'n_variables x n_steps' values. Columns are returned as
+    memoryview slices of the block so no values are copied,
+    all properties are O(1).
 
-    def to_csv(
-        self, path, explode_header=True, delimiter=",", append=False, title="", **kwargs
-    ):
-        """
-        Save results as a csv file.
+    Parameters
+    ----------
+    frequency : str
+        EnergyPlus reporting interval.
+    variables : list of Variable
+        Variables in column order.
+    block : array.array
+        Values stored column by column.
+    time_series : default None, list of datetime
+        Result timestamps.
 
-        Parameters
-        ----------
-        path : os.PathLike
-            Defines a file path of the csv file.
-        explode_header : bool
-            Split variable into multiple rows if true,
-            otherwise put one variable into one cell.
-        delimiter : str, default ","
-            Csv delimiter character.
-        append : bool, default False
-            Add results below the last row instead of replacing the .csv.
-        title : str
-            Add row with given text.
-        **kwargs
-            Key word arguments passed to csv writer.
+    Raises
+    ------
+    NoResults
+        Is raised wne there are no relevant results to be fetched.
 
-        Returns
-        -------
-            None
+    """
 
-        """
-        table = ResultsHandler.convert_dict_to_table(self, explode_header)
-        ResultsWriter.write_table_to_csv(
-            table, path, delimiter, append, title, **kwargs
+    def __init__(self, frequency, variables, block, time_series=None):
+        self.frequency = frequency
+        self.time_series = time_series
+        self.block = block
+        self._variables = list(variables)
+        self._index = {variable: i for i, variable in enumerate(self._variables)}
+        n_variables = len(self._variables)
+        self.n_steps = len(block) // n_variables if n_variables else 0
+        if self.n_steps * n_variables != len(block):
+            raise InvalidShape("Block size does not match number of variables.")
+        view = memoryview(block)
+        self._typecode = view.format
+        self._columns = [
+            view[i * self.n_steps : (i + 1) * self.n_steps] for i in range(n_variables)
+        ]
+
+    @classmethod
+    def from_arrays(cls, frequency, variables, arrays, time_series=None, dtype=FLOAT64):
+        """Copy arrays of equal length into a single block."""
+        block = array(get_typecode(dtype))
+        n_steps = None
+        for values in arrays:
+            if n_steps is not None and len(values) != n_steps:
+                raise InvalidShape("Cannot create block, arrays have different length.")
+            n_steps = len(values)
+            block.extend(values)
+        return cls(frequency, variables, block, time_series)
+
+    def __getitem__(self, variable):
+        return self._columns[self._index[variable]]
+
+    def __iter__(self):
+        return iter(self._variables)
+
+    def __len__(self):
+        return len(self._variables)
+
+    def __contains__(self, variable):
+        return variable in self._index
+
+    def _check_not_empty(self):
+        if not self._variables:
+            raise NoResults("Cannot get items, Results dictionary is empty. ")
+
+    @property
+    def scalar(self):
+        self._check_not_empty()
+        if not self.n_steps:
+            raise NoResults("Cannot get scalar value, first array is empty!")
+        return self.block[0]
+
+    @property
+    def first_array(self):
+        self._check_not_empty()
+        return self._columns[0]
+
+    @property
+    def first_variable(self):
+        self._check_not_empty()
+        return self._variables[0]
+
+    @property
+    def variables(self):
+        """Variables in column order, returned list must not be modified."""
+        self._check_not_empty()
+        return self._variables
+
+    @property
+    def arrays(self):
+        """Column views in variable order, returned list must not be modified."""
+        self._check_not_empty()
+        return self._columns
+
+    def _pack(self):
+        block = self.block
+        if not isinstance(block, array):
+            block = array(self._typecode)
+            block.frombytes(memoryview(self.block).cast("B"))
+        return (self.frequency, self._variables, self.time_series), [block]
+
+    @classmethod
+    def _unpack(cls, args, blocks):
+        frequency, variables, time_series = args
+        return cls(frequency, variables, blocks[0], time_series)
+
+    def __reduce__(self):
+        return unpack_object, (type(self),) + self._pack()
+
+    def __copy__(self):
+        return type(self)(self.frequency, self._variables, self.block, self.time_series)
+
+    def __deepcopy__(self, memo):
+        # views of shared memory are copied into a typed array
+        block = array(self._typecode)
+        block.frombytes(memoryview(self.block).cast("B"))
+        time_series = deepcopy(self.time_series, memo)
+        return type(self)(self.frequency, self._variables, block, time_series)
+
+    def _slice_steps(self, start, stop):
+        return self.get_rows(start, stop)
+
+    def get_column_index(self, variable):
+        return self._index[variable]
+
+    def get_row(self, index):
+        """Get values of all variables for given step."""
+        if index < 0:
+            index += self.n_steps
+        if not 0 <= index < self.n_steps:
+            raise IndexError("Step index '{}' out of range.".format(index))
+        return self.block[index :: self.n_steps]
+
+    def get_rows(self, start=None, stop=None):
+        """Get results for a range of steps as a new CompactResultsDictionary."""
+        start, stop, _ = slice(start, stop).indices(self.n_steps)
+        block = array(self._typecode)
+        for column in self._columns:
+            block.extend(column[start:stop])
+        time_series = self.time_series[start:stop] if self.time_series else None
+        return CompactResultsDictionary(
+            self.frequency, self._variables, block, time_series
         )
 
 
@@ -160,13 +528,10 @@ class ResultsHandler:
 
         """
         header = results_dictionary.variables
-        n_rows = len(results_dictionary[header[0]])
-        table = cls._explode_header(header) if explode_header else [header]
-        for i in range(0, n_rows):
-            row = []
-            for array in results_dictionary.arrays:
-                row.append(array[i])
-            table.append(row)
+        table = cls._explode_header(header) if explode_header else [list(header)]
+        # arrays are transposed into rows in a single pass
+        for row in zip(*results_dictionary.arrays):
+            table.append(list(row))
         if results_dictionary.time_series:
             offset = len(Variable._fields) if explode_header else 1
             cls._insert_index_column(table, results_dictionary.time_series, offset)
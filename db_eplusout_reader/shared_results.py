@@ -0,0 +1,256 @@
+import os
+from array import array
+from collections.abc import Mapping
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    resource_tracker = shared_memory = None
+
+from db_eplusout_reader.arrays import unpack_object
+from db_eplusout_reader.db_esofile import DBEsoFile, DBEsoFileCollection
+
+BLOCK_ALIGNMENT = 8
+
+
+def get_shared_memory_module():
+    if shared_memory is None:
+        raise ImportError(
+            "Cannot share results, 'multiprocessing.shared_memory' "
+            "requires Python 3.8 or newer."
+        )
+    return shared_memory
+
+
+def get_tracked_name(shm):
+    """
+    Get name under which shared memory block is registered by resource tracker.
+
+    POSIX shared memory names are registered with a leading slash
+    which is stripped from the public 'SharedMemory.name'.
+
+    """
+    if os.name == "posix" and not shm.name.startswith("/"):
+        return "/" + shm.name
+    return shm.name
+
+
+def create_shared_memory(size):
+    """
+    Create shared memory block which is not tracked by this process.
+
+    Ownership of the block is passed to the receiving process, otherwise
+    the block would be removed (with a warning) when the creating
+    process exits.
+
+    """
+    module = get_shared_memory_module()
+    try:
+        return module.SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        # 'track' argument is available since Python 3.13
+        shm = module.SharedMemory(create=True, size=size)
+        if os.name == "posix":
+            resource_tracker.unregister(get_tracked_name(shm), "shared_memory")
+        return shm
+
+
+def iter_columns(results):
+    """Iterate over numeric columns of results object."""
+    if isinstance(results, DBEsoFileCollection):
+        for db_eso_file in results:
+            for column in iter_columns(db_eso_file):
+                yield column
+    elif isinstance(results, DBEsoFile):
+        for outputs in results.outputs.values():
+            for column in outputs.values():
+                yield column
+    elif isinstance(results, Mapping):
+        for column in results.values():
+            yield column
+
+
+def share_results(results):
+    """
+    Copy numeric data of given results into a shared memory block.
+
+    Only a small descriptor needs to be sent to another process,
+    the receiver can use the data directly without copying it
+    (see 'SharedResultsDescriptor.attach'), or copy it into
+    a standalone object (see 'SharedResultsDescriptor.load').
+
+    The block is not removed when this process closes it, the
+    receiver is responsible for unlinking it.
+
+    Parameters
+    ----------
+    results : DBEsoFile, DBEsoFileCollection or ResultsDictionary
+        Object to be shared, CompactResultsDictionary is supported as well.
+
+    Returns
+    -------
+    SharedResultsDescriptor
+        Picklable reference to shared data.
+
+    Example
+    -------
+    # worker process
+    def process(path):
+        return share_results(DBEsoFile.from_path(path))
+
+    # parent process
+    descriptor = executor.submit(process, path).result()
+    with descriptor.attach() as db_eso_file:
+        ...
+
+    """
+    args, blocks = results._pack()
+    layout = []
+    size = 0
+    for block in blocks:
+        n_bytes = len(block) * block.itemsize
+        layout.append((size, block.typecode, len(block)))
+        size += n_bytes + (-n_bytes % BLOCK_ALIGNMENT)
+    shm = create_shared_memory(max(size, 1))
+    try:
+        for (offset, _, _), block in zip(layout, blocks):
+            view = memoryview(block).cast("B")
+            shm.buf[offset : offset + len(view)] = view
+            view.release()
+    finally:
+        shm.close()
+    return SharedResultsDescriptor(shm.name, type(results), args, layout)
+
+
+class SharedResultsDescriptor:
+    """
+    Picklable reference to results stored in shared memory.
+
+    Parameters
+    ----------
+    name : str
+        Name of the shared memory block.
+    cls : type
+        Class of shared results.
+    args : tuple
+        Arguments needed to recreate results, numeric data excluded.
+    layout : list of (int, str, int)
+        Offset, typecode and length of each numeric block.
+
+    """
+
+    def __init__(self, name, cls, args, layout):
+        self.name = name
+        self.cls = cls
+        self.args = args
+        self.layout = layout
+
+    def _open(self):
+        return get_shared_memory_module().SharedMemory(name=self.name)
+
+    def _get_views(self, buffer):
+        views = []
+        for offset, typecode, length in self.layout:
+            n_bytes = length * array(typecode).itemsize
+            views.append(buffer[offset : offset + n_bytes].cast(typecode))
+        return views
+
+    def attach(self):
+        """Map shared data into this process without copying it."""
+        return SharedResults(self)
+
+    def load(self, unlink=True):
+        """
+        Copy shared data into a standalone object.
+
+        Parameters
+        ----------
+        unlink : default True, bool
+            Remove the shared memory block once data has been copied.
+
+        """
+        shm = self._open()
+        try:
+            blocks = []
+            for view in self._get_views(shm.buf):
+                block = array(view.format)
+                block.frombytes(view.cast("B"))
+                view.release()
+                blocks.append(block)
+        finally:
+            shm.close()
+            if unlink:
+                shm.unlink()
+        return unpack_object(self.cls, self.args, blocks)
+
+    def unlink(self):
+        """Remove the shared memory block."""
+        shm = self._open()
+        shm.close()
+        shm.unlink()
+
+
+class SharedResults:
+    """
+    Results using data stored in shared memory.
+
+    Numeric columns are memoryview slices of the shared block, the
+    block stays mapped until 'close' is called. Columns are released
+    on close so views taken from the results (i.e. 'get_results'
+    arrays) need to be copied or dropped before closing.
+
+    Can be used as a context manager which yields results object
+    and closes (and unlinks) the block on exit.
+
+    """
+
+    def __init__(self, descriptor):
+        self.descriptor = descriptor
+        self._shm = descriptor._open()
+        self._views = descriptor._get_views(self._shm.buf)
+        self.results = unpack_object(descriptor.cls, descriptor.args, self._views)
+
+    def __enter__(self):
+        return self.results
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(unlink=True)
+
+    @property
+    def closed(self):
+        return self._shm is None
+
+    def close(self, unlink=False):
+        """
+        Release shared data.
+
+        Parameters
+        ----------
+        unlink : default False, bool
+            Remove the shared memory block, data cannot be attached again.
+
+        Raises
+        ------
+        BufferError
+            If there are views derived from the results still in use.
+
+        """
+        if self._shm is None:
+            return
+        for column in iter_columns(self.results):
+            if isinstance(column, memoryview):
+                column.release()
+        for view in self._views:
+            view.release()
+        try:
+            self._shm.close()
+        except BufferError:
+            raise BufferError(
+                "Cannot close shared results '{}', views derived "
+                "from results are still in use.".format(self.descriptor.name)
+            )
+        if unlink:
+            self._shm.unlink()
+        self._shm = None
+        self._views = []
+        self.results = None
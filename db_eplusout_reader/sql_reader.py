@@ -1,16 +1,139 @@
 import os.path
 import sqlite3
+import threading
+from array import array
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-
-from db_eplusout_reader.constants import RP, TS, A, D, H, M
-from db_eplusout_reader.processing.esofile_reader import Variable
-from db_eplusout_reader.results_dict import ResultsDictionary
+from functools import partial
+from itertools import chain, islice
+from urllib.request import pathname2url
+
+from db_eplusout_reader.arrays import get_typecode, to_array
+from db_eplusout_reader.compression import get_decompressed_path
+from db_eplusout_reader.constants import FLOAT64, RP, TS, A, D, H, M
+from db_eplusout_reader.processing.esofile_time import get_date_bounds, is_sorted
+from db_eplusout_reader.processing.header_table import HeaderTable, Variable
+from db_eplusout_reader.results_dict import (
+    CompactResultsDictionary,
+    ResultsDictionary,
+)
+from db_eplusout_reader.units import convert_variable, get_conversions
 
 DATA_TABLE = "ReportData"
 DATA_DICT_TABLE = "ReportDataDictionary"
 TIME_TABLE = "Time"
 
+INTERVAL_TYPES = {TS: -1, H: 1, D: 2, M: 3, RP: 4, A: 5}
+DEFAULT_CHUNK_SIZE = 1024
+FETCH_SIZE = 8192
+MAX_ID_PARAMETERS = 500
+
+
+class ConnectionProfile:
+    def __init__(
+        self,
+        read_only=True,
+        immutable=True,
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64 * 1024,
+        temp_store_memory=True,
+        query_only=True,
+    ):
+        """
+        SQLite connection settings used to read result files.
+
+        Result files are not modified once the simulation finishes so
+        by default the file is opened read-only as immutable (no locks
+        and change detection), memory mapped and with a larger page cache.
+
+        Parameters
+        ----------
+        read_only : default True, bool
+            Open database using 'mode=ro' URI parameter.
+        immutable : default True, bool
+            Open database using 'immutable=1' URI parameter, the file
+            must not be changed while the connection is open.
+        mmap_size : default 256 MB, int or None
+            Maximum number of bytes used for memory mapped I/O.
+        cache_size : default -65536, int or None
+            Page cache size, negative value is cache size in KiB.
+        temp_store_memory : default True, bool
+            Keep temporary tables and indices in memory.
+        query_only : default True, bool
+            Prevent any changes to the database.
+
+        """
+        self.read_only = read_only
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.temp_store_memory = temp_store_memory
+        self.query_only = query_only
+
+    def get_uri(self, path):
+        """Create database URI for given path."""
+        parameters = []
+        if self.read_only:
+            parameters.append("mode=ro")
+        if self.immutable:
+            parameters.append("immutable=1")
+        uri = "file:" + pathname2url(os.path.abspath(path))
+        if parameters:
+            uri += "?" + "&".join(parameters)
+        return uri
+
+    def get_pragmas(self):
+        """Create statements applied to a new connection."""
+        pragmas = []
+        if self.mmap_size is not None:
+            pragmas.append("PRAGMA mmap_size={}".format(int(self.mmap_size)))
+        if self.cache_size is not None:
+            pragmas.append("PRAGMA cache_size={}".format(int(self.cache_size)))
+        if self.temp_store_memory:
+            pragmas.append("PRAGMA temp_store=MEMORY")
+        if self.query_only:
+            pragmas.append("PRAGMA query_only=ON")
+        return pragmas
+
+
+DEFAULT_PROFILE = ConnectionProfile()
+PLAIN_PROFILE = ConnectionProfile(
+    read_only=False,
+    immutable=False,
+    mmap_size=None,
+    cache_size=None,
+    temp_store_memory=False,
+    query_only=False,
+)
+
+
+def connect(path, profile=None, check_same_thread=True):
+    """
+    Open a connection to EnergyPlus .sql file.
+
+    Parameters
+    ----------
+    path : str
+        A path to plain or compressed EnergyPlus .sql file.
+    profile : default None, ConnectionProfile
+        Connection settings, DEFAULT_PROFILE is used when not specified.
+    check_same_thread : default True, bool
+        Allow only the creating thread to use the connection.
+
+    Returns
+    -------
+    sqlite3.Connection
+        Database connection.
+
+    """
+    profile = DEFAULT_PROFILE if profile is None else profile
+    uri = profile.get_uri(get_decompressed_path(path))
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    for pragma in profile.get_pragmas():
+        conn.execute(pragma)
+    return conn
+
 
 def to_eso_frequency(sql_frequency):
     """Convert '.sql' frequency type to '.eso'."""
@@ -86,17 +209,10 @@ def fetch_data_dict_rows(conn, variable, sql_frequency, alike):
     return res
 
 
-def to_string(unicode_variable):
-    """Convert variable unicode field names to string field names."""
-    return Variable(*map(lambda x: str(x), unicode_variable))
-
-
-def get_unsorted_sub_dict(rows):
+def get_unsorted_sub_dict(rows, header_table):
     unsorted_dict = {}
     for id_, frequency, key, type_, units in rows:
-        unicode_variable = Variable(key, type_, units)
-        variable = to_string(unicode_variable)
-        unsorted_dict[id_] = variable
+        unsorted_dict[id_] = header_table.get_variable(key, type_, units)
     return unsorted_dict
 
 
@@ -108,12 +224,13 @@ def sort_by_value(unsorted_dict):
     return sorted_dct
 
 
-def get_ids_dict(conn, variables, sql_frequency, alike):
+def get_ids_dict(conn, variables, sql_frequency, alike, header_table=None):
     """Find id : Variable pairs for given 'Variable' request."""
+    header_table = HeaderTable() if header_table is None else header_table
     all_ids_dict = OrderedDict()
     for variable in variables:
         rows = fetch_data_dict_rows(conn, variable, sql_frequency, alike)
-        ids_dict = get_unsorted_sub_dict(rows)
+        ids_dict = get_unsorted_sub_dict(rows, header_table)
         all_ids_dict.update(sort_by_value(ids_dict))
     return all_ids_dict
 
@@ -131,44 +248,93 @@ def validate_time(timestamp, start_date, end_date):
     return valid
 
 
-def get_output_rows_with_time(conn, id_):
-    """Fetch output values with associated timestamp."""
-    statement = (
-        "SELECT ReportData.Value, "
-        "Time.IntervalType, Time.Year, Time.Month, Time.Day, Time.Hour, Time.Minute"
-        " FROM ReportData"
-        " JOIN Time ON ReportData.TimeIndex = Time.TimeIndex"
-        " WHERE ReportData.ReportDataDictionaryIndex = ?"
-    )
-    return conn.execute(statement, (id_,))
+def read_values(cursor, dtype=None):
+    """
+    Read values of single column rows.
 
+    Rows are fetched in batches of 'FETCH_SIZE' rows, each batch is
+    appended to a typed array at once when 'dtype' is specified.
 
-def get_sliced_outputs(conn, id_, start_date, end_date):
-    """Get array of output values for given variable id sliced by given dates."""
-    results = []
-    for row in get_output_rows_with_time(conn, id_):
-        timestamp = parse_sql_timestamp(row[1:])
-        if validate_time(timestamp, start_date, end_date):
-            results.append(row[0])
-    return results
+    """
+    if dtype is None:
+        return list(chain.from_iterable(cursor))
+    values = array(get_typecode(dtype))
+    for rows in iter(partial(cursor.fetchmany, FETCH_SIZE), []):
+        values.fromlist([value for value, in rows])
+    return values
+
+
+def get_outputs(conn, id_, dtype=None, time_filter=None, conversion=None):
+    """
+    Get array of output values for given variable id.
 
+    Values are stored in a typed array when 'dtype' is specified.
+    Values can be limited by 'time_filter' from 'get_time_filter'.
+    Unit conversion is evaluated by SQLite as a part of the query.
 
-def get_outputs(conn, id_):
-    """Get array of output values for given variable id."""
+    """
+    column = "ReportData.Value"
+    params = (id_,)
+    if conversion is not None:
+        column = "ReportData.Value * ? + ?"
+        params = (conversion.scale, conversion.offset, id_)
     statement = (
-        "SELECT ReportData.Value FROM ReportData"
-        " WHERE ReportData.ReportDataDictionaryIndex = ?"
+        "SELECT {} FROM ReportData"
+        " WHERE ReportData.ReportDataDictionaryIndex = ?".format(column)
     )
-    return [r[0] for r in conn.execute(statement, (id_,))]
+    if time_filter is None:
+        return read_values(conn.execute(statement, params), dtype)
+    if isinstance(time_filter, tuple):
+        statement += " AND ReportData.TimeIndex BETWEEN ? AND ?"
+        return read_values(conn.execute(statement, params + time_filter), dtype)
+    statement = statement.replace("SELECT", "SELECT ReportData.TimeIndex,", 1)
+    rows = conn.execute(statement, params)
+    return to_array((value for i, value in rows if i in time_filter), dtype)
+
+
+def fetch_outputs(conn, id_, time_filter=None, dtype=None, conversion=None):
+    """Get array of output values for given variable id, optionally sliced."""
+    return get_outputs(conn, id_, dtype, time_filter, conversion)
+
+
+def fetch_outputs_concurrently(
+    path, ids, time_filter, conversions, profile, workers, dtype=None
+):
+    """
+    Get arrays of output values for given variable ids using a thread pool.
+
+    Each thread uses its own connection, arrays are returned
+    in the same order as requested ids. Unit conversions (or None)
+    are applied to variables with the same index.
+
+    """
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def fetch(id_, conversion):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = connect(path, profile, check_same_thread=False)
+            local.conn = conn
+            with lock:
+                connections.append(conn)
+        return fetch_outputs(conn, id_, time_filter, dtype, conversion)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fetch, ids, conversions))
+    finally:
+        for conn in connections:
+            conn.close()
 
 
 def dates_statement(frequency):
     """Create statement to fetch numeric output rows."""
-    switch = {TS: -1, H: 1, D: 2, M: 3, RP: 4, A: 5}
     statement = (
         "SELECT Time.IntervalType, Time.Year, Time.Month, Time.Day,"
         " Time.Hour, Time.Minute FROM Time"
-        " WHERE Time.IntervalType = {}".format(switch[frequency.lower()])
+        " WHERE Time.IntervalType = {}".format(INTERVAL_TYPES[frequency.lower()])
     )
     return statement
 
@@ -211,23 +377,124 @@ def filter_timestamps(timestamps, start_date, end_date):
     return valid_timestamps
 
 
-def get_timestamps_from_sql(path, frequency, start_date=None, end_date=None):
-    """Fetch timestamps for given frequency."""
-    conn = sqlite3.connect(path)
+def get_time_filter(conn, frequency, start_date=None, end_date=None):
+    """
+    Find timestamps and time indexes lying between start and end dates.
+
+    Timestamps are parsed only once for all variables. When timestamps
+    ordered by TimeIndex are sorted, bounds are found using binary search
+    and the filter is an inclusive range of TimeIndex values which is
+    applied in the query, otherwise it's a set of valid TimeIndex values.
 
+    Returns
+    -------
+    tuple of (list of datetime, tuple of (int, int) or set of int)
+        Valid timestamps and time filter.
+
+    """
+    statement = dates_statement(frequency).replace(
+        "SELECT", "SELECT Time.TimeIndex,", 1
+    )
+    # TimeIndex range is valid only when TimeIndex order is chronological
+    rows = conn.execute(statement + " ORDER BY Time.TimeIndex").fetchall()
+    time_indexes = [row[0] for row in rows]
+    timestamps = parse_sql_timestamps(row[1:] for row in rows)
+    if is_sorted(timestamps):
+        start, stop = get_date_bounds(timestamps, start_date, end_date)
+        if start == stop:
+            return [], (1, 0)
+        return timestamps[start:stop], (time_indexes[start], time_indexes[stop - 1])
+    valid = [
+        (i, timestamp)
+        for i, timestamp in zip(time_indexes, timestamps)
+        if validate_time(timestamp, start_date, end_date)
+    ]
+    return [timestamp for _, timestamp in valid], {i for i, _ in valid}
+
+
+def fetch_timestamps(conn, frequency, start_date=None, end_date=None):
+    """Fetch timestamps for given frequency using an open connection."""
     statement = dates_statement(frequency)
     rows = conn.execute(statement)
     timestamps = parse_sql_timestamps(rows)
 
     if start_date or end_date:
         timestamps = filter_timestamps(timestamps, start_date, end_date)
+    return timestamps
+
 
+def get_timestamps_from_sql(
+    path, frequency, start_date=None, end_date=None, profile=None
+):
+    """Fetch timestamps for given frequency."""
+    conn = connect(path, profile)
+    timestamps = fetch_timestamps(conn, frequency, start_date, end_date)
     conn.close()
     return timestamps
 
 
+def fetch_results(
+    conn,
+    variables,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    fetch_arrays=None,
+    dtype=None,
+    units=None,
+    header_table=None,
+):
+    """
+    Extract output values using an open connection.
+
+    Arguments match 'get_results_from_sql', 'fetch_arrays' can replace
+    the default sequential fetch, it receives a list of variable ids
+    with time filter and unit conversions and needs to return arrays
+    in the same order.
+
+    """
+    variables = [variables] if isinstance(variables, Variable) else variables
+    sql_frequency = to_sql_frequency(frequency)
+    header_table = HeaderTable() if header_table is None else header_table
+    ids_dict = get_ids_dict(conn, variables, sql_frequency, alike, header_table)
+    unit_conversions = get_conversions(units)
+    conversions = [unit_conversions.get(v.units) for v in ids_dict.values()]
+    time_filter = None
+    if start_date or end_date:
+        timestamps, time_filter = get_time_filter(conn, frequency, start_date, end_date)
+    else:
+        timestamps = fetch_timestamps(conn, frequency)
+    if fetch_arrays is None:
+        arrays = [
+            fetch_outputs(conn, id_, time_filter, dtype, conversion)
+            for id_, conversion in zip(ids_dict, conversions)
+        ]
+    else:
+        arrays = fetch_arrays(list(ids_dict.keys()), time_filter, conversions)
+    rd = ResultsDictionary(frequency)
+    for variable, conversion, values in zip(ids_dict.values(), conversions, arrays):
+        if conversion is not None:
+            variable = header_table.get_variable(
+                *convert_variable(variable, conversion)
+            )
+        rd[variable] = values
+    rd.time_series = timestamps
+    return rd
+
+
 def get_results_from_sql(
-    path, variables, frequency, alike=False, start_date=None, end_date=None
+    path,
+    variables,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    profile=None,
+    workers=None,
+    dtype=None,
+    units=None,
+    header_table=None,
 ):
     """
     Extract output values from given EnergyPlus .sql file.
@@ -235,7 +502,8 @@ def get_results_from_sql(
     Parameters
     ----------
     path : str
-        A path to EnergyPlus .sql file output.
+        A path to EnergyPlus .sql file output, compressed file is
+        decompressed into a temporary file which is reused on later calls.
     variables : Variable or List of Variable
         Requested output variables.
     frequency : str
@@ -247,24 +515,415 @@ def get_results_from_sql(
         Lower datetime interval boundary, inclusive.
     end_date : default None, datetime.datetime
         Upper datetime interval boundary, inclusive.
+    profile : default None, ConnectionProfile
+        SQLite connection settings, read-only immutable
+        DEFAULT_PROFILE is used when not specified.
+    workers : default None, int
+        Fetch variables concurrently using given number of threads,
+        each thread opens its own connection.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Store values directly into typed 'array.array' instead of lists,
+        arrays support buffer protocol so they can be wrapped without
+        a copy (i.e. numpy.frombuffer).
+    units : default None, dict of {str, str or tuple of (str, float, float)}
+        Convert units while fetching values (i.e. {"J": "kWh", "C": "F"}),
+        conversion is evaluated within the query and 'Variable.units'
+        are updated. See 'units.get_conversions' for details.
+    header_table : default None, HeaderTable
+        Share 'Variable' instances with results of other requests,
+        useful when reading a batch of files with the same outputs.
 
     Returns
     -------
-    ResultsDictionary : Dict of {Variable, list of float}
+    ResultsDictionary : Dict of {Variable, list of float or array.array}
 
     """
     if not os.path.exists(path):
         raise IOError("Cannot read results, file '{}' does not exist.".format(path))
-    conn = sqlite3.connect(path)
+    fetch_arrays = None
+    if workers and workers > 1:
+        fetch_arrays = partial(
+            fetch_outputs_concurrently,
+            path,
+            profile=profile,
+            workers=workers,
+            dtype=dtype,
+        )
+    conn = connect(path, profile)
+    try:
+        return fetch_results(
+            conn,
+            variables,
+            frequency,
+            alike,
+            start_date,
+            end_date,
+            fetch_arrays,
+            dtype,
+            units,
+            header_table,
+        )
+    finally:
+        conn.close()
+
+
+def iter_rows_statement(frequency, ids, time_range):
+    """
+    Create statement to fetch data rows of given frequency in stored order.
+
+    Rows are ordered by their primary key (EnergyPlus writes them step
+    by step), ordering by time index would need SQLite to sort the whole
+    result before returning the first row. Unary '+' prevents an index
+    on variable ids to be used as it would not keep stored order.
+
+    """
+    statement = (
+        "SELECT ReportData.TimeIndex, ReportData.ReportDataDictionaryIndex,"
+        " ReportData.Value FROM ReportData"
+        " JOIN Time ON ReportData.TimeIndex = Time.TimeIndex"
+        " WHERE Time.IntervalType = ?"
+    )
+    params = [INTERVAL_TYPES[frequency]]
+    if len(ids) <= MAX_ID_PARAMETERS:
+        statement += " AND +ReportData.ReportDataDictionaryIndex IN ({})".format(
+            ", ".join("?" * len(ids))
+        )
+        params.extend(ids)
+    if time_range is not None:
+        statement += " AND ReportData.TimeIndex BETWEEN ? AND ?"
+        params.extend(time_range)
+    return statement + " ORDER BY ReportData.ReportDataIndex", params
+
+
+def get_indexed_timestamps(conn, frequency, start_date=None, end_date=None):
+    """Map time indexes of given frequency to timestamps between start and end dates."""
+    statement = dates_statement(frequency).replace(
+        "SELECT", "SELECT Time.TimeIndex,", 1
+    )
+    timestamps = {}
+    for row in conn.execute(statement):
+        timestamp = parse_sql_timestamp(row[1:])
+        if validate_time(timestamp, start_date, end_date):
+            timestamps[row[0]] = timestamp
+    return timestamps
+
+
+def get_chunk_columns(ids_dict, chunk_size, units, header_table):
+    """Get block offset, scale and offset of unit conversion for each variable id."""
+    conversions = get_conversions(units)
+    columns = {}
+    variables = []
+    for i, (id_, variable) in enumerate(ids_dict.items()):
+        conversion = conversions.get(variable.units)
+        if conversion is None:
+            columns[id_] = (i * chunk_size, 1.0, 0.0)
+        else:
+            variable = header_table.get_variable(
+                *convert_variable(variable, conversion)
+            )
+            columns[id_] = (i * chunk_size, conversion.scale, conversion.offset)
+        variables.append(variable)
+    return columns, variables
+
+
+def create_chunk(frequency, variables, block, chunk_size, time_series):
+    """Create results of the first steps of a block with 'chunk_size' long columns."""
+    n_steps = len(time_series)
+    if n_steps < chunk_size:
+        view = memoryview(block)
+        block = array(view.format)
+        for i in range(len(variables)):
+            block.extend(view[i * chunk_size : i * chunk_size + n_steps])
+    return CompactResultsDictionary(frequency, variables, block, time_series)
+
+
+def iter_blocks(batches, columns, timestamps, chunk_size, empty_block):
+    """Distribute batches of time ordered rows into blocks of 'chunk_size' steps."""
+    block = empty_block[:]
+    time_series = []
+    current_index = None
+    for rows in batches:
+        for time_index, id_, value in rows:
+            column = columns.get(id_)
+            if column is None or value is None or time_index not in timestamps:
+                continue
+            if time_index != current_index:
+                if current_index is not None and time_index < current_index:
+                    raise ValueError("Output rows are not stored in time order.")
+                if len(time_series) == chunk_size:
+                    yield block, time_series
+                    block = empty_block[:]
+                    time_series = []
+                current_index = time_index
+                time_series.append(timestamps[time_index])
+            offset, scale, add = column
+            block[offset + len(time_series) - 1] = value * scale + add
+    if time_series:
+        yield block, time_series
+
+
+def iter_fetch_results(
+    conn,
+    variables,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    dtype=FLOAT64,
+    units=None,
+    header_table=None,
+):
+    """
+    Iterate over blocks of output values using an open connection.
+
+    Arguments match 'iter_results_from_sql'.
+
+    """
     variables = [variables] if isinstance(variables, Variable) else variables
+    header_table = HeaderTable() if header_table is None else header_table
     sql_frequency = to_sql_frequency(frequency)
-    ids_dict = get_ids_dict(conn, variables, sql_frequency, alike)
-    rd = ResultsDictionary(frequency)
+    ids_dict = get_ids_dict(conn, variables, sql_frequency, alike, header_table)
+    columns, chunk_variables = get_chunk_columns(
+        ids_dict, chunk_size, units, header_table
+    )
+    timestamps = get_indexed_timestamps(conn, frequency, start_date, end_date)
+    if not columns or not timestamps:
+        return
+    time_range = None
+    if start_date or end_date:
+        time_range = (min(timestamps), max(timestamps))
+    statement, params = iter_rows_statement(frequency, list(ids_dict), time_range)
+
+    empty_block = array(get_typecode(dtype), [float("nan")]) * (
+        len(columns) * chunk_size
+    )
+    cursor = conn.execute(statement, params)
+    try:
+        batches = iter(partial(cursor.fetchmany, FETCH_SIZE), [])
+        for block, time_series in iter_blocks(
+            batches, columns, timestamps, chunk_size, empty_block
+        ):
+            yield create_chunk(
+                frequency, chunk_variables, block, chunk_size, time_series
+            )
+    finally:
+        cursor.close()
+
+
+def iter_results_from_sql(
+    path,
+    variables,
+    frequency,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    profile=None,
+    dtype=FLOAT64,
+    units=None,
+    header_table=None,
+):
+    """
+    Iterate over time ordered blocks of output values.
+
+    All requested variables are read by a single query of 'ReportData'
+    joined with 'Time' and fetched in batches, only one block of values
+    is held in memory at a time.
+
+    Parameters
+    ----------
+    path : str
+        A path to EnergyPlus .sql file.
+    variables : Variable or List of Variable
+        Requested output variables.
+    frequency : str
+        An output interval, this can be one of {TS, H, D, M, A, RP} constants.
+    alike : default False, bool
+        Specify if full string or only part of variable attribute needs to match.
+    start_date : default None, datetime.datetime
+        Lower datetime interval boundary, inclusive.
+    end_date : default None, datetime.datetime
+        Upper datetime interval boundary, inclusive.
+    chunk_size : default 1024, int
+        Maximum number of steps in a block.
+    profile : default None, ConnectionProfile
+        SQLite connection settings.
+    dtype : default FLOAT64, {FLOAT64, FLOAT32}
+        Type of block values.
+    units : default None, dict of {str, str or tuple of (str, float, float)}
+        Convert units while fetching values, see 'get_results_from_sql'.
+    header_table : default None, HeaderTable
+        Share 'Variable' instances with results of other requests.
+
+    Yields
+    ------
+    CompactResultsDictionary
+        Values of up to 'chunk_size' consecutive steps for all variables,
+        'time_series' holds timestamps of the block. Steps without any
+        values of requested variables are skipped, missing values are nan.
+
+    Example
+    -------
+    for chunk in iter_results_from_sql(path, Variable(None, None, "J"), TS):
+        writer.writerows(zip(chunk.time_series, *chunk.values()))
+
+    """
+    if not os.path.exists(path):
+        raise IOError("Cannot read results, file '{}' does not exist.".format(path))
+    if chunk_size < 1:
+        raise ValueError("Chunk size needs to be a positive integer.")
+    get_typecode(dtype)
+    return _iter_results_from_sql(
+        path,
+        profile,
+        variables,
+        frequency,
+        alike,
+        start_date,
+        end_date,
+        chunk_size,
+        dtype,
+        units,
+        header_table,
+    )
+
+
+def _iter_results_from_sql(path, profile, *args):
+    conn = connect(path, profile)
+    try:
+        for chunk in iter_fetch_results(conn, *args):
+            yield chunk
+    finally:
+        conn.close()
+
+
+def top_n_statement(time_range, limit):
+    """Create statement to fetch the largest values of a variable."""
+    statement = (
+        "SELECT ReportData.TimeIndex, ReportData.Value FROM ReportData"
+        " WHERE ReportData.ReportDataDictionaryIndex = ?"
+        " AND ReportData.Value IS NOT NULL"
+    )
+    if time_range is not None:
+        statement += " AND ReportData.TimeIndex BETWEEN ? AND ?"
+    statement += " ORDER BY ReportData.Value DESC, ReportData.TimeIndex"
+    return statement + " LIMIT ?" if limit else statement
+
+
+def get_top_n_time_filter(conn, frequency, start_date=None, end_date=None):
+    """
+    Find timestamps and TimeIndex range of steps between start and end dates.
+
+    The range includes only valid steps when timestamps are sorted,
+    otherwise it can include steps which need to be skipped.
+
+    Returns
+    -------
+    tuple of (dict of {int, datetime}, tuple of (int, int) or None, bool)
+        Valid time indexes and their timestamps, inclusive TimeIndex range
+        (None when dates are not limited) and flag if the range is exact.
+
+    """
+    timestamps = get_indexed_timestamps(conn, frequency)
+    if not (start_date or end_date):
+        return timestamps, None, True
+    time_indexes = sorted(timestamps)
+    is_exact = is_sorted([timestamps[i] for i in time_indexes])
+    valid = {
+        i: timestamp
+        for i, timestamp in timestamps.items()
+        if validate_time(timestamp, start_date, end_date)
+    }
+    time_range = (min(valid), max(valid)) if valid else (1, 0)
+    return valid, time_range, is_exact
+
+
+def fetch_top_n(
+    conn,
+    variables,
+    frequency,
+    n,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    header_table=None,
+):
+    """Find the largest values using an open connection, see 'get_top_n_from_sql'."""
+    variables = [variables] if isinstance(variables, Variable) else variables
+    ids_dict = get_ids_dict(
+        conn, variables, to_sql_frequency(frequency), alike, header_table
+    )
+    timestamps, time_range, limit = get_top_n_time_filter(
+        conn, frequency, start_date, end_date
+    )
+    statement = top_n_statement(time_range, limit)
+    peaks = OrderedDict()
     for id_, variable in ids_dict.items():
-        if start_date or end_date:
-            rd[variable] = get_sliced_outputs(conn, id_, start_date, end_date)
-        else:
-            rd[variable] = get_outputs(conn, id_)
-    rd.time_series = get_timestamps_from_sql(path, frequency, start_date, end_date)
-    conn.close()
-    return rd
+        params = (id_,) + (time_range or ()) + ((n,) if limit else ())
+        # rows are fetched lazily, only rows up to the n-th valid step are read
+        rows = conn.execute(statement, params)
+        values = (
+            (timestamps[time_index], value)
+            for time_index, value in rows
+            if time_index in timestamps
+        )
+        peaks[variable] = list(islice(values, n))
+    return peaks
+
+
+def get_top_n_from_sql(
+    path,
+    variables,
+    frequency,
+    n,
+    alike=False,
+    start_date=None,
+    end_date=None,
+    profile=None,
+    header_table=None,
+):
+    """
+    Find 'n' largest values of each variable within the query.
+
+    SQLite keeps only 'n' rows while sorting ('ORDER BY ... LIMIT')
+    so values are not loaded into Python. Date range is applied
+    in the query as a TimeIndex range. Results match
+    'ResultsDictionary.top_n' of equal request.
+
+    Parameters
+    ----------
+    path : str
+        A path to EnergyPlus .sql file.
+    variables : Variable or List of Variable
+        Requested output variables.
+    frequency : str
+        An output interval, this can be one of {TS, H, D, M, A, RP} constants.
+    n : int
+        Number of values.
+    alike : default False, bool
+        Specify if full string or only part of variable attribute needs to match.
+    start_date : default None, datetime.datetime
+        Lower datetime interval boundary, inclusive.
+    end_date : default None, datetime.datetime
+        Upper datetime interval boundary, inclusive.
+    profile : default None, ConnectionProfile
+        SQLite connection settings.
+    header_table : default None, HeaderTable
+        Share 'Variable' instances with results of other requests.
+
+    Returns
+    -------
+    OrderedDict of {Variable, list of (datetime, float)}
+        Timestamps and values ordered from the largest value.
+
+    """
+    if not os.path.exists(path):
+        raise IOError("Cannot read results, file '{}' does not exist.".format(path))
+    conn = connect(path, profile)
+    try:
+        return fetch_top_n(
+            conn, variables, frequency, n, alike, start_date, end_date, header_table
+        )
+    finally:
+        conn.close()
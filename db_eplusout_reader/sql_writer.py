@@ -0,0 +1,259 @@
+import os
+import sqlite3
+from itertools import chain, repeat
+
+from db_eplusout_reader.constants import RP, TS, A, D, H, M
+from db_eplusout_reader.db_esofile import DBEsoFile
+from db_eplusout_reader.lazy_collection import LazyDBEsoFileCollection
+from db_eplusout_reader.sql_reader import INTERVAL_TYPES, to_sql_frequency
+
+METERS = ("Meter", "Cumulative Meter")
+MINUTES_PER_DAY = 1440
+
+CREATE_TABLES = (
+    "CREATE TABLE EnvironmentPeriods (EnvironmentPeriodIndex INTEGER PRIMARY KEY,"
+    " SimulationIndex INTEGER, EnvironmentName TEXT, EnvironmentType INTEGER)",
+    "CREATE TABLE Time (TimeIndex INTEGER PRIMARY KEY, Year INTEGER, Month INTEGER,"
+    " Day INTEGER, Hour INTEGER, Minute INTEGER, Dst INTEGER, Interval INTEGER,"
+    " IntervalType INTEGER, SimulationDays INTEGER, DayType TEXT,"
+    " EnvironmentPeriodIndex INTEGER, WarmupFlag INTEGER)",
+    "CREATE TABLE ReportDataDictionary (ReportDataDictionaryIndex INTEGER PRIMARY KEY,"
+    " IsMeter INTEGER, Type TEXT, IndexGroup TEXT, TimestepType TEXT, KeyValue TEXT,"
+    " Name TEXT, ReportingFrequency TEXT, ScheduleName TEXT, Units TEXT)",
+    "CREATE TABLE ReportData (ReportDataIndex INTEGER PRIMARY KEY, TimeIndex INTEGER,"
+    " ReportDataDictionaryIndex INTEGER, Value REAL)",
+)
+
+# indexes are created once all rows are inserted
+CREATE_INDEXES = (
+    "CREATE INDEX ReportDataDictionaryIndexIndex"
+    " ON ReportData (ReportDataDictionaryIndex)",
+    "CREATE INDEX TimeIntervalTypeIndex ON Time (IntervalType)",
+)
+
+INSERT_ENVIRONMENT = (
+    "INSERT INTO EnvironmentPeriods (EnvironmentPeriodIndex, SimulationIndex,"
+    " EnvironmentName, EnvironmentType) VALUES (?, 1, ?, NULL)"
+)
+INSERT_TIME = (
+    "INSERT INTO Time (TimeIndex, Year, Month, Day, Hour, Minute, Dst, Interval,"
+    " IntervalType, SimulationDays, DayType, EnvironmentPeriodIndex, WarmupFlag)"
+    " VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, NULL, ?, ?, 0)"
+)
+INSERT_DICTIONARY = (
+    "INSERT INTO ReportDataDictionary (ReportDataDictionaryIndex, IsMeter, Type,"
+    " IndexGroup, TimestepType, KeyValue, Name, ReportingFrequency, ScheduleName,"
+    " Units) VALUES (?, ?, ?, '', 'Zone', ?, ?, ?, NULL, ?)"
+)
+INSERT_DATA = (
+    "INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value)"
+    " VALUES (?, ?, ?)"
+)
+
+
+def get_intervals(frequency, dates, n_days):
+    """Get length of each step in minutes."""
+    if frequency == H:
+        return [60] * len(dates)
+    if frequency == D:
+        return [MINUTES_PER_DAY] * len(dates)
+    if frequency in {M, RP, A}:
+        return [days * MINUTES_PER_DAY for days in n_days[frequency]]
+    intervals = [
+        int((date - previous).total_seconds() // 60)
+        for previous, date in zip(dates, dates[1:])
+    ]
+    return intervals[:1] + intervals if intervals else [None] * len(dates)
+
+
+def get_time_rows(db_eso_file, frequency, environment_index, first_time_index):
+    """Create 'Time' table rows for given frequency."""
+    dates = db_eso_file.dates[frequency]
+    if frequency in {TS, H, D}:
+        day_types = db_eso_file.days_of_week[frequency]
+    else:
+        day_types = repeat(None)
+    intervals = get_intervals(frequency, dates, db_eso_file.n_days)
+    interval_type = INTERVAL_TYPES[frequency]
+    return [
+        (
+            time_index,
+            date.year,
+            date.month,
+            date.day,
+            date.hour,
+            date.minute,
+            interval,
+            interval_type,
+            day_type,
+            environment_index,
+        )
+        for time_index, date, interval, day_type in zip(
+            range(first_time_index, first_time_index + len(dates)),
+            dates,
+            intervals,
+            day_types,
+        )
+    ]
+
+
+def get_dictionary_row(dictionary_index, frequency, variable):
+    """Create 'ReportDataDictionary' table row, meters have empty key."""
+    is_meter = variable.key in METERS
+    return (
+        dictionary_index,
+        int(is_meter),
+        "Sum" if is_meter else "Avg",
+        "" if is_meter else variable.key,
+        variable.type,
+        to_sql_frequency(frequency),
+        variable.units,
+    )
+
+
+def iter_data_rows(time_indexes, dictionary_indexes, columns):
+    """
+    Generate 'ReportData' rows step by step.
+
+    Rows are ordered by time as in EnergyPlus .sql file, missing
+    (nan) values are not reported.
+
+    """
+    rows = chain.from_iterable(
+        zip(repeat(time_index), dictionary_indexes, values)
+        for time_index, values in zip(time_indexes, zip(*columns))
+    )
+    return (row for row in rows if row[2] == row[2])
+
+
+class SqlWriter:
+    """
+    Bulk loader of processed eso results into EnergyPlus .sql schema.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Connection to an empty database.
+
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.dictionary = {}
+        self.n_environments = 0
+        self.n_time_rows = 0
+
+    def create_tables(self):
+        for statement in CREATE_TABLES:
+            self.conn.execute(statement)
+
+    def create_indexes(self):
+        for statement in CREATE_INDEXES:
+            self.conn.execute(statement)
+
+    def _get_dictionary_indexes(self, frequency, variables):
+        indexes = []
+        rows = []
+        for variable in variables:
+            index = self.dictionary.get((frequency, variable))
+            if index is None:
+                index = len(self.dictionary) + 1
+                self.dictionary[(frequency, variable)] = index
+                rows.append(get_dictionary_row(index, frequency, variable))
+            indexes.append(index)
+        self.conn.executemany(INSERT_DICTIONARY, rows)
+        return indexes
+
+    def _write_frequency(self, db_eso_file, frequency, environment_index):
+        time_rows = get_time_rows(
+            db_eso_file, frequency, environment_index, self.n_time_rows + 1
+        )
+        self.conn.executemany(INSERT_TIME, time_rows)
+        self.n_time_rows += len(time_rows)
+        variables = db_eso_file.header[frequency]
+        outputs = db_eso_file.outputs[frequency]
+        dictionary_indexes = self._get_dictionary_indexes(frequency, variables)
+        columns = [outputs[id_] for id_ in variables.values()]
+        time_indexes = [row[0] for row in time_rows]
+        self.conn.executemany(
+            INSERT_DATA, iter_data_rows(time_indexes, dictionary_indexes, columns)
+        )
+
+    def write(self, db_eso_file):
+        """Write all outputs of given environment in a single transaction."""
+        self.n_environments += 1
+        self.conn.execute("BEGIN")
+        self.conn.execute(
+            INSERT_ENVIRONMENT, (self.n_environments, db_eso_file.environment_name)
+        )
+        for frequency in db_eso_file.header:
+            if db_eso_file.dates.get(frequency):
+                self._write_frequency(db_eso_file, frequency, self.n_environments)
+        self.conn.execute("COMMIT")
+
+
+def get_db_eso_files(results, year):
+    """Get processed environments, eso file is processed lazily."""
+    if isinstance(results, DBEsoFile):
+        return [results]
+    if isinstance(results, str):
+        # each environment is released once the next one is loaded
+        return LazyDBEsoFileCollection.from_path(results, year=year, memory_budget=0)
+    return results
+
+
+def eso_to_sql(results, sql_path, year=None, overwrite=False):
+    """
+    Store eso results in an SQLite file using EnergyPlus .sql schema.
+
+    Rows are inserted in large transactions without journal, indexes
+    are created once all rows are stored. The file is built next to
+    the target path and moved to its place only when complete so it
+    can be read using 'get_results' as a native .sql file.
+
+    Meters are stored with empty key as in EnergyPlus .sql file.
+
+    Parameters
+    ----------
+    results : str or DBEsoFile or DBEsoFileCollection
+        A path to EnergyPlus .eso file or already processed results.
+    sql_path : str
+        A path to created .sql file.
+    year : default None, int
+        Year used to convert dates when eso file path is given.
+    overwrite : default False, bool
+        Replace existing file.
+
+    Returns
+    -------
+    str
+        A path to created .sql file.
+
+    Raises
+    ------
+    FileExistsError
+        If the file already exists and 'overwrite' is not set.
+
+    """
+    if not overwrite and os.path.exists(sql_path):
+        raise FileExistsError("File '{}' already exists!".format(sql_path))
+    db_eso_files = get_db_eso_files(results, year)
+    temp_path = "{}.{}.tmp".format(sql_path, os.getpid())
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    conn = sqlite3.connect(temp_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        writer = SqlWriter(conn)
+        writer.create_tables()
+        for db_eso_file in db_eso_files:
+            writer.write(db_eso_file)
+        writer.create_indexes()
+    except BaseException:
+        conn.close()
+        os.remove(temp_path)
+        raise
+    conn.close()
+    os.replace(temp_path, sql_path)
+    return sql_path
@@ -0,0 +1,106 @@
+from collections import namedtuple
+
+from db_eplusout_reader.arrays import to_array
+
+UnitConversion = namedtuple("UnitConversion", "units scale offset")
+
+# converted value = value * scale + offset
+CONVERSIONS = {
+    ("J", "kJ"): (1e-3, 0.0),
+    ("J", "MJ"): (1e-6, 0.0),
+    ("J", "GJ"): (1e-9, 0.0),
+    ("J", "Wh"): (1 / 3.6e3, 0.0),
+    ("J", "kWh"): (1 / 3.6e6, 0.0),
+    ("J", "MWh"): (1 / 3.6e9, 0.0),
+    ("J", "Btu"): (1 / 1055.05585262, 0.0),
+    ("J", "kBtu"): (1 / 1055055.85262, 0.0),
+    ("W", "kW"): (1e-3, 0.0),
+    ("W", "MW"): (1e-6, 0.0),
+    ("W", "Btu/h"): (3.412141633, 0.0),
+    ("W/m2", "kW/m2"): (1e-3, 0.0),
+    ("W/m2", "Btu/h-ft2"): (0.316998331, 0.0),
+    ("C", "F"): (1.8, 32.0),
+    ("C", "K"): (1.0, 273.15),
+    ("deltaC", "deltaF"): (1.8, 0.0),
+    ("m3/s", "l/s"): (1e3, 0.0),
+    ("m3/s", "m3/h"): (3.6e3, 0.0),
+    ("m3/s", "cfm"): (2118.880003, 0.0),
+    ("kg/s", "kg/h"): (3.6e3, 0.0),
+    ("Pa", "kPa"): (1e-3, 0.0),
+    ("Pa", "psi"): (1.45037738e-4, 0.0),
+    ("m", "ft"): (3.280839895, 0.0),
+    ("m2", "ft2"): (10.76391042, 0.0),
+    ("m3", "ft3"): (35.31466672, 0.0),
+}
+
+
+def get_conversions(units):
+    """
+    Create conversions for 'units' argument.
+
+    Parameters
+    ----------
+    units : dict of {str, str or tuple of (str, float, float)}
+        Source units mapped either to target units (i.e. {"J": "kWh"})
+        or to a custom (units, scale, offset) conversion.
+
+    Returns
+    -------
+    dict of {str, UnitConversion}
+        Conversions for source units, same units are skipped.
+
+    Raises
+    ------
+    ValueError
+        If conversion between given units is not known.
+
+    """
+    conversions = {}
+    for source_units, target in (units or {}).items():
+        if isinstance(target, str):
+            if target == source_units:
+                continue
+            try:
+                scale, offset = CONVERSIONS[(source_units, target)]
+            except KeyError:
+                raise ValueError(
+                    "Cannot convert '{}' to '{}', specify custom conversion "
+                    "as (units, scale, offset) tuple.".format(source_units, target)
+                )
+            conversions[source_units] = UnitConversion(target, scale, offset)
+        else:
+            target_units, scale, offset = target
+            conversions[source_units] = UnitConversion(
+                target_units, float(scale), float(offset)
+            )
+    return conversions
+
+
+def convert_variable(variable, conversion):
+    """Replace units of given 'Variable'."""
+    return variable._replace(units=conversion.units)
+
+
+def convert_values(values, conversion, dtype=None):
+    """
+    Convert values in a single pass.
+
+    Values are converted lazily in C using bound float methods,
+    no intermediate list is created.
+
+    Parameters
+    ----------
+    values : iterable of float
+        Numeric values.
+    conversion : UnitConversion
+        Applied conversion.
+    dtype : default None, {FLOAT64, FLOAT32}
+        Store converted values in a typed array, list is returned otherwise.
+
+    """
+    converted = values
+    if conversion.scale != 1:
+        converted = map(conversion.scale.__mul__, converted)
+    if conversion.offset:
+        converted = map(conversion.offset.__add__, converted)
+    return to_array(converted, dtype)
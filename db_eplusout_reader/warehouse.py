@@ -0,0 +1,356 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from collections import OrderedDict
+from itertools import groupby
+from operator import itemgetter
+
+from db_eplusout_reader.arrays import get_typecode, to_array
+from db_eplusout_reader.compression import get_decompressed_path, get_file_extension
+from db_eplusout_reader.exceptions import RunNotFound
+from db_eplusout_reader.processing.header_table import HeaderTable, Variable
+from db_eplusout_reader.results_dict import ResultsDictionary
+from db_eplusout_reader.sql_reader import (
+    MAX_ID_PARAMETERS,
+    dates_statement,
+    get_ids_dict,
+    parse_sql_timestamps,
+    to_sql_frequency,
+    validate_time,
+)
+from db_eplusout_reader.sql_writer import eso_to_sql
+from db_eplusout_reader.units import convert_values, convert_variable, get_conversions
+
+DICTIONARY_COLUMNS = (
+    "IsMeter, Type, IndexGroup, TimestepType, KeyValue, Name,"
+    " ReportingFrequency, ScheduleName, Units"
+)
+TIME_COLUMNS = (
+    "Year, Month, Day, Hour, Minute, Dst, Interval, IntervalType,"
+    " SimulationDays, DayType, EnvironmentPeriodIndex, WarmupFlag"
+)
+# time rows are shared between runs, missing fields are stored as zero
+# so equal timestamps of different runs match
+SOURCE_TIME_COLUMNS = (
+    "IFNULL(Year, 0), IFNULL(Month, 0), IFNULL(Day, 0), IFNULL(Hour, 0),"
+    " IFNULL(Minute, 0), Dst, Interval, IntervalType, SimulationDays, DayType,"
+    " IFNULL(EnvironmentPeriodIndex, 0), IFNULL(WarmupFlag, 0)"
+)
+
+CREATE_TABLES = (
+    "CREATE TABLE IF NOT EXISTS Runs (RunIndex INTEGER PRIMARY KEY,"
+    " RunId TEXT NOT NULL UNIQUE, Path TEXT)",
+    "CREATE TABLE IF NOT EXISTS Time (TimeIndex INTEGER PRIMARY KEY,"
+    " Year INTEGER, Month INTEGER, Day INTEGER, Hour INTEGER, Minute INTEGER,"
+    " Dst INTEGER, Interval INTEGER, IntervalType INTEGER, SimulationDays INTEGER,"
+    " DayType TEXT, EnvironmentPeriodIndex INTEGER, WarmupFlag INTEGER)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS TimeStepIndex ON Time (IntervalType,"
+    " EnvironmentPeriodIndex, WarmupFlag, Year, Month, Day, Hour, Minute)",
+    "CREATE TABLE IF NOT EXISTS ReportDataDictionary"
+    " (ReportDataDictionaryIndex INTEGER PRIMARY KEY, IsMeter INTEGER, Type TEXT,"
+    " IndexGroup TEXT, TimestepType TEXT, KeyValue TEXT, Name TEXT,"
+    " ReportingFrequency TEXT, ScheduleName TEXT, Units TEXT)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ReportDataDictionaryVariableIndex"
+    " ON ReportDataDictionary (ReportingFrequency, KeyValue, Name, Units)",
+    # clustered by variable so both single and cross run requests are range scans
+    "CREATE TABLE IF NOT EXISTS ReportData (ReportDataDictionaryIndex INTEGER,"
+    " RunIndex INTEGER, TimeIndex INTEGER, Value REAL,"
+    " PRIMARY KEY (ReportDataDictionaryIndex, RunIndex, TimeIndex)) WITHOUT ROWID",
+)
+
+INSERT_DICTIONARY = (
+    "INSERT OR IGNORE INTO ReportDataDictionary ({0})"
+    " SELECT {0} FROM source.ReportDataDictionary".format(DICTIONARY_COLUMNS)
+)
+INSERT_TIME = (
+    "INSERT OR IGNORE INTO Time ({})"
+    " SELECT {} FROM source.Time ORDER BY TimeIndex".format(
+        TIME_COLUMNS, SOURCE_TIME_COLUMNS
+    )
+)
+CREATE_MAPS = (
+    "CREATE TEMP TABLE DictionaryMap"
+    " (SourceIndex INTEGER PRIMARY KEY, TargetIndex INTEGER)",
+    "INSERT INTO temp.DictionaryMap SELECT s.ReportDataDictionaryIndex,"
+    " d.ReportDataDictionaryIndex FROM source.ReportDataDictionary AS s"
+    " JOIN main.ReportDataDictionary AS d"
+    " ON d.ReportingFrequency IS s.ReportingFrequency AND d.KeyValue IS s.KeyValue"
+    " AND d.Name IS s.Name AND d.Units IS s.Units",
+    "CREATE TEMP TABLE TimeMap (SourceIndex INTEGER PRIMARY KEY, TargetIndex INTEGER)",
+    "INSERT INTO temp.TimeMap SELECT s.TimeIndex, t.TimeIndex FROM source.Time AS s"
+    " JOIN main.Time AS t ON t.IntervalType IS s.IntervalType"
+    " AND t.EnvironmentPeriodIndex = IFNULL(s.EnvironmentPeriodIndex, 0)"
+    " AND t.WarmupFlag = IFNULL(s.WarmupFlag, 0) AND t.Year = IFNULL(s.Year, 0)"
+    " AND t.Month = IFNULL(s.Month, 0) AND t.Day = IFNULL(s.Day, 0)"
+    " AND t.Hour = IFNULL(s.Hour, 0) AND t.Minute = IFNULL(s.Minute, 0)",
+)
+DROP_MAPS = ("DROP TABLE temp.DictionaryMap", "DROP TABLE temp.TimeMap")
+INSERT_DATA = (
+    "INSERT INTO ReportData (ReportDataDictionaryIndex, RunIndex, TimeIndex, Value)"
+    " SELECT d.TargetIndex, ?, t.TargetIndex, r.Value FROM source.ReportData AS r"
+    " JOIN temp.DictionaryMap AS d ON d.SourceIndex = r.ReportDataDictionaryIndex"
+    " JOIN temp.TimeMap AS t ON t.SourceIndex = r.TimeIndex"
+    " ORDER BY d.TargetIndex, t.TargetIndex"
+)
+
+
+def results_statement(n_ids, n_runs):
+    """Create statement to fetch values of all requested runs and variables."""
+    statement = (
+        "SELECT ReportDataDictionaryIndex, RunIndex, TimeIndex, Value FROM ReportData"
+        " WHERE ReportDataDictionaryIndex IN ({})".format(", ".join("?" * n_ids))
+    )
+    if n_runs is not None:
+        statement += " AND RunIndex IN ({})".format(", ".join("?" * n_runs))
+    return statement + " ORDER BY ReportDataDictionaryIndex, RunIndex, TimeIndex"
+
+
+def create_results(
+    frequency, ids_dict, blocks, timestamps, conversions, dtype, header_table
+):
+    """Create results dictionary of a single run from fetched rows."""
+    rd = ResultsDictionary(frequency)
+    for id_, variable in ids_dict.items():
+        block = blocks.get(id_)
+        if block is None:
+            continue
+        if not rd:
+            rd.time_series = [timestamps[time_index] for time_index, _ in block]
+        values = (value for _, value in block)
+        conversion = conversions.get(variable.units)
+        if conversion is None:
+            rd[variable] = to_array(values, dtype)
+        else:
+            variable = header_table.get_variable(
+                *convert_variable(variable, conversion)
+            )
+            rd[variable] = convert_values(values, conversion, dtype)
+    return rd
+
+
+class ResultsWarehouse:
+    """
+    Results of many simulation runs stored in a single SQLite file.
+
+    Each run is tagged by its run id, variables and timestamps are
+    shared between runs so values of all runs can be requested using
+    a single query. Run results are loaded from EnergyPlus .sql files
+    (.eso files are converted first) using SQLite, no values pass
+    through Python while loading.
+
+    Parameters
+    ----------
+    path : str
+        A path to the warehouse file, the file is created if it does not exist.
+
+    Example
+    -------
+    with ResultsWarehouse("sweep.db") as warehouse:
+        warehouse.add_runs((run_id, path) for run_id, path in runs.items())
+        results = warehouse.get_results(
+            Variable("", "DistrictCooling:Facility", "J"), H
+        )
+        peaks = {run_id: max(rd.first_array) for run_id, rd in results.items()}
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        for statement in CREATE_TABLES:
+            self.conn.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def run_ids(self):
+        rows = self.conn.execute("SELECT RunId FROM Runs ORDER BY RunIndex")
+        return [run_id for run_id, in rows]
+
+    def _load_run(self, run_id, sql_path, path):
+        self.conn.execute("ATTACH DATABASE ? AS source", (sql_path,))
+        try:
+            self.conn.execute("BEGIN")
+            try:
+                cursor = self.conn.execute(
+                    "INSERT INTO Runs (RunId, Path) VALUES (?, ?)", (run_id, path)
+                )
+                self.conn.execute(INSERT_DICTIONARY)
+                self.conn.execute(INSERT_TIME)
+                for statement in CREATE_MAPS:
+                    self.conn.execute(statement)
+                self.conn.execute(INSERT_DATA, (cursor.lastrowid,))
+                for statement in DROP_MAPS:
+                    self.conn.execute(statement)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        finally:
+            self.conn.execute("DETACH DATABASE source")
+
+    def add_run(self, run_id, path, year=None):
+        """
+        Load results of a single run.
+
+        Parameters
+        ----------
+        run_id : str
+            Unique run identifier.
+        path : str
+            A path to plain or compressed EnergyPlus .sql or .eso file.
+        year : default None, int
+            Year used to convert dates of .eso file.
+
+        Raises
+        ------
+        ValueError
+            If the run is already included in the warehouse.
+
+        """
+        run_id = str(run_id)
+        if run_id in self.run_ids:
+            raise ValueError("Run '{}' is already included!".format(run_id))
+        if not os.path.exists(path):
+            raise IOError("Cannot read results, file '{}' does not exist.".format(path))
+        if get_file_extension(path).lower() != ".eso":
+            self._load_run(run_id, get_decompressed_path(path), path)
+            return
+        temp_dir = tempfile.mkdtemp()
+        try:
+            sql_path = eso_to_sql(path, os.path.join(temp_dir, "eplusout.sql"), year)
+            self._load_run(run_id, sql_path, path)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def add_runs(self, runs, year=None):
+        """Load results of multiple runs given as (run id, path) pairs."""
+        for run_id, path in runs:
+            self.add_run(run_id, path, year)
+
+    def _get_run_indexes(self, runs):
+        if runs is None:
+            return None
+        runs = [runs] if isinstance(runs, str) else runs
+        rows = self.conn.execute("SELECT RunId, RunIndex FROM Runs").fetchall()
+        run_indexes = dict(rows)
+        try:
+            return [run_indexes[str(run_id)] for run_id in runs]
+        except KeyError as e:
+            raise RunNotFound("Run '{}' is not included!".format(e.args[0]))
+
+    def _get_timestamps(self, frequency, start_date, end_date):
+        """
+        Get timestamps of valid time indexes in chronological order.
+
+        Time rows are shared between runs and numbered in loading order
+        so steps are ordered by environment and timestamp, not TimeIndex.
+
+        """
+        statement = dates_statement(frequency).replace(
+            "SELECT", "SELECT Time.TimeIndex, Time.EnvironmentPeriodIndex,", 1
+        )
+        rows = self.conn.execute(statement).fetchall()
+        timestamps = parse_sql_timestamps(row[2:] for row in rows)
+        steps = sorted(
+            (row[1], timestamp, row[0])
+            for row, timestamp in zip(rows, timestamps)
+            if validate_time(timestamp, start_date, end_date)
+        )
+        return OrderedDict(
+            (time_index, timestamp) for _, timestamp, time_index in steps
+        )
+
+    def _fetch_values(self, ids, run_indexes, timestamps):
+        """
+        Get (time index, value) rows of each variable id grouped by run index.
+
+        Rows are sorted chronologically, rows of steps
+        which are not included in 'timestamps' are skipped.
+
+        """
+        values = {}
+        ranks = {time_index: i for i, time_index in enumerate(timestamps)}
+        n_runs = None if run_indexes is None else len(run_indexes)
+        for i in range(0, len(ids), MAX_ID_PARAMETERS):
+            chunk = ids[i : i + MAX_ID_PARAMETERS]
+            statement = results_statement(len(chunk), n_runs)
+            rows = self.conn.execute(statement, chunk + (run_indexes or []))
+            for key, group in groupby(rows, key=itemgetter(0, 1)):
+                block = [row[2:] for row in group if row[2] in ranks]
+                block.sort(key=lambda row: ranks[row[0]])
+                id_, run_index = key
+                values.setdefault(run_index, {})[id_] = block
+        return values
+
+    def get_results(
+        self,
+        variables,
+        frequency,
+        runs=None,
+        alike=False,
+        start_date=None,
+        end_date=None,
+        dtype=None,
+        units=None,
+        header_table=None,
+    ):
+        """
+        Extract output values of given runs.
+
+        Arguments match 'get_results_from_sql', values of all requested
+        runs and variables are fetched using a single query.
+
+        Parameters
+        ----------
+        runs : default None, str or list of str
+            Requested run ids, all runs are included when not specified.
+
+        Returns
+        -------
+        OrderedDict of {str, ResultsDictionary}
+            Results of each run, runs without requested
+            variables are not included.
+
+        Raises
+        ------
+        RunNotFound
+            If requested run is not included in the warehouse.
+
+        """
+        if dtype is not None:
+            get_typecode(dtype)
+        variables = [variables] if isinstance(variables, Variable) else variables
+        header_table = HeaderTable() if header_table is None else header_table
+        run_indexes = self._get_run_indexes(runs)
+        ids_dict = get_ids_dict(
+            self.conn, variables, to_sql_frequency(frequency), alike, header_table
+        )
+        conversions = get_conversions(units)
+        timestamps = self._get_timestamps(frequency, start_date, end_date)
+        values = {}
+        if ids_dict and timestamps:
+            values = self._fetch_values(list(ids_dict), run_indexes, timestamps)
+        results = OrderedDict()
+        for run_id, run_index in self.conn.execute(
+            "SELECT RunId, RunIndex FROM Runs ORDER BY RunIndex"
+        ):
+            if run_index in values:
+                results[run_id] = create_results(
+                    frequency,
+                    ids_dict,
+                    values[run_index],
+                    timestamps,
+                    conversions,
+                    dtype,
+                    header_table,
+                )
+        return results
@@ -32,6 +32,22 @@ def eso_path(test_files_dir):
     return os.path.join(test_files_dir, "test_files", "eplusout.eso")
 
 
+@pytest.fixture(scope="function")
+def multi_env_eso_path(eso_path, tmp_path):
+    """Create eso file with an additional 'SIZING' environment."""
+    with open(eso_path, "r") as file:
+        lines = file.readlines()
+    header_end = lines.index("End of Data Dictionary\n")
+    body_start = header_end + 1
+    body_end = lines.index("End of Data\n")
+    body = lines[body_start:body_end]
+    sizing_body = ["1,SIZING," + body[0].split(",", 2)[2]] + body[1:]
+    path = os.path.join(str(tmp_path), "multi_env.eso")
+    with open(path, "w") as file:
+        file.writelines(lines[:body_start] + sizing_body + lines[body_start:])
+    return path
+
+
 @pytest.fixture(scope="session")
 def session_eso_file(eso_path):
     return DBEsoFile.from_path(eso_path)
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from db_eplusout_reader import Variable, get_results
+from db_eplusout_reader.async_results import (
+    AsyncSqlResultsReader,
+    aget_results,
+    aload_eso_file,
+)
+from db_eplusout_reader.constants import D, M
+from db_eplusout_reader.sql_reader import get_timestamps_from_sql
+
+
+class TestAsyncResults:
+    def test_aget_results(self, sql_path):
+        variable = Variable(None, None, None)
+        results = asyncio.run(aget_results(sql_path, variable, D))
+        assert results == get_results(sql_path, variable, D)
+        assert results.time_series == get_results(sql_path, variable, D).time_series
+
+    def test_reader_timestamps(self, sql_path):
+        reader = AsyncSqlResultsReader(sql_path)
+        timestamps = asyncio.run(reader.get_timestamps(M))
+        assert timestamps == get_timestamps_from_sql(sql_path, M)
+
+    def test_concurrent_requests(self, sql_path):
+        reader = AsyncSqlResultsReader(sql_path)
+
+        async def run():
+            return await asyncio.gather(
+                *[reader.get_results(Variable(None, None, None), D) for _ in range(8)]
+            )
+
+        all_results = asyncio.run(run())
+        assert all(results == all_results[0] for results in all_results)
+
+    def test_cancel_request(self, sql_path):
+        reader = AsyncSqlResultsReader(sql_path)
+
+        async def run():
+            task = asyncio.ensure_future(
+                reader.get_results(Variable(None, None, None), D)
+            )
+            await asyncio.sleep(0)
+            task.cancel()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run())
+
+    def test_aload_eso_file(self, eso_path, session_eso_file):
+        collection = asyncio.run(aload_eso_file(eso_path))
+        assert collection[0].outputs == session_eso_file.outputs
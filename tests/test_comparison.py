@@ -0,0 +1,139 @@
+import math
+from datetime import datetime
+
+import pytest
+
+from db_eplusout_reader import DBEsoFile, Variable, eso_to_sql, get_results
+from db_eplusout_reader.comparison import (
+    VariableDiff,
+    compare_files,
+    compare_results,
+)
+from db_eplusout_reader.constants import FLOAT32, D, H
+from db_eplusout_reader.results_dict import ResultsDictionary
+
+ZONE1 = Variable("Temperature", "Zone1", "C")
+ZONE2 = Variable("Temperature", "Zone2", "C")
+
+
+@pytest.fixture(scope="function")
+def other_results(results_dictionary):
+    rd = ResultsDictionary(H)
+    rd.time_series = list(results_dictionary.time_series)
+    for variable, values in results_dictionary.items():
+        rd[variable] = list(values)
+    return rd
+
+
+class TestCompareResults:
+    def test_equal_results(self, results_dictionary, other_results):
+        report = compare_results(results_dictionary, other_results)
+        assert report.passed
+        assert report.n_steps == 3
+        assert report.diffs[ZONE1] == VariableDiff(
+            0.0, 0.0, datetime(2002, 1, 1), 20, 20, True
+        )
+
+    def test_different_results(self, results_dictionary, other_results):
+        other_results[ZONE1][1] = 21.5
+        other_results[ZONE2][2] = 19 + 1e-9
+        report = compare_results(results_dictionary, other_results)
+        assert not report.passed
+        assert report.failed_variables == [ZONE1]
+        assert report.diffs[ZONE1] == VariableDiff(
+            0.5, 0.5 / 21, datetime(2002, 1, 2), 21, 21.5, False
+        )
+        assert report.diffs[ZONE2].passed
+        assert compare_results(results_dictionary, other_results, abs_tol=0.5).passed
+
+    def test_align_timestamps(self, results_dictionary, other_results):
+        other_results.time_series = [
+            datetime(2002, 1, 2),
+            datetime(2002, 1, 3),
+            datetime(2002, 1, 4),
+        ]
+        for variable, values in results_dictionary.items():
+            other_results[variable] = values[1:] + [0]
+        report = compare_results(results_dictionary, other_results)
+        assert report.n_steps == 2
+        assert report.n_unmatched_steps == 2
+        assert not report.failed_variables
+        assert not report.passed
+
+    def test_missing_variables(self, results_dictionary, other_results):
+        new_variable = Variable("Temperature", "Zone4", "C")
+        other_results[new_variable] = other_results.pop(ZONE1)
+        report = compare_results(results_dictionary, other_results)
+        assert report.missing_variables == [ZONE1]
+        assert report.new_variables == [new_variable]
+        assert not report.passed
+
+    def test_missing_values(self, results_dictionary, other_results):
+        results_dictionary[ZONE1] = [float("nan"), 21, float("nan")]
+        other_results[ZONE1] = [float("nan"), 21, 20]
+        report = compare_results(results_dictionary, other_results)
+        assert report.diffs[ZONE1].max_abs_diff == math.inf
+        assert report.diffs[ZONE1].timestamp == datetime(2002, 1, 3)
+        other_results[ZONE1][2] = float("nan")
+        assert compare_results(results_dictionary, other_results).passed
+
+    def test_compact_results(self, results_dictionary, other_results):
+        compact_results = other_results.to_compact(FLOAT32)
+        assert compare_results(results_dictionary, compact_results).passed
+
+
+class TestCompareFiles:
+    @pytest.mark.parametrize("chunk_size", [1, 100, 10000])
+    def test_compare_sql(self, sql_path, chunk_size):
+        report = compare_files(sql_path, sql_path, H, chunk_size=chunk_size)
+        assert report.passed
+        assert report.n_steps == 8760
+
+    def test_compare_eso(self, eso_path, session_eso_file):
+        report = compare_files(eso_path, session_eso_file, D, chunk_size=100)
+        assert report.passed
+        assert report.n_steps == 365
+        assert len(report.diffs) == 2
+
+    def test_compare_different_files(self, eso_path, sql_path):
+        report = compare_files(
+            sql_path, eso_path, H, variables=[Variable(None, None, "C")]
+        )
+        expected = compare_results(
+            get_results(sql_path, Variable(None, None, "C"), H),
+            get_results(eso_path, Variable(None, None, "C"), H),
+        )
+        assert not report.passed
+        assert report.n_unmatched_steps == expected.n_unmatched_steps
+
+    def test_compare_shorter_file(self, eso_path, session_eso_file):
+        shorter = DBEsoFile(
+            session_eso_file.environment_name,
+            session_eso_file.header,
+            {
+                frequency: {id_: values[:100] for id_, values in outputs.items()}
+                for frequency, outputs in session_eso_file.outputs.items()
+            },
+            {
+                frequency: dates[:100]
+                for frequency, dates in session_eso_file.dates.items()
+            },
+            session_eso_file.n_days,
+            session_eso_file.days_of_week,
+        )
+        report = compare_files(eso_path, shorter, D, chunk_size=50)
+        assert report.n_steps == 100
+        assert report.n_unmatched_steps == 265
+        assert not report.failed_variables
+
+    def test_compare_no_matching_variables(self, multi_env_eso_path, tmp_path):
+        sql_path = eso_to_sql(multi_env_eso_path, str(tmp_path / "multi_env.sql"))
+        variables = Variable(None, None, "C")
+        report = compare_files(multi_env_eso_path, sql_path, D, variables=variables)
+        assert report.passed
+        assert report.n_steps == 0
+        assert not report.diffs
+
+    def test_invalid_chunk_size(self, sql_path):
+        with pytest.raises(ValueError):
+            compare_files(sql_path, sql_path, H, chunk_size=0)
@@ -1,6 +1,40 @@
+import bz2
+import copy
+import gzip
+import lzma
+import math
 import os
+import pickle
+import shutil
+from datetime import datetime
 
-from db_eplusout_reader.constants import RP, D, H, M
+import pytest
+
+from db_eplusout_reader import (
+    DBEsoFile,
+    DBEsoFileCollection,
+    LazyDBEsoFileCollection,
+    Variable,
+    get_results,
+    lazy_collection,
+    validate_eso,
+)
+from db_eplusout_reader.compression import get_file_extension
+from db_eplusout_reader.constants import FLOAT32, FLOAT64, RP, D, H, M
+from db_eplusout_reader.eso_follower import EsoFileFollower
+from db_eplusout_reader.eso_summary import SUMMARY_COLUMNS, get_summary
+from db_eplusout_reader.exceptions import (
+    CollectionRequired,
+    EnvironmentNotFound,
+    IncompleteFile,
+)
+from db_eplusout_reader.processing import esofile_reader
+from db_eplusout_reader.processing.eso_index import (
+    build_index,
+    get_index,
+    get_index_path,
+    read_index,
+)
 
 ESO_PATH = os.path.join(os.path.dirname(__file__), "test_files", "eplusout.eso")
 
@@ -13,3 +47,503 @@ class TestEsofileReader:
         assert [f.environment_name for f in session_eso_file_collection] == [
             "UNTITLED (01-01:31-12)"
         ]
+
+
+class TestEsoResults:
+    def test_find_ids(self, session_eso_file):
+        ids = session_eso_file.find_ids(Variable(None, "temperature", None), H, True)
+        assert ids
+        assert list(ids.values()) == sorted(ids.values())
+        assert session_eso_file.find_ids(Variable(None, "temperature", None), H) == {}
+
+    def test_get_results_matches_file(self, session_eso_file, eso_path):
+        variables = [Variable(None, None, None)]
+        results = get_results(eso_path, variables, frequency=D)
+        assert len(results.time_series) == len(session_eso_file.dates[D])
+        assert len(results) == len(session_eso_file.header[D])
+
+    def test_get_results_sliced(self, session_eso_file):
+        dates = session_eso_file.dates[H]
+        start_date, end_date = dates[100], dates[123]
+        variables = [Variable(None, None, None)]
+        results = session_eso_file.get_results(
+            variables, H, start_date=start_date, end_date=end_date
+        )
+        assert results.time_series == dates[100:124]
+        id_ = session_eso_file.header[H][results.first_variable]
+        assert results.first_array == session_eso_file.outputs[H][id_][100:124]
+
+    def test_get_results_missing_frequency(self, session_eso_file):
+        results = session_eso_file.get_results([Variable(None, None, None)], "foo")
+        assert results.time_series == []
+        assert len(results) == 0
+
+    def test_collection_results_join_environments(
+        self, multi_env_eso_path, session_eso_file
+    ):
+        collection = DBEsoFileCollection.from_path(multi_env_eso_path)
+        results = collection.get_results([Variable(None, None, None)], M)
+        assert len(results.time_series) == 2 * len(session_eso_file.dates[M])
+        assert len(results.first_array) == len(results.time_series)
+
+    @pytest.mark.parametrize("dtype", [None, FLOAT32])
+    def test_collection_results_fill_missing_variable(self, eso_path, dtype):
+        db_eso_file = DBEsoFile.from_path(eso_path)
+        other = copy.deepcopy(db_eso_file)
+        missing, *_ = other.header[M]
+        other.header = {f: dict(ids) for f, ids in other.header.items()}
+        del other.header[M][missing]
+        collection = DBEsoFileCollection([other, db_eso_file])
+        results = collection.get_results(Variable(None, None, None), M, dtype=dtype)
+        n_steps = len(db_eso_file.dates[M])
+        assert len(results.time_series) == 2 * n_steps
+        assert all(len(values) == 2 * n_steps for values in results.values())
+        assert all(math.isnan(value) for value in results[missing][:n_steps])
+        expected = db_eso_file.get_results(missing, M, dtype=dtype)[missing]
+        assert list(results[missing][n_steps:]) == list(expected)
+
+    def test_slice(self, session_eso_file):
+        dates = session_eso_file.dates[H]
+        sliced = session_eso_file.slice(start_date=dates[10], end_date=dates[19])
+        assert sliced.dates[H] == dates[10:20]
+        assert sliced.days_of_week[H] == session_eso_file.days_of_week[H][10:20]
+        assert all(len(values) == 10 for values in sliced.outputs[H].values())
+        assert sliced.dates[M] == [
+            date for date in session_eso_file.dates[M] if dates[10] <= date <= dates[19]
+        ]
+        assert len(sliced.n_days[M]) == len(sliced.dates[M])
+
+    def test_slice_outside_dates(self, session_eso_file):
+        sliced = session_eso_file.slice(end_date=datetime(1900, 1, 1))
+        assert all(dates == [] for dates in sliced.dates.values())
+
+
+class TestTypedOutputs:
+    @pytest.mark.parametrize("dtype, typecode", [(FLOAT64, "d"), (FLOAT32, "f")])
+    def test_from_path_dtype(self, eso_path, session_eso_file, dtype, typecode):
+        db_eso_file = DBEsoFile.from_path(eso_path, dtype=dtype)
+        assert db_eso_file.dates == session_eso_file.dates
+        for frequency, outputs in db_eso_file.outputs.items():
+            for id_, values in outputs.items():
+                expected = session_eso_file.outputs[frequency][id_]
+                assert values.typecode == typecode
+                assert values.tolist() == pytest.approx(expected, rel=1e-6)
+
+    def test_collection_dtype(self, eso_path):
+        collection = DBEsoFileCollection.from_path(eso_path, dtype=FLOAT32)
+        values = next(iter(collection[0].outputs[H].values()))
+        assert values.typecode == "f"
+
+    def test_get_results_dtype(self, eso_path):
+        variable = Variable(None, None, None)
+        results = get_results(eso_path, variable, D, dtype=FLOAT32)
+        expected = get_results(eso_path, variable, D)
+        assert results.variables == expected.variables
+        for array, expected_array in zip(results.arrays, expected.arrays):
+            assert array.typecode == "f"
+            assert array.tolist() == pytest.approx(expected_array, rel=1e-6)
+
+    def test_convert_stored_outputs(self, session_eso_file):
+        results = session_eso_file.get_results(
+            Variable(None, None, None), M, dtype=FLOAT64
+        )
+        assert all(array.typecode == "d" for array in results.arrays)
+
+    def test_invalid_dtype(self, eso_path):
+        with pytest.raises(ValueError):
+            DBEsoFile.from_path(eso_path, dtype="int")
+
+
+class TestUnitConversion:
+    def test_convert_sliced_values(self, session_eso_file):
+        variable = Variable(None, None, "C")
+        start_date, end_date = datetime(2019, 5, 1), datetime(2019, 5, 2, 12)
+        results = session_eso_file.get_results(
+            variable, H, start_date=start_date, end_date=end_date, units={"C": "F"}
+        )
+        expected = session_eso_file.get_results(variable, H, units={"C": "F"})
+        expected = expected.slice(start_date, end_date)
+        assert results.time_series == expected.time_series
+        assert len(results.first_array) == 37
+        assert list(results.values()) == list(expected.values())
+
+    def test_convert_temperature(self, session_eso_file):
+        variable = Variable(None, None, "C")
+        results = session_eso_file.get_results(variable, H, units={"C": "F"})
+        expected = session_eso_file.get_results(variable, H)
+        assert results.variables == [v._replace(units="F") for v in expected.variables]
+        for array, expected_array in zip(results.arrays, expected.arrays):
+            assert array == pytest.approx([v * 1.8 + 32 for v in expected_array])
+
+    def test_other_units_are_kept(self, session_eso_file):
+        variable = Variable(None, None, None)
+        results = session_eso_file.get_results(variable, D, units={"J": "J"})
+        assert results == session_eso_file.get_results(variable, D)
+
+    def test_custom_conversion_typed_outputs(self, eso_path):
+        variable = Variable(None, None, "J")
+        collection = DBEsoFileCollection.from_path(eso_path, dtype=FLOAT32)
+        results = collection.get_results(variable, M, units={"J": ("kJ", 0.001, 0)})
+        expected = collection.get_results(variable, M)
+        assert {v.units for v in results.variables} == {"kJ"}
+        for array, expected_array in zip(results.arrays, expected.arrays):
+            assert array.typecode == "f"
+            assert array.tolist() == pytest.approx(
+                [v / 1000 for v in expected_array], rel=1e-6
+            )
+
+    def test_unknown_conversion(self, eso_path):
+        with pytest.raises(ValueError):
+            get_results(eso_path, Variable(None, None, None), D, units={"C": "J"})
+
+
+class TestOutOfCore:
+    @pytest.mark.parametrize("memory_limit", [1, 4096, 10**9])
+    def test_spilled_outputs(self, eso_path, session_eso_file, memory_limit):
+        db_eso_file = DBEsoFile.from_path(eso_path, memory_limit=memory_limit)
+        assert db_eso_file.dates == session_eso_file.dates
+        for frequency, outputs in session_eso_file.outputs.items():
+            assert list(db_eso_file.outputs[frequency]) == list(outputs)
+            for id_, values in outputs.items():
+                spilled_values = db_eso_file.outputs[frequency][id_]
+                assert isinstance(spilled_values, memoryview)
+                assert spilled_values.readonly
+                assert spilled_values.tolist() == pytest.approx(values, nan_ok=True)
+
+    def test_spilled_results(self, eso_path, session_eso_file):
+        db_eso_file = DBEsoFile.from_path(eso_path, dtype=FLOAT32, memory_limit=1)
+        variable = Variable(None, None, None)
+        results = db_eso_file.get_results(variable, H, dtype=FLOAT64)
+        expected = session_eso_file.get_results(variable, H)
+        assert results.variables == expected.variables
+        for array, expected_array in zip(results.arrays, expected.arrays):
+            assert array.tolist() == pytest.approx(expected_array, rel=1e-6)
+
+    def test_spilled_environments(self, multi_env_eso_path):
+        collection = DBEsoFileCollection.from_path(multi_env_eso_path, memory_limit=64)
+        expected = DBEsoFileCollection.from_path(multi_env_eso_path)
+        lazy = LazyDBEsoFileCollection.from_path(multi_env_eso_path, memory_limit=64)
+        variable = Variable(None, None, None)
+        results = collection.get_results(variable, D)
+        assert results.time_series == expected.get_results(variable, D).time_series
+        assert [list(a) for a in lazy.get_results(variable, D).arrays] == [
+            list(a) for a in results.arrays
+        ]
+
+
+class TestEsoSummary:
+    def test_summary_matches_outputs(self, eso_path, session_eso_file):
+        summary = get_summary(eso_path)[0]
+        assert summary.frequencies == session_eso_file.frequencies
+        for frequency, statistics in summary.statistics.items():
+            assert list(statistics) == sorted(session_eso_file.header[frequency])
+            for variable, variable_statistics in statistics.items():
+                id_ = session_eso_file.header[frequency][variable]
+                values = session_eso_file.outputs[frequency][id_]
+                dates = session_eso_file.dates[frequency]
+                maximum = max(values)
+                minimum = min(values)
+                assert variable_statistics.count == len(values)
+                assert variable_statistics.total == pytest.approx(sum(values))
+                assert variable_statistics.mean == pytest.approx(
+                    sum(values) / len(values)
+                )
+                assert variable_statistics.sum_squares == pytest.approx(
+                    sum(value * value for value in values)
+                )
+                assert variable_statistics.maximum == maximum
+                assert variable_statistics.maximum_date == dates[values.index(maximum)]
+                assert variable_statistics.minimum == minimum
+                assert variable_statistics.minimum_date == dates[values.index(minimum)]
+
+    def test_summary_requested_variables(self, eso_path):
+        variable = Variable(None, "temperature", None)
+        summary = get_summary(eso_path, variable, alike=True)[0]
+        variables = [
+            v for statistics in summary.statistics.values() for v in statistics
+        ]
+        assert variables
+        assert all("Temperature" in v.type for v in variables)
+        assert get_summary(eso_path, variable)[0].statistics[H] == {}
+
+    def test_summary_environments(self, multi_env_eso_path):
+        summaries = get_summary(multi_env_eso_path, environments="SIZING")
+        assert [summary.environment_name for summary in summaries] == ["SIZING"]
+
+    def test_summary_table(self, eso_path):
+        summary = get_summary(eso_path, Variable(None, None, "C"))[0]
+        table = summary.to_table()
+        assert table[0] == SUMMARY_COLUMNS
+        assert len(table) == 1 + sum(len(s) for s in summary.statistics.values())
+        frequency = summary.frequencies[0]
+        variable = next(iter(summary.statistics[frequency]))
+        assert table[1][:4] == [frequency] + list(variable)
+
+
+class TestEsoIndex:
+    def test_build_index(self, multi_env_eso_path):
+        index = build_index(multi_env_eso_path)
+        assert index.environment_names == ["SIZING", "UNTITLED (01-01:31-12)"]
+        with open(multi_env_eso_path, "r") as file:
+            for _, offset in index.environments:
+                file.seek(offset)
+                assert file.readline().startswith("1,")
+
+    def test_index_sidecar(self, multi_env_eso_path):
+        DBEsoFileCollection.from_path(
+            multi_env_eso_path, environments="SIZING", save_index=True
+        )
+        index = read_index(get_index_path(multi_env_eso_path))
+        assert index.is_valid_for(multi_env_eso_path)
+        assert get_index(multi_env_eso_path).environments == index.environments
+
+    def test_index_is_not_saved_by_default(self, multi_env_eso_path):
+        DBEsoFileCollection.from_path(multi_env_eso_path, environments="SIZING")
+        LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        assert not os.path.exists(get_index_path(multi_env_eso_path))
+
+    def test_process_selected_environment(self, multi_env_eso_path, session_eso_file):
+        db_eso_file = DBEsoFile.from_path(
+            multi_env_eso_path, environments="untitled (01-01:31-12)"
+        )
+        assert db_eso_file.environment_name == "UNTITLED (01-01:31-12)"
+        assert db_eso_file.outputs == session_eso_file.outputs
+        assert db_eso_file.dates == session_eso_file.dates
+
+    def test_process_environments_keep_file_order(self, multi_env_eso_path):
+        collection = DBEsoFileCollection.from_path(
+            multi_env_eso_path, environments=["UNTITLED (01-01:31-12)", "SIZING"]
+        )
+        assert collection.environment_names == ["SIZING", "UNTITLED (01-01:31-12)"]
+
+    def test_multiple_environments_require_collection(self, multi_env_eso_path):
+        with pytest.raises(CollectionRequired):
+            DBEsoFile.from_path(multi_env_eso_path)
+
+    def test_missing_environment(self, multi_env_eso_path):
+        with pytest.raises(EnvironmentNotFound):
+            DBEsoFileCollection.from_path(multi_env_eso_path, environments="FOO")
+
+
+class TestLazyCollection:
+    @pytest.fixture(scope="function")
+    def read_calls(self, monkeypatch):
+        calls = []
+
+        def read_eso_file(file_path, offsets, *args, **kwargs):
+            calls.append(offsets)
+            return esofile_reader.read_eso_file(file_path, offsets, *args, **kwargs)
+
+        monkeypatch.setattr(lazy_collection, "read_eso_file", read_eso_file)
+        return calls
+
+    def test_open_without_processing(self, multi_env_eso_path, read_calls):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        assert collection.environment_names == ["SIZING", "UNTITLED (01-01:31-12)"]
+        assert len(collection) == 2
+        assert collection.loaded_environment_names == []
+        assert read_calls == []
+
+    def test_environment_is_loaded_once(
+        self, multi_env_eso_path, session_eso_file, read_calls
+    ):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        db_eso_file = collection[-1]
+        assert collection[1] is db_eso_file
+        assert db_eso_file in collection
+        assert collection.loaded_environment_names == ["UNTITLED (01-01:31-12)"]
+        assert len(read_calls) == 1
+        assert db_eso_file.outputs == session_eso_file.outputs
+        assert db_eso_file.dates == session_eso_file.dates
+
+    def test_matches_collection(self, multi_env_eso_path):
+        lazy = LazyDBEsoFileCollection.from_path(multi_env_eso_path, dtype=FLOAT64)
+        collection = DBEsoFileCollection.from_path(multi_env_eso_path, dtype=FLOAT64)
+        assert [f.outputs for f in lazy] == [f.outputs for f in collection]
+        assert [f.environment_name for f in lazy[:1]] == ["SIZING"]
+        variable = Variable(None, None, None)
+        assert lazy.get_results(variable, D) == collection.get_results(variable, D)
+
+    def test_memory_budget(self, multi_env_eso_path, read_calls):
+        collection = LazyDBEsoFileCollection.from_path(
+            multi_env_eso_path, memory_budget=1
+        )
+        list(collection)
+        assert collection.loaded_environment_names == ["UNTITLED (01-01:31-12)"]
+        collection[0]
+        assert collection.loaded_environment_names == ["SIZING"]
+        assert len(read_calls) == 3
+        collection.unload()
+        assert collection.loaded_size == 0
+
+    def test_selected_environments(self, multi_env_eso_path):
+        collection = LazyDBEsoFileCollection.from_path(
+            multi_env_eso_path, environments="untitled (01-01:31-12)"
+        )
+        assert collection.environment_names == ["UNTITLED (01-01:31-12)"]
+        assert collection[0].environment_name == "UNTITLED (01-01:31-12)"
+        with pytest.raises(EnvironmentNotFound):
+            LazyDBEsoFileCollection.from_path(multi_env_eso_path, environments="FOO")
+
+    def test_pickle_lazy_collection(self, multi_env_eso_path):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        collection[0]
+        unpickled = pickle.loads(pickle.dumps(collection))
+        assert unpickled.environments == collection.environments
+        assert unpickled.loaded_environment_names == []
+        assert unpickled[0].outputs == collection[0].outputs
+
+    def test_read_only(self, multi_env_eso_path, session_eso_file):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        with pytest.raises(TypeError):
+            collection.append(session_eso_file)
+
+    def test_header_is_parsed_once(self, multi_env_eso_path, monkeypatch):
+        calls = []
+        original = esofile_reader.read_file_header
+
+        def read_file_header(*args, **kwargs):
+            calls.append(args)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(esofile_reader, "read_file_header", read_file_header)
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        list(collection)
+        collection.unload()
+        collection[1]
+        assert len(calls) == 1
+
+    def test_count(self, multi_env_eso_path):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        assert collection.count() == 2
+
+    def test_copy(self, multi_env_eso_path):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        db_eso_file = collection[0]
+        copied = copy.copy(collection)
+        assert copied.environments == collection.environments
+        assert copied.loaded_environment_names == ["SIZING"]
+        assert copied[0] is db_eso_file
+        copied.unload()
+        assert collection.loaded_environment_names == ["SIZING"]
+        assert copied[1].outputs == collection[1].outputs
+
+    def test_deepcopy(self, multi_env_eso_path):
+        collection = LazyDBEsoFileCollection.from_path(multi_env_eso_path)
+        db_eso_file = collection[0]
+        copied = copy.deepcopy(collection)
+        assert copied.loaded_environment_names == ["SIZING"]
+        assert copied[0] is not db_eso_file
+        assert copied[0].outputs == db_eso_file.outputs
+        assert copied[1].outputs == collection[1].outputs
+
+
+class TestEsoFileFollower:
+    @pytest.fixture(scope="function")
+    def live_eso_path(self, tmp_path):
+        return os.path.join(str(tmp_path), "live.eso")
+
+    def test_follow_growing_file(self, eso_path, live_eso_path, session_eso_file):
+        with open(eso_path, "rb") as file:
+            content = file.read()
+        follower = EsoFileFollower(live_eso_path)
+        step = len(content) // 7
+        for i in range(0, len(content), step):
+            with open(live_eso_path, "ab") as file:
+                file.write(content[i : i + step])
+            follower.poll()
+        assert follower.complete
+        db_eso_file = follower.to_collection()[0]
+        assert db_eso_file.outputs == session_eso_file.outputs
+        assert db_eso_file.dates == session_eso_file.dates
+
+    def test_collection_is_not_affected_by_poll(self, eso_path, live_eso_path):
+        with open(eso_path, "rb") as file:
+            content = file.read()
+        with open(live_eso_path, "wb") as file:
+            file.write(content[: len(content) // 2])
+        follower = EsoFileFollower(live_eso_path)
+        follower.poll()
+        db_eso_file = follower.to_collection()[0]
+        with open(live_eso_path, "ab") as file:
+            file.write(content[len(content) // 2 :])
+        follower.poll()
+        for frequency, outputs in db_eso_file.outputs.items():
+            n_steps = len(db_eso_file.dates[frequency])
+            assert all(len(values) == n_steps for values in outputs.values())
+        for frequency, days_of_week in db_eso_file.days_of_week.items():
+            assert len(days_of_week) == len(db_eso_file.dates[frequency])
+        assert len(db_eso_file.dates[H]) < len(follower.to_collection()[0].dates[H])
+
+    def test_incomplete_block_is_postponed(self, eso_path, live_eso_path):
+        with open(eso_path, "rb") as file:
+            content = file.read()
+        with open(live_eso_path, "wb") as file:
+            file.write(content[: len(content) // 2])
+        follower = EsoFileFollower(live_eso_path)
+        follower.poll()
+        assert not follower.complete
+        raw_outputs = follower.all_raw_outputs[0]
+        assert all(
+            not math.isnan(array[-1])
+            for array in raw_outputs.outputs[H].values()
+            if array
+        )
+        assert follower.poll() == 0
+
+    def test_restarted_file(self, eso_path, live_eso_path):
+        shutil.copy(eso_path, live_eso_path)
+        follower = EsoFileFollower(live_eso_path)
+        follower.poll()
+        with open(live_eso_path, "w") as file:
+            file.write("")
+        follower.poll()
+        assert follower.all_raw_outputs == []
+        assert not follower.complete
+
+
+class TestCompressedEsoFile:
+    @pytest.mark.parametrize(
+        "module, ext", [(gzip, ".gz"), (bz2, ".bz2"), (lzma, ".xz")]
+    )
+    def test_process_compressed_file(
+        self, eso_path, tmp_path, session_eso_file, module, ext
+    ):
+        compressed_path = os.path.join(str(tmp_path), "eplusout.eso" + ext)
+        with open(eso_path, "rb") as src, module.open(compressed_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        db_eso_file = DBEsoFile.from_path(compressed_path)
+        assert db_eso_file.outputs == session_eso_file.outputs
+        assert db_eso_file.dates == session_eso_file.dates
+
+    def test_compressed_file_extension(self):
+        assert get_file_extension("eplusout.eso.gz") == ".eso"
+        assert get_file_extension("eplusout.sql.XZ") == ".sql"
+        assert get_file_extension("eplusout.sql") == ".sql"
+
+
+class TestValidateEso:
+    @pytest.fixture(scope="function")
+    def truncated_eso_path(self, eso_path, tmp_path):
+        path = os.path.join(str(tmp_path), "truncated.eso")
+        with open(eso_path, "rb") as src, open(path, "wb") as dst:
+            dst.write(src.read()[:-1000])
+        return path
+
+    def test_validate_complete_file(self, eso_path):
+        assert validate_eso(eso_path)
+
+    def test_validate_truncated_file(self, truncated_eso_path):
+        assert not validate_eso(truncated_eso_path)
+
+    def test_validate_invalid_records_trailer(self, eso_path, tmp_path):
+        path = os.path.join(str(tmp_path), "invalid_trailer.eso")
+        with open(eso_path, "r") as src, open(path, "w") as dst:
+            content = src.read()
+            dst.write(content[: content.index("End of Data\n")])
+            dst.write("End of Data\n Number of Records Written=")
+        assert not validate_eso(path)
+
+    def test_truncated_file_fails_before_processing(self, truncated_eso_path):
+        with pytest.raises(IncompleteFile):
+            DBEsoFile.from_path(truncated_eso_path)
@@ -0,0 +1,136 @@
+import math
+from array import array
+
+import pytest
+
+from db_eplusout_reader import Variable, get_derived_results, get_results
+from db_eplusout_reader.constants import FLOAT64, H, M
+from db_eplusout_reader.exceptions import NoResults
+from db_eplusout_reader.expressions import (
+    Column,
+    Constant,
+    DerivedResults,
+    Mean,
+    Sum,
+    get_sources,
+)
+
+ZONE1 = Variable("Temperature", "Zone1", "C")
+ZONE2 = Variable("Temperature", "Zone2", "C")
+ALL_ZONES = Variable("Temperature", None, "C")
+COOLING = Variable(None, "Zone Sensible Cooling Energy", "J")
+ELECTRICITY = Variable(None, "Electricity:Facility", "J")
+ZONE_TEMPERATURE = Variable(None, "Zone Mean Air Temperature", "C")
+
+
+class TestExpressions:
+    def test_sum(self, results_dictionary):
+        derived = results_dictionary.derive({"total": Sum(ALL_ZONES)})
+        assert derived["total"] == [61, 67, 59]
+        assert derived.time_series == results_dictionary.time_series
+        assert derived.frequency == H
+
+    def test_mean(self, results_dictionary):
+        derived = results_dictionary.derive({"mean": Mean([ZONE1, ZONE2])})
+        assert derived["mean"] == [21.0, 22.0, 19.5]
+
+    def test_arithmetic(self, results_dictionary):
+        expression = (Column(ZONE1) - ZONE2) * 2 + 1
+        derived = results_dictionary.derive({"diff": expression, "neg": -Column(ZONE1)})
+        assert derived["diff"] == [-3, -3, 3]
+        assert derived["neg"] == [-20, -21, -20]
+
+    def test_reversed_operands(self, results_dictionary):
+        derived = results_dictionary.derive(
+            {"inverse": 60 / Column(ZONE1), "offset": 100 - Column(ZONE1)}
+        )
+        assert derived["inverse"] == [3.0, 60 / 21, 3.0]
+        assert derived["offset"] == [80, 79, 80]
+
+    def test_variable_as_column(self, results_dictionary):
+        derived = results_dictionary.derive(
+            {"zone1": ZONE1, "ratio": ZONE2 / Sum(ZONE1)}
+        )
+        assert derived["zone1"] == [20, 21, 20]
+        assert derived["ratio"] == [22 / 20, 23 / 21, 19 / 20]
+
+    def test_division_by_zero(self, results_dictionary):
+        results_dictionary[ZONE1] = [20, 0, 20]
+        derived = results_dictionary.derive({"ratio": Column(ZONE2) / ZONE1})
+        ratio = derived["ratio"]
+        assert ratio[0] == 22 / 20
+        assert math.isnan(ratio[1])
+
+    def test_alike(self, results_dictionary):
+        derived = results_dictionary.derive(
+            {"total": Sum(Variable("temp", "zone", None))}, alike=True
+        )
+        assert derived["total"] == [61, 67, 59]
+
+    def test_column_multiple_matches(self, results_dictionary):
+        derived = results_dictionary.derive({"zones": Column(ALL_ZONES)})
+        with pytest.raises(ValueError):
+            _ = derived["zones"]
+
+    def test_no_matches(self, results_dictionary):
+        derived = results_dictionary.derive({"foo": Sum(Variable("foo", None, None))})
+        with pytest.raises(NoResults):
+            _ = derived["foo"]
+
+    def test_invalid_operand(self):
+        with pytest.raises(TypeError):
+            _ = Column(ZONE1) + "foo"
+
+    def test_lazy_evaluation(self, results_dictionary):
+        derived = results_dictionary.derive(
+            {"valid": Sum(ZONE1), "invalid": Column(ALL_ZONES)}
+        )
+        assert list(derived) == ["valid", "invalid"]
+        assert derived["valid"] == [20, 21, 20]
+
+    def test_cached_sub_expressions(self, results_dictionary):
+        total = Sum(ALL_ZONES)
+        derived = results_dictionary.derive(
+            {"total": total, "share": Column(ZONE1) / total, "mean": Mean(ALL_ZONES)}
+        )
+        assert derived["share"] == [20 / 61, 21 / 67, 20 / 59]
+        assert derived["mean"] == [61 / 3, 67 / 3, 59 / 3]
+        assert derived.evaluate(Sum(ALL_ZONES)) is derived["total"]
+
+    def test_typed_arrays(self, results_dictionary):
+        compact = results_dictionary.to_compact(FLOAT64)
+        derived = compact.derive({"total": Sum(ALL_ZONES) / 3})
+        assert derived["total"] == [61 / 3, 67 / 3, 59 / 3]
+        assert isinstance(compact[ZONE1], (array, memoryview))
+
+    def test_get_sources(self):
+        sources = get_sources(
+            [Sum(ALL_ZONES) / Column(ZONE1), ZONE1 * Constant(2), Mean(ALL_ZONES)]
+        )
+        assert sources == [ALL_ZONES, ZONE1]
+
+
+class TestDerivedResults:
+    @pytest.mark.parametrize(
+        "file_or_path", ["eso_path", "sql_path", "session_eso_file"]
+    )
+    def test_get_derived_results(self, request, file_or_path):
+        file_or_path = request.getfixturevalue(file_or_path)
+        zones = Sum(ZONE_TEMPERATURE)
+        derived = get_derived_results(
+            file_or_path, {"zones": zones, "per_joule": zones / ELECTRICITY}, H
+        )
+        results = get_results(file_or_path, [ZONE_TEMPERATURE, ELECTRICITY], H)
+        zone1, zone2, electricity = (results[v] for v in results.variables)
+        expected = [t1 + t2 for t1, t2 in zip(zone1, zone2)]
+        assert derived["zones"] == expected
+        assert derived["per_joule"] == [t / e for t, e in zip(expected, electricity)]
+        assert derived.time_series == results.time_series
+
+    def test_only_referenced_variables(self, session_eso_file):
+        derived = session_eso_file.get_derived_results({"cooling": Sum(COOLING)}, M)
+        assert isinstance(derived, DerivedResults)
+        assert list(derived.results) == [
+            Variable("BLOCK1:ZONE1", COOLING.type, "J"),
+            Variable("BLOCK1:ZONE2", COOLING.type, "J"),
+        ]
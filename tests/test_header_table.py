@@ -0,0 +1,157 @@
+import pickle
+
+import pytest
+
+from db_eplusout_reader import DBEsoFile, DBEsoFileCollection, HeaderTable, Variable
+from db_eplusout_reader.constants import A, H, M
+from db_eplusout_reader.processing import esofile_reader, header_cache
+from db_eplusout_reader.processing.header_cache import (
+    HEADER_CACHE_VERSION,
+    HeaderCache,
+    configure_header_cache,
+    get_header_cache,
+)
+from db_eplusout_reader.sql_reader import get_results_from_sql
+
+
+class TestHeaderTable:
+    def test_get_variable(self):
+        header_table = HeaderTable()
+        variable = header_table.get_variable("BLOCK1:ZONE1", "Zone Temperature", "C")
+        assert variable == Variable("BLOCK1:ZONE1", "Zone Temperature", "C")
+        assert header_table.get_variable(*variable) is variable
+        other = header_table.get_variable("BLOCK1:ZONE2", "Zone " + "Temperature", "C")
+        assert other.type is variable.type
+
+    def test_get_header(self):
+        header_table = HeaderTable()
+        header = {H: {Variable("a", "b", "c"): 1}}
+        assert header_table.get_header(header) is header
+        assert header_table.get_header({H: {Variable("a", "b", "c"): 1}}) is header
+        other_header = {H: {Variable("a", "b", "c"): 2}}
+        assert header_table.get_header(other_header) is other_header
+
+    def test_interned_header_strings(self, session_eso_file):
+        units = {}
+        for variable in session_eso_file.header[H]:
+            assert units.setdefault(variable.units, variable.units) is variable.units
+
+    def test_shared_eso_header(self, eso_path):
+        header_table = HeaderTable()
+        db_eso_file = DBEsoFile.from_path(eso_path, header_table=header_table)
+        collection = DBEsoFileCollection.from_path(eso_path, header_table=header_table)
+        assert collection[0].header is db_eso_file.header
+        get_header_cache().clear()
+        assert DBEsoFile.from_path(eso_path).header is not db_eso_file.header
+
+    def test_missing_frequency_is_not_added(self, eso_path):
+        header_table = HeaderTable()
+        db_eso_file = DBEsoFile.from_path(eso_path, header_table=header_table)
+        frequencies = list(db_eso_file.header)
+        with pytest.raises(KeyError):
+            db_eso_file.header[A]
+        assert not db_eso_file.find_ids(Variable(None, None, None), A)
+        other = DBEsoFile.from_path(eso_path, header_table=header_table)
+        assert other.header is db_eso_file.header
+        assert list(other.header) == frequencies
+
+    def test_shared_header_is_pickled_once(self, multi_env_eso_path):
+        collection = DBEsoFileCollection.from_path(multi_env_eso_path)
+        assert len({id(db_eso_file.header) for db_eso_file in collection}) == 1
+        collection = pickle.loads(pickle.dumps(collection))
+        assert len({id(db_eso_file.header) for db_eso_file in collection}) == 1
+
+    def test_shared_sql_variables(self, sql_path):
+        header_table = HeaderTable()
+        variable = Variable(None, None, None)
+        results = get_results_from_sql(sql_path, variable, M, header_table=header_table)
+        other = get_results_from_sql(
+            sql_path, variable, M, units={"J": "kWh"}, header_table=header_table
+        )
+        for variable, other_variable in zip(results.variables, other.variables):
+            if variable.units == "J":
+                assert other_variable.units == "kWh"
+                assert other_variable.type is variable.type
+            else:
+                assert other_variable is variable
+
+
+def fail_parse_header(raw_lines, header_table=None):
+    raise AssertionError("Header should not be parsed.")
+
+
+@pytest.fixture
+def empty_header_cache(monkeypatch):
+    monkeypatch.setattr(header_cache, "_HEADER_CACHE", HeaderCache(max_headers=8))
+
+
+@pytest.mark.usefixtures("empty_header_cache")
+class TestHeaderCache:
+    def test_known_header_is_not_parsed(self, eso_path, monkeypatch):
+        db_eso_file = DBEsoFile.from_path(eso_path)
+        monkeypatch.setattr(esofile_reader, "parse_header", fail_parse_header)
+        other = DBEsoFile.from_path(eso_path)
+        assert other.header is db_eso_file.header
+        assert other.outputs == db_eso_file.outputs
+
+    def test_header_bin_ids(self, eso_path):
+        header = DBEsoFile.from_path(eso_path).header
+        assert header.bin_ids is header.bin_ids
+        assert set(header.bin_ids[H]) == set(header[H].values())
+
+    def test_disk_cache(self, eso_path, tmp_path, monkeypatch):
+        configure_header_cache(max_headers=8, cache_dir=str(tmp_path))
+        db_eso_file = DBEsoFile.from_path(eso_path)
+        assert len(list(tmp_path.iterdir())) == 1
+        # fresh cache simulates another process
+        configure_header_cache(max_headers=8, cache_dir=str(tmp_path))
+        monkeypatch.setattr(esofile_reader, "parse_header", fail_parse_header)
+        other = DBEsoFile.from_path(eso_path)
+        assert other.header == db_eso_file.header
+        assert other.outputs == db_eso_file.outputs
+
+    def test_invalid_disk_cache_file(self, eso_path, tmp_path):
+        configure_header_cache(max_headers=8, cache_dir=str(tmp_path))
+        DBEsoFile.from_path(eso_path)
+        for path in tmp_path.iterdir():
+            path.write_bytes(b"invalid")
+        cache = configure_header_cache(max_headers=8, cache_dir=str(tmp_path))
+        assert DBEsoFile.from_path(eso_path).header
+        assert len(cache) == 1
+
+    def test_least_recently_used_header_is_removed(self):
+        cache = HeaderCache(max_headers=2)
+        for fingerprint in ["a", "b", "a", "c"]:
+            if cache.get(fingerprint) is None:
+                cache.set(fingerprint, {fingerprint: {}})
+        assert cache.get("a") == {"a": {}}
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_disabled_cache(self, eso_path):
+        configure_header_cache(max_headers=0)
+        header = DBEsoFile.from_path(eso_path).header
+        assert DBEsoFile.from_path(eso_path).header is not header
+        assert len(get_header_cache()) == 0
+
+    def test_cache_is_disabled_by_default(self, eso_path, monkeypatch):
+        monkeypatch.setattr(header_cache, "_HEADER_CACHE", HeaderCache())
+        header = DBEsoFile.from_path(eso_path).header
+        assert DBEsoFile.from_path(eso_path).header is not header
+        assert len(get_header_cache()) == 0
+
+    def test_disabled_cache_does_not_hash_header(self, eso_path, monkeypatch):
+        def fail_fingerprint(raw_lines):
+            raise AssertionError("Header should not be hashed.")
+
+        configure_header_cache(max_headers=0)
+        monkeypatch.setattr(esofile_reader, "get_header_fingerprint", fail_fingerprint)
+        assert DBEsoFile.from_path(eso_path).header
+
+    def test_disk_cache_is_not_unpickled(self, eso_path, tmp_path):
+        configure_header_cache(max_headers=8, cache_dir=str(tmp_path))
+        header = DBEsoFile.from_path(eso_path).header
+        for path in tmp_path.iterdir():
+            path.write_bytes(pickle.dumps((HEADER_CACHE_VERSION, {"foo": {}})))
+        configure_header_cache(max_headers=8, cache_dir=str(tmp_path))
+        assert DBEsoFile.from_path(eso_path).header == header
@@ -0,0 +1,99 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from db_eplusout_reader import Variable, get_results
+from db_eplusout_reader.constants import RP, H
+from db_eplusout_reader.reducers import (
+    Count,
+    ElementwiseMean,
+    ElementwiseSum,
+    Histogram,
+    Max,
+    Mean,
+    Min,
+    Percentile,
+    Sum,
+    reduce_results,
+)
+
+VARIABLE = Variable("BLOCK1:ZONE1", "Zone Mean Air Temperature", "C")
+
+
+@pytest.fixture(scope="module")
+def values(eso_path):
+    return list(get_results(eso_path, VARIABLE, H)[VARIABLE])
+
+
+class TestReducers:
+    def test_scalar_reducers(self, values):
+        assert math.fsum(values) == Sum().create(values)
+        assert len(values) == Count().create(values + [float("nan")])
+        assert min(values) == Min().create(values)
+        assert max(values) == Max().create(values)
+        assert None is Max().merge(None, None)
+        assert (3.0, 2) == Mean().merge(Mean().create([1.0]), Mean().create([2.0]))
+
+    def test_elementwise_reducers(self):
+        reducer = ElementwiseMean()
+        partial = reducer.merge(reducer.create([1.0, 2.0]), reducer.create([3.0, 4.0]))
+        assert [2.0, 3.0] == list(reducer.result(partial))
+        assert [4.0, 6.0] == list(ElementwiseSum().result(partial))
+        with pytest.raises(ValueError):
+            reducer.merge(partial, reducer.create([1.0]))
+
+    def test_histogram(self):
+        reducer = Histogram([3, 1, 2])
+        partial = reducer.merge(reducer.create([0.5, 1, 1.5]), reducer.create([2, 5]))
+        assert [1, 2, 1, 1] == partial
+
+    def test_percentile(self):
+        reducer = Percentile(50, range(11))
+        assert 5.0 == reducer.result(
+            reducer.create([float(i) + 0.5 for i in range(10)])
+        )
+        assert None is reducer.result(reducer.create([]))
+        with pytest.raises(ValueError):
+            Percentile(101, range(11))
+
+
+class TestReduceResults:
+    @pytest.mark.parametrize(
+        "executor", [None, "thread", "process", ThreadPoolExecutor(max_workers=2)]
+    )
+    def test_reduce_results(self, eso_path, sql_path, values, executor):
+        results = reduce_results(
+            [eso_path, sql_path, eso_path],
+            VARIABLE,
+            H,
+            {"mean": Mean(), "max": Max(), "sum": ElementwiseSum()},
+            executor=executor,
+            workers=2,
+            batch_size=1,
+        )
+        assert (
+            pytest.approx(math.fsum(values) / len(values)) == results["mean"][VARIABLE]
+        )
+        assert max(values) == results["max"][VARIABLE]
+        assert pytest.approx([3 * value for value in values]) == list(
+            results["sum"][VARIABLE]
+        )
+
+    def test_reduce_meter(self, eso_path, sql_path):
+        eso_meter = Variable("Meter", "Electricity:Facility", "J")
+        sql_meter = Variable("", "Electricity:Facility", "J")
+        results = reduce_results(
+            [eso_path, sql_path],
+            Variable(None, "Electricity:Facility", None),
+            RP,
+            {"count": Count()},
+        )
+        assert {eso_meter: 1, sql_meter: 1} == dict(results["count"])
+
+    def test_no_files(self):
+        assert {"sum": {}} == reduce_results([], VARIABLE, H, {"sum": Sum()})
+
+    def test_invalid_executor(self, eso_path):
+        with pytest.raises(ValueError):
+            reduce_results([eso_path], VARIABLE, H, {"sum": Sum()}, executor="foo")
@@ -1,4 +1,5 @@
 import csv
+from array import array
 from datetime import datetime
 
 import pytest
@@ -6,7 +7,11 @@ import pytest
 from db_eplusout_reader import Variable
 from db_eplusout_reader.constants import H
 from db_eplusout_reader.exceptions import InvalidShape, NoResults
-from db_eplusout_reader.results_dict import ResultsDictionary, ResultsHandler
+from db_eplusout_reader.results_dict import (
+    CompactResultsDictionary,
+    ResultsDictionary,
+    ResultsHandler,
+)
 
 
 class TestResultsDictionary:
@@ -153,6 +158,23 @@ class TestResultsDictionary:
             csv_reader = csv.reader(csv_file)
             assert list(csv_reader) == expected
 
+    def test_slice(self, results_dictionary):
+        sliced = results_dictionary.slice(start_date=datetime(2002, 1, 2))
+        assert sliced.time_series == [datetime(2002, 1, 2), datetime(2002, 1, 3)]
+        assert sliced.first_array == [23, 19]
+        assert results_dictionary.first_array == [22, 23, 19]
+
+    def test_slice_out_of_range(self, results_dictionary):
+        sliced = results_dictionary.slice(start_date=datetime(2003, 1, 1))
+        assert sliced.time_series == []
+        assert sliced.arrays == [[], [], []]
+
+    def test_slice_requires_time_series(self):
+        rd = ResultsDictionary(H)
+        rd[Variable("Temperature", "Zone1", "C")] = [1, 2]
+        with pytest.raises(ValueError):
+            rd.slice(end_date=datetime(2002, 1, 1))
+
     def test_get_table_shape(self, results_dictionary):
         table = results_dictionary.to_table()
         assert ResultsHandler.get_table_shape(table) == (6, 4)
@@ -161,3 +183,128 @@ class TestResultsDictionary:
         table = [[1, 2, 3], [1, 2], [1, 2, 3]]
         with pytest.raises(InvalidShape):
             _ = ResultsHandler.get_table_shape(table)
+
+
+class TestCompactResultsDictionary:
+    @pytest.fixture(scope="function")
+    def compact_results(self, results_dictionary):
+        return results_dictionary.to_compact()
+
+    def test_mapping_interface(self, compact_results, results_dictionary):
+        assert list(compact_results.keys()) == list(results_dictionary.keys())
+        assert len(compact_results) == 3
+        assert Variable("Temperature", "Zone1", "C") in compact_results
+        assert compact_results[Variable("Temperature", "Zone1", "C")].tolist() == [
+            20,
+            21,
+            20,
+        ]
+
+    def test_properties(self, compact_results):
+        assert compact_results.scalar == 22
+        assert compact_results.first_array.tolist() == [22, 23, 19]
+        assert compact_results.first_variable == Variable("Temperature", "Zone2", "C")
+        assert [array.tolist() for array in compact_results.arrays] == [
+            [22, 23, 19],
+            [20, 21, 20],
+            [19, 23, 20],
+        ]
+        assert compact_results.frequency == H
+
+    def test_columns_share_block(self, compact_results):
+        compact_results.block[1] = 100
+        assert compact_results.first_array[1] == 100
+
+    def test_get_row(self, compact_results):
+        assert compact_results.get_row(1).tolist() == [23, 21, 23]
+        assert compact_results.get_row(-1).tolist() == [19, 20, 20]
+        with pytest.raises(IndexError):
+            compact_results.get_row(3)
+
+    def test_get_rows(self, compact_results):
+        sliced = compact_results.get_rows(1, 3)
+        assert sliced.first_array.tolist() == [23, 19]
+        assert sliced.time_series == [datetime(2002, 1, 2), datetime(2002, 1, 3)]
+
+    def test_slice(self, compact_results):
+        sliced = compact_results.slice(
+            start_date=datetime(2002, 1, 1, 12), end_date=datetime(2002, 1, 2)
+        )
+        assert sliced.time_series == [datetime(2002, 1, 2)]
+        assert sliced.get_row(0).tolist() == [23, 21, 23]
+
+    def test_to_table(self, compact_results, results_dictionary):
+        assert compact_results.to_table() == results_dictionary.to_table()
+
+    def test_invalid_shape(self):
+        with pytest.raises(InvalidShape):
+            CompactResultsDictionary.from_arrays(
+                H, [Variable("a", "b", "c"), Variable("a", "b", "d")], [[1, 2], [1]]
+            )
+
+    def test_empty(self):
+        with pytest.raises(NoResults):
+            _ = CompactResultsDictionary(H, [], array("d")).first_array
+
+
+class TestAnalysis:
+    @pytest.fixture(scope="function")
+    def analysed_results(self, results_dictionary):
+        results_dictionary[Variable("Temperature", "Zone4", "C")] = [
+            21.0,
+            float("nan"),
+            25.0,
+        ]
+        return results_dictionary
+
+    def test_load_duration_curve(self, analysed_results):
+        curve = analysed_results.load_duration_curve()
+        assert curve.time_series is None
+        assert curve.arrays == [[23, 22, 19], [21, 20, 20], [23, 20, 19], [25.0, 21.0]]
+
+    def test_load_duration_curve_typed_array(self, results_dictionary):
+        curve = results_dictionary.to_compact().load_duration_curve()
+        assert curve.first_array == array("d", [23, 22, 19])
+
+    def test_percentile(self, analysed_results):
+        percentiles = analysed_results.percentile(50)
+        assert list(percentiles.values()) == [22, 20, 20, 23.0]
+        percentiles = analysed_results.percentile([0, 25, 100])
+        assert percentiles[Variable("Temperature", "Zone2", "C")] == [19, 20.5, 23]
+        with pytest.raises(ValueError):
+            analysed_results.percentile(101)
+
+    def test_percentile_no_values(self):
+        rd = ResultsDictionary(H)
+        rd[Variable("Temperature", "Zone1", "C")] = []
+        assert list(rd.percentile(50).values()) == [None]
+
+    def test_histogram(self, analysed_results):
+        counts, edges = analysed_results.histogram(2)[
+            Variable("Temperature", "Zone2", "C")
+        ]
+        assert counts == [1, 2]
+        assert edges == [19, 21, 23]
+        histograms = analysed_results.histogram([19, 20, 21, 25])
+        assert [counts for counts, _ in histograms.values()] == [
+            [1, 0, 2],
+            [0, 2, 1],
+            [1, 1, 1],
+            [0, 0, 2],
+        ]
+
+    def test_top_n(self, analysed_results):
+        peaks = analysed_results.top_n(2)
+        assert list(peaks.values()) == [
+            [(datetime(2002, 1, 2), 23), (datetime(2002, 1, 1), 22)],
+            [(datetime(2002, 1, 2), 21), (datetime(2002, 1, 1), 20)],
+            [(datetime(2002, 1, 2), 23), (datetime(2002, 1, 3), 20)],
+            [(datetime(2002, 1, 3), 25.0), (datetime(2002, 1, 1), 21.0)],
+        ]
+
+    def test_top_n_compact(self, results_dictionary):
+        compact_results = results_dictionary.to_compact()
+        compact_results.time_series = None
+        assert compact_results.top_n(1)[Variable("Temperature", "Zone3", "C")] == [
+            (1, 23)
+        ]
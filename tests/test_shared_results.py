@@ -0,0 +1,199 @@
+import copy
+import math
+import os
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from db_eplusout_reader import DBEsoFile, DBEsoFileCollection, Variable
+from db_eplusout_reader.constants import FLOAT32, H, M
+from db_eplusout_reader.results_dict import ResultsDictionary
+from db_eplusout_reader.shared_results import (
+    SharedResultsDescriptor,
+    create_shared_memory,
+    get_tracked_name,
+    share_results,
+)
+
+
+def is_equal(first, second):
+    return len(first) == len(second) and all(
+        a == b or (math.isnan(a) and math.isnan(b)) for a, b in zip(first, second)
+    )
+
+
+def share_eso_file(path):
+    return share_results(DBEsoFile.from_path(path))
+
+
+def assert_same_outputs(db_eso_file, other):
+    assert other.header == db_eso_file.header
+    assert other.dates == db_eso_file.dates
+    for frequency, outputs in db_eso_file.outputs.items():
+        assert list(other.outputs[frequency]) == list(outputs)
+        for id_, values in outputs.items():
+            assert is_equal(other.outputs[frequency][id_], values)
+
+
+class TestPickle:
+    def test_pickle_eso_file(self, session_eso_file):
+        db_eso_file = pickle.loads(pickle.dumps(session_eso_file))
+        assert_same_outputs(session_eso_file, db_eso_file)
+        assert isinstance(
+            db_eso_file.outputs[H][next(iter(db_eso_file.outputs[H]))], list
+        )
+        assert db_eso_file.n_days == session_eso_file.n_days
+
+    def test_pickle_typed_eso_file(self, eso_path):
+        db_eso_file = DBEsoFile.from_path(eso_path, dtype=FLOAT32)
+        unpickled = pickle.loads(pickle.dumps(db_eso_file))
+        assert unpickled.outputs == db_eso_file.outputs
+        assert all(
+            isinstance(values, array) and values.typecode == "f"
+            for outputs in unpickled.outputs.values()
+            for values in outputs.values()
+        )
+
+    def test_pickle_ragged_eso_file(self, session_eso_file):
+        db_eso_file = copy.deepcopy(session_eso_file)
+        db_eso_file.outputs[H][next(iter(db_eso_file.outputs[H]))].append(1.0)
+        collection = DBEsoFileCollection([db_eso_file])
+        unpickled = pickle.loads(pickle.dumps(collection))
+        assert unpickled[0].outputs == db_eso_file.outputs
+
+    def test_pickle_eso_file_collection(self, session_eso_file_collection):
+        collection = pickle.loads(pickle.dumps(session_eso_file_collection))
+        expected_names = session_eso_file_collection.environment_names
+        assert isinstance(collection, DBEsoFileCollection)
+        assert collection.environment_names == expected_names
+        assert_same_outputs(session_eso_file_collection[0], collection[0])
+
+    def test_pickle_results_dictionary(self, results_dictionary):
+        rd = pickle.loads(pickle.dumps(results_dictionary))
+        assert isinstance(rd, ResultsDictionary)
+        assert rd.frequency == H
+        assert rd.time_series == results_dictionary.time_series
+        assert list(rd.keys()) == list(results_dictionary.keys())
+        assert [list(values) for values in rd.values()] == results_dictionary.arrays
+        assert all(isinstance(values, list) for values in rd.values())
+
+    def test_pickle_round_trip(self):
+        results_dictionary = ResultsDictionary(H)
+        results_dictionary[Variable("a", "b", "c")] = [1, 2, 3]
+        results_dictionary[Variable("d", "e", "f")] = array("f", [4, 5, 6])
+        rd = pickle.loads(pickle.dumps(results_dictionary))
+        assert rd == results_dictionary
+        assert [type(values) for values in rd.values()] == [list, array]
+        assert rd[Variable("d", "e", "f")].typecode == "f"
+
+    def test_pickle_non_numeric_results_dictionary(self):
+        results_dictionary = ResultsDictionary(H)
+        results_dictionary[Variable("a", "b", "c")] = ["foo", "bar"]
+        rd = pickle.loads(pickle.dumps(results_dictionary))
+        assert rd == results_dictionary
+        assert rd.frequency == H
+
+    def test_pickle_compact_results(self, results_dictionary):
+        compact_results = results_dictionary.to_compact()
+        results = pickle.loads(pickle.dumps(compact_results))
+        assert results.block == compact_results.block
+        assert results.variables == compact_results.variables
+        assert results.time_series == compact_results.time_series
+
+
+class TestCopy:
+    def test_copy_results_dictionary(self, results_dictionary):
+        rd = copy.copy(results_dictionary)
+        assert rd == results_dictionary
+        assert rd.time_series is results_dictionary.time_series
+        assert all(a is b for a, b in zip(rd.values(), results_dictionary.values()))
+
+    def test_deepcopy_results_dictionary(self, results_dictionary):
+        rd = copy.deepcopy(results_dictionary)
+        assert rd == results_dictionary
+        assert rd.frequency == H
+        assert rd.time_series == results_dictionary.time_series
+        assert all(isinstance(values, list) for values in rd.values())
+        rd[Variable("Temperature", "Zone1", "C")][0] = 0
+        assert results_dictionary[Variable("Temperature", "Zone1", "C")][0] == 20
+
+    def test_deepcopy_compact_results(self, results_dictionary):
+        compact_results = results_dictionary.to_compact()
+        results = copy.deepcopy(compact_results)
+        assert results.block == compact_results.block
+        assert results.block is not compact_results.block
+        assert copy.copy(compact_results).block is compact_results.block
+
+    def test_deepcopy_eso_file(self, session_eso_file):
+        db_eso_file = copy.deepcopy(session_eso_file)
+        assert db_eso_file.outputs == session_eso_file.outputs
+        assert db_eso_file.dates == session_eso_file.dates
+        assert all(
+            isinstance(values, list)
+            for outputs in db_eso_file.outputs.values()
+            for values in outputs.values()
+        )
+        assert copy.copy(session_eso_file).outputs is session_eso_file.outputs
+
+    def test_deepcopy_eso_file_collection(self, session_eso_file_collection):
+        collection = copy.deepcopy(session_eso_file_collection)
+        names = session_eso_file_collection.environment_names
+        assert collection.environment_names == names
+        assert collection[0].outputs == session_eso_file_collection[0].outputs
+        assert collection[0] is not session_eso_file_collection[0]
+        assert copy.copy(collection)[0] is collection[0]
+
+
+class TestSharedResults:
+    def test_tracked_name(self):
+        shm = create_shared_memory(1)
+        try:
+            assert get_tracked_name(shm).lstrip("/") == shm.name
+            if os.name == "posix":
+                assert get_tracked_name(shm) == "/" + shm.name
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_attach_eso_file(self, session_eso_file):
+        descriptor = share_results(session_eso_file)
+        with descriptor.attach() as db_eso_file:
+            assert_same_outputs(session_eso_file, db_eso_file)
+            column = db_eso_file.outputs[H][next(iter(db_eso_file.outputs[H]))]
+            assert isinstance(column, memoryview)
+        with pytest.raises(ValueError):
+            len(column)
+        with pytest.raises(FileNotFoundError):
+            descriptor.attach()
+
+    def test_load_results_dictionary(self, results_dictionary):
+        descriptor = pickle.loads(pickle.dumps(share_results(results_dictionary)))
+        assert isinstance(descriptor, SharedResultsDescriptor)
+        rd = descriptor.load()
+        assert [list(values) for values in rd.values()] == results_dictionary.arrays
+        assert rd.time_series == results_dictionary.time_series
+        with pytest.raises(FileNotFoundError):
+            descriptor.load()
+
+    def test_attach_compact_results(self, results_dictionary):
+        descriptor = share_results(results_dictionary.to_compact())
+        with descriptor.attach() as compact_results:
+            assert compact_results.get_row(1).tolist() == [23, 21, 23]
+            assert compact_results.get_rows(1, 3).first_array.tolist() == [23, 19]
+
+    def test_close_with_derived_views(self, session_eso_file):
+        shared = share_results(session_eso_file).attach()
+        results = shared.results.get_results(Variable(None, None, None), M)
+        with pytest.raises(BufferError):
+            shared.close(unlink=True)
+        del results
+        shared.close(unlink=True)
+        assert shared.closed
+
+    def test_share_from_another_process(self, eso_path, session_eso_file):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            descriptor = executor.submit(share_eso_file, eso_path).result()
+        db_eso_file = descriptor.load()
+        assert_same_outputs(session_eso_file, db_eso_file)
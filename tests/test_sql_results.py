@@ -1,12 +1,29 @@
+import gzip
+import math
 import os.path
+import shutil
+import sqlite3
 from datetime import datetime
 
 import pytest
 
-from db_eplusout_reader import Variable, get_results
-from db_eplusout_reader.constants import RP, D, H, M
+from db_eplusout_reader import Variable, compression, get_results, sql_reader
+from db_eplusout_reader.compression import (
+    clear_decompressed_files,
+    get_decompressed_path,
+)
+from db_eplusout_reader.constants import FLOAT32, FLOAT64, RP, D, H, M
 from db_eplusout_reader.results_dict import ResultsHandler
-from db_eplusout_reader.sql_reader import get_timestamps_from_sql
+from db_eplusout_reader.sql_reader import (
+    DEFAULT_PROFILE,
+    PLAIN_PROFILE,
+    connect,
+    fetch_top_n,
+    get_results_from_sql,
+    get_timestamps_from_sql,
+    get_top_n_from_sql,
+    iter_results_from_sql,
+)
 
 
 class TestSql:
@@ -112,3 +129,253 @@ class TestSql:
         with pytest.raises(IOError):
             get_results(invalid_path, variables=variable, frequency=H)
         assert not os.path.exists(invalid_path)
+
+
+class TestCompressedSql:
+    @pytest.fixture(scope="function")
+    def compressed_sql_path(self, sql_path, tmp_path):
+        path = os.path.join(str(tmp_path), "eplusout.sql.gz")
+        with open(sql_path, "rb") as src, gzip.open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        yield path
+        clear_decompressed_files()
+
+    def test_get_results_compressed(self, sql_path, compressed_sql_path):
+        variable = Variable(None, None, None)
+        results = get_results(compressed_sql_path, variable, frequency=D)
+        assert results == get_results(sql_path, variable, frequency=D)
+
+    def test_decompressed_file_is_reused(self, compressed_sql_path):
+        decompressed_path = get_decompressed_path(compressed_sql_path)
+        assert decompressed_path.endswith(".sql")
+        assert get_decompressed_path(compressed_sql_path) == decompressed_path
+        clear_decompressed_files()
+        assert not os.path.exists(decompressed_path)
+
+    def test_least_recently_used_file_is_removed(
+        self, compressed_sql_path, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(compression, "MAX_DECOMPRESSED_FILES", 2)
+        paths = [compressed_sql_path]
+        for name in ["other.sql.gz", "another.sql.gz"]:
+            paths.append(os.path.join(str(tmp_path), name))
+            shutil.copyfile(compressed_sql_path, paths[-1])
+        first, second = (get_decompressed_path(path) for path in paths[:2])
+        get_decompressed_path(paths[0])
+        third = get_decompressed_path(paths[2])
+        assert os.path.exists(first)
+        assert not os.path.exists(second)
+        assert os.path.exists(third)
+
+
+class TestConnectionProfile:
+    def test_default_profile_is_read_only(self, sql_path):
+        conn = connect(sql_path)
+        with pytest.raises(sqlite3.DatabaseError):
+            conn.execute("CREATE TABLE Foo (Bar INTEGER)")
+        assert conn.execute("PRAGMA query_only").fetchone() == (1,)
+        conn.close()
+
+    def test_profile_uri(self, sql_path):
+        uri = DEFAULT_PROFILE.get_uri(sql_path)
+        assert uri.startswith("file:")
+        assert uri.endswith("?mode=ro&immutable=1")
+        assert PLAIN_PROFILE.get_uri(sql_path).endswith("eplusout.sql")
+
+    def test_get_results_plain_profile(self, sql_path):
+        variable = Variable(None, None, None)
+        results = get_results_from_sql(sql_path, variable, D, profile=PLAIN_PROFILE)
+        assert results == get_results_from_sql(sql_path, variable, D)
+
+
+class TestConcurrentFetch:
+    def test_get_results_workers(self, sql_path):
+        variable = Variable(None, None, None)
+        results = get_results_from_sql(sql_path, variable, H, workers=4)
+        expected = get_results_from_sql(sql_path, variable, H)
+        assert list(results.items()) == list(expected.items())
+        assert results.time_series == expected.time_series
+
+    def test_get_sliced_results_workers(self, sql_path):
+        kwargs = {
+            "start_date": datetime(2013, 1, 1),
+            "end_date": datetime(2013, 2, 1),
+        }
+        variable = Variable(None, None, None)
+        results = get_results_from_sql(sql_path, variable, H, workers=3, **kwargs)
+        expected = get_results_from_sql(sql_path, variable, H, **kwargs)
+        assert list(results.items()) == list(expected.items())
+
+
+class TestTypedArrays:
+    @pytest.mark.parametrize("dtype, typecode", [(FLOAT64, "d"), (FLOAT32, "f")])
+    def test_get_results_dtype(self, sql_path, dtype, typecode):
+        variable = Variable(None, None, None)
+        results = get_results_from_sql(sql_path, variable, H, dtype=dtype)
+        expected = get_results_from_sql(sql_path, variable, H)
+        assert results.variables == expected.variables
+        for array, expected_array in zip(results.arrays, expected.arrays):
+            assert array.typecode == typecode
+            assert array.tolist() == pytest.approx(expected_array, rel=1e-6)
+
+    def test_invalid_dtype(self, sql_path):
+        with pytest.raises(ValueError):
+            get_results_from_sql(sql_path, Variable(None, None, None), H, dtype="int")
+
+
+class TestUnitConversion:
+    def test_get_results_units(self, sql_path):
+        variable = Variable(None, None, "J")
+        results = get_results_from_sql(sql_path, variable, M, units={"J": "kWh"})
+        expected = get_results_from_sql(sql_path, variable, M)
+        assert results.variables == [
+            v._replace(units="kWh") for v in expected.variables
+        ]
+        for array, expected_array in zip(results.arrays, expected.arrays):
+            assert array == pytest.approx([v / 3.6e6 for v in expected_array])
+
+    def test_get_results_units_workers(self, sql_path):
+        kwargs = {"units": {"C": ("K", 1, 273.15)}, "dtype": FLOAT64}
+        variable = Variable(None, None, None)
+        results = get_results_from_sql(sql_path, variable, H, workers=3, **kwargs)
+        expected = get_results_from_sql(sql_path, variable, H, **kwargs)
+        assert list(results.items()) == list(expected.items())
+        assert "K" in {v.units for v in results.variables}
+        assert "C" not in {v.units for v in results.variables}
+
+    def test_unknown_conversion(self, sql_path):
+        with pytest.raises(ValueError):
+            get_results_from_sql(
+                sql_path, Variable(None, None, None), H, units={"J": "C"}
+            )
+
+
+def join_chunks(chunks):
+    columns = {}
+    for chunk in chunks:
+        for variable, values in chunk.items():
+            columns.setdefault(variable, []).extend(values.tolist())
+    return columns
+
+
+def is_equal(first, second):
+    return len(first) == len(second) and all(
+        a == b or (math.isnan(a) and math.isnan(b)) for a, b in zip(first, second)
+    )
+
+
+class TestResultsIterator:
+    @pytest.mark.parametrize("chunk_size", [1, 100, 10000])
+    def test_iter_results(self, sql_path, chunk_size):
+        variable = Variable(None, None, None)
+        chunks = list(
+            iter_results_from_sql(sql_path, variable, H, chunk_size=chunk_size)
+        )
+        expected = get_results_from_sql(sql_path, variable, H)
+        assert all(chunk.n_steps <= chunk_size for chunk in chunks)
+        assert [t for c in chunks for t in c.time_series] == expected.time_series
+        columns = join_chunks(chunks)
+        assert list(columns) == expected.variables
+        for variable, values in expected.items():
+            assert is_equal(columns[variable], values)
+
+    def test_iter_sliced_results(self, sql_path):
+        variable = Variable(None, None, "C")
+        timestamps = get_timestamps_from_sql(sql_path, H)
+        kwargs = {"start_date": timestamps[100], "end_date": timestamps[900]}
+        chunks = list(iter_results_from_sql(sql_path, variable, H, **kwargs))
+        expected = get_results_from_sql(sql_path, variable, H, **kwargs)
+        assert [t for c in chunks for t in c.time_series] == expected.time_series
+        assert len(expected.time_series) == 801
+        assert join_chunks(chunks) == dict(expected)
+
+    def test_iter_results_options(self, sql_path, monkeypatch):
+        # variables are filtered in Python when there are too many of them
+        monkeypatch.setattr(sql_reader, "MAX_ID_PARAMETERS", 1)
+        kwargs = {"dtype": FLOAT32, "units": {"J": "kWh"}}
+        variable = Variable(None, None, None)
+        chunks = list(iter_results_from_sql(sql_path, variable, D, **kwargs))
+        expected = get_results_from_sql(sql_path, variable, D, **kwargs)
+        assert all(chunk.block.typecode == "f" for chunk in chunks)
+        columns = join_chunks(chunks)
+        assert list(columns) == expected.variables
+        for variable, values in expected.items():
+            assert columns[variable] == pytest.approx(values, rel=1e-6, nan_ok=True)
+
+    def test_iter_no_results(self, sql_path):
+        variable = Variable("foo", None, None)
+        assert list(iter_results_from_sql(sql_path, variable, H)) == []
+
+    def test_iter_invalid_arguments(self, sql_path, test_files_dir):
+        variable = Variable(None, None, None)
+        with pytest.raises(ValueError):
+            iter_results_from_sql(sql_path, variable, H, chunk_size=0)
+        with pytest.raises(IOError):
+            iter_results_from_sql(os.path.join(test_files_dir, "foo.sql"), variable, H)
+
+
+class TestTopN:
+    def test_get_top_n(self, sql_path):
+        variable = Variable(None, None, None)
+        expected = get_results_from_sql(sql_path, variable, H).top_n(5)
+        assert get_top_n_from_sql(sql_path, variable, H, 5) == expected
+
+    def test_get_sliced_top_n(self, sql_path):
+        variable = Variable(None, "Zone Mean Air Temperature", None)
+        kwargs = {"start_date": datetime(2002, 3, 1), "end_date": datetime(2002, 3, 31)}
+        expected = get_results_from_sql(sql_path, variable, H, **kwargs).top_n(3)
+        peaks = get_top_n_from_sql(sql_path, variable, H, 3, **kwargs)
+        assert peaks == expected
+        assert all(
+            kwargs["start_date"] <= timestamp <= kwargs["end_date"]
+            for values in peaks.values()
+            for timestamp, _ in values
+        )
+
+    def test_sliced_top_n_is_limited_in_query(self, sql_path):
+        variable = Variable(None, "Zone Mean Air Temperature", None)
+        kwargs = {"start_date": datetime(2002, 3, 1), "end_date": datetime(2002, 3, 31)}
+        statements = []
+        conn = connect(sql_path)
+        try:
+            conn.set_trace_callback(statements.append)
+            peaks = fetch_top_n(conn, variable, H, 3, **kwargs)
+        finally:
+            conn.close()
+        assert peaks == get_top_n_from_sql(sql_path, variable, H, 3, **kwargs)
+        top_n_statements = [s for s in statements if "ORDER BY ReportData.Value" in s]
+        assert len(top_n_statements) == len(peaks)
+        assert all("BETWEEN" in s and "LIMIT" in s for s in top_n_statements)
+
+    def test_sliced_results_unsorted_time(self, sql_path, tmp_path):
+        unsorted_path = str(tmp_path / "unsorted.sql")
+        shutil.copy(sql_path, unsorted_path)
+        with sqlite3.connect(unsorted_path) as conn:
+            conn.execute("UPDATE Time SET Year = 2003 WHERE Month <= 6")
+        variable = Variable(None, "Zone Mean Air Temperature", None)
+        start_date, end_date = datetime(2002, 12, 1), datetime(2003, 1, 31)
+        results = get_results_from_sql(unsorted_path, variable, H)
+        sliced = get_results_from_sql(
+            unsorted_path, variable, H, start_date=start_date, end_date=end_date
+        )
+        valid = [start_date <= t <= end_date for t in results.time_series]
+        assert sliced.time_series == [
+            t for t, is_valid in zip(results.time_series, valid) if is_valid
+        ]
+        assert sliced.first_array == [
+            v for v, is_valid in zip(results.first_array, valid) if is_valid
+        ]
+
+    def test_sliced_top_n_unsorted_time(self, sql_path, tmp_path):
+        unsorted_path = str(tmp_path / "unsorted.sql")
+        shutil.copy(sql_path, unsorted_path)
+        with sqlite3.connect(unsorted_path) as conn:
+            # the first half of year follows the second half
+            conn.execute("UPDATE Time SET Year = 2003 WHERE Month <= 6")
+        variable = Variable(None, "Zone Mean Air Temperature", None)
+        kwargs = {
+            "start_date": datetime(2002, 12, 1),
+            "end_date": datetime(2003, 1, 31),
+        }
+        expected = get_results_from_sql(unsorted_path, variable, H, **kwargs).top_n(3)
+        assert get_top_n_from_sql(unsorted_path, variable, H, 3, **kwargs) == expected
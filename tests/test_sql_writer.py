@@ -0,0 +1,83 @@
+import os.path
+import sqlite3
+
+import pytest
+
+from db_eplusout_reader import DBEsoFileCollection, Variable, eso_to_sql
+from db_eplusout_reader.constants import RP, D, H, M
+from db_eplusout_reader.sql_reader import get_results_from_sql, iter_results_from_sql
+
+
+def to_sql_results(results):
+    """Replace meter keys as stored in .sql file."""
+    return {
+        (variable._replace(key="") if variable.key == "Meter" else variable): list(
+            values
+        )
+        for variable, values in results.items()
+    }
+
+
+@pytest.fixture(scope="function")
+def converted_sql_path(session_eso_file, tmp_path):
+    return eso_to_sql(session_eso_file, os.path.join(str(tmp_path), "eplusout.sql"))
+
+
+class TestEsoToSql:
+    @pytest.mark.parametrize("frequency", [H, D, M, RP])
+    def test_converted_results(self, session_eso_file, converted_sql_path, frequency):
+        variable = Variable(None, None, None)
+        expected = session_eso_file.get_results(variable, frequency)
+        results = get_results_from_sql(converted_sql_path, variable, frequency)
+        assert expected.time_series == results.time_series
+        assert to_sql_results(expected) == to_sql_results(results)
+
+    def test_meter_dictionary(self, converted_sql_path):
+        conn = sqlite3.connect(converted_sql_path)
+        try:
+            rows = conn.execute(
+                "SELECT KeyValue, ReportingFrequency FROM ReportDataDictionary"
+                " WHERE IsMeter = 1"
+            ).fetchall()
+        finally:
+            conn.close()
+        assert [("", "Hourly"), ("", "Run Period")] == sorted(rows)
+
+    def test_indexes_created(self, converted_sql_path):
+        conn = sqlite3.connect(converted_sql_path)
+        try:
+            indexes = conn.execute(
+                "SELECT tbl_name FROM sqlite_master WHERE type = 'index'"
+            ).fetchall()
+        finally:
+            conn.close()
+        assert {("ReportData",), ("Time",)} == set(indexes)
+
+    def test_iter_converted_results(self, session_eso_file, converted_sql_path):
+        variable = Variable(None, None, None)
+        expected = session_eso_file.get_results(variable, H)
+        chunks = list(iter_results_from_sql(converted_sql_path, variable, H))
+        values = {v: [] for v in chunks[0]}
+        for chunk in chunks:
+            for v, chunk_values in chunk.items():
+                values[v].extend(chunk_values)
+        assert to_sql_results(expected) == values
+
+    def test_convert_path(self, multi_env_eso_path, tmp_path):
+        sql_path = os.path.join(str(tmp_path), "multi_env.sql")
+        eso_to_sql(multi_env_eso_path, sql_path)
+        collection = DBEsoFileCollection.from_path(multi_env_eso_path)
+        variable = Variable(None, None, None)
+        expected = collection.get_results(variable, D)
+        results = get_results_from_sql(sql_path, variable, D)
+        assert expected.time_series == results.time_series
+        assert to_sql_results(expected) == to_sql_results(results)
+
+    def test_existing_file(self, session_eso_file, converted_sql_path):
+        with pytest.raises(FileExistsError):
+            eso_to_sql(session_eso_file, converted_sql_path)
+        eso_to_sql(session_eso_file, converted_sql_path, overwrite=True)
+        assert [converted_sql_path] == [
+            os.path.join(os.path.dirname(converted_sql_path), name)
+            for name in os.listdir(os.path.dirname(converted_sql_path))
+        ]
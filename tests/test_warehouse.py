@@ -0,0 +1,114 @@
+import os.path
+import shutil
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from db_eplusout_reader import ResultsWarehouse, Variable
+from db_eplusout_reader.constants import FLOAT64, RP, D, H, M
+from db_eplusout_reader.exceptions import RunNotFound
+from db_eplusout_reader.sql_reader import get_results_from_sql
+
+
+def to_lists(results):
+    return {variable: list(values) for variable, values in results.items()}
+
+
+@pytest.fixture(scope="function")
+def warehouse(sql_path, eso_path, tmp_path):
+    with ResultsWarehouse(os.path.join(str(tmp_path), "runs.db")) as warehouse:
+        warehouse.add_runs([("a", sql_path), ("b", sql_path), ("c", eso_path)])
+        yield warehouse
+
+
+class TestResultsWarehouse:
+    def test_run_ids(self, warehouse):
+        assert ["a", "b", "c"] == warehouse.run_ids
+
+    @pytest.mark.parametrize("frequency", [H, D, M, RP])
+    def test_get_results(self, warehouse, sql_path, frequency):
+        variable = Variable(None, None, None)
+        expected = get_results_from_sql(sql_path, variable, frequency)
+        results = warehouse.get_results(variable, frequency)
+        assert ["a", "b", "c"] == list(results.keys())
+        for run_id in ["a", "b"]:
+            assert expected.time_series == results[run_id].time_series
+            assert list(expected.keys()) == list(results[run_id].keys())
+            assert to_lists(expected) == to_lists(results[run_id])
+
+    def test_eso_run(self, warehouse, session_eso_file):
+        variable = Variable(None, "Zone Mean Air Temperature", None)
+        expected = session_eso_file.get_results(variable, H)
+        results = warehouse.get_results(variable, H, runs="c")
+        assert ["c"] == list(results.keys())
+        assert expected.time_series == results["c"].time_series
+        assert to_lists(expected) == to_lists(results["c"])
+
+    def test_shared_dictionary(self, warehouse):
+        n_variables = warehouse.conn.execute(
+            "SELECT COUNT(*) FROM ReportDataDictionary"
+        ).fetchone()[0]
+        assert 9 == n_variables
+
+    def test_get_sliced_results(self, warehouse, sql_path):
+        variable = Variable(None, None, None)
+        start_date, end_date = datetime(2002, 5, 1), datetime(2002, 5, 2, 12)
+        expected = get_results_from_sql(
+            sql_path, variable, H, start_date=start_date, end_date=end_date
+        )
+        results = warehouse.get_results(
+            variable, H, runs=["b"], start_date=start_date, end_date=end_date
+        )
+        assert ["b"] == list(results.keys())
+        assert expected.time_series == results["b"].time_series
+        assert to_lists(expected) == to_lists(results["b"])
+
+    def test_get_results_units(self, warehouse):
+        variable = Variable("", "Electricity:Facility", "J")
+        results = warehouse.get_results(
+            variable, RP, runs=["a"], units={"J": "kWh"}, dtype=FLOAT64
+        )
+        expected = warehouse.get_results(variable, RP, runs=["a"])
+        converted = results["a"]
+        assert [variable._replace(units="kWh")] == list(converted.keys())
+        assert "d" == converted.first_array.typecode
+        assert pytest.approx(expected["a"].scalar / 3.6e6) == converted.scalar
+
+    def test_no_results(self, warehouse):
+        assert {} == warehouse.get_results(Variable("FOO", None, None), H)
+
+    def test_unknown_run(self, warehouse):
+        with pytest.raises(RunNotFound):
+            warehouse.get_results(Variable(None, None, None), H, runs=["d"])
+
+    def test_runs_covering_different_periods(self, sql_path, tmp_path):
+        second_half_path = str(tmp_path / "second_half.sql")
+        shutil.copy(sql_path, second_half_path)
+        with sqlite3.connect(second_half_path) as conn:
+            conn.execute(
+                "DELETE FROM ReportData WHERE TimeIndex IN"
+                " (SELECT TimeIndex FROM Time WHERE Month < 7)"
+            )
+            conn.execute("DELETE FROM Time WHERE Month < 7")
+        variable = Variable(None, "Zone Mean Air Temperature", None)
+        expected = get_results_from_sql(sql_path, variable, H)
+        expected_second_half = get_results_from_sql(second_half_path, variable, H)
+        with ResultsWarehouse(str(tmp_path / "periods.db")) as warehouse:
+            # time rows of the second half are numbered first
+            warehouse.add_runs([("second_half", second_half_path), ("full", sql_path)])
+            results = warehouse.get_results(variable, H)
+            sliced_results = warehouse.get_results(
+                variable, H, end_date=datetime(2002, 7, 1, 12)
+            )
+        assert expected.time_series == results["full"].time_series
+        assert to_lists(expected) == to_lists(results["full"])
+        assert expected_second_half.time_series == (results["second_half"].time_series)
+        assert expected.time_series[0] == sliced_results["full"].time_series[0]
+        assert datetime(2002, 7, 1, 12) == sliced_results["full"].time_series[-1]
+        assert 12 == len(sliced_results["second_half"].time_series)
+
+    def test_duplicate_run(self, warehouse, sql_path):
+        with pytest.raises(ValueError):
+            warehouse.add_run("a", sql_path)
+        assert ["a", "b", "c"] == warehouse.run_ids